@@ -111,6 +111,71 @@ class Case(Base):
     input_specs.addSub(InputData.parameterInputFactory('workflow', contentType=workflow_options,
                                                        strictMode=True, descr=desc_workflow_options))
 
+    moped = InputData.parameterInputFactory('moped', descr=r"""Provides options for solving with MOPED, used
+        when \xmlNode{workflow} is ``MOPED'' or ``combined''.""")
+    decomposition = InputTypes.makeEnumType('MopedDecomposition', 'MopedDecompositionType', ['monolithic', 'benders'])
+    moped.addSub(InputData.parameterInputFactory('decomposition', contentType=decomposition,
+        descr=r"""how to solve the MOPED problem. If ``monolithic'', the capacities and the dispatch of all
+                  realizations and years are solved as one optimization problem. If ``benders'', a master
+                  problem over the capacities is solved iteratively, with the dispatch of each realization and
+                  year solved as a separate subproblem for the given capacities and returned to the master
+                  problem as an optimality cut. Benders decomposition requires a feasible dispatch for all
+                  capacities within their bounds. \default{monolithic}"""))
+    moped.addSub(InputData.parameterInputFactory('tolerance', contentType=InputTypes.FloatType,
+        descr=r"""relative gap between the upper bound from the master problem and the best NPV found at
+                  which Benders decomposition is converged. \default{1e-4}"""))
+    moped.addSub(InputData.parameterInputFactory('max_iterations', contentType=InputTypes.IntegerType,
+        descr=r"""maximum number of Benders iterations. \default{50}"""))
+    moped.addSub(InputData.parameterInputFactory('workers', contentType=InputTypes.IntegerType,
+        descr=r"""number of parallel processes for solving Benders subproblems or combinations of swept
+                  capacities. Processes are forked, which is not available on Windows, where problems are
+                  solved serially. \default{1}"""))
+    moped.addSub(InputData.parameterInputFactory('solver', contentType=InputTypes.StringType,
+        descr=r"""pyomo name of the solver for MOPED problems. If ``auto'', linear problems are solved with the
+                  first available of HiGHS, CBC, and GLPK, and only nonlinear problems are solved with IPOPT.
+                  \default{auto}"""))
+    moped.addSub(InputData.parameterInputFactory('capex_segments', contentType=InputTypes.IntegerType,
+        descr=r"""number of linear segments approximating the economies of scale of capital costs,
+                  $(D/D_{ref})^x$, for optimized capacities, which keeps the problem linear (mixed integer for
+                  $x < 1$) so that it can be solved with an LP/MILP solver. If 0, the exact nonlinear scaling
+                  is used, which requires a nonlinear solver. \default{0}"""))
+    moped.addSub(InputData.parameterInputFactory('reduced_samples', contentType=InputTypes.IntegerType,
+        descr=r"""if greater than 0, then the \xmlNode{num_arma_samples} synthetic history realizations are
+                  reduced to this many representative realizations, each weighted by the share of realizations
+                  it represents, before building the MOPED problem. The problem size grows with the number of
+                  realizations, so this trades some accuracy for speed; the distance between the reduced and
+                  full sets of realizations is reported. \default{0}"""))
+    reduction = InputTypes.makeEnumType('ScenarioReduction', 'ScenarioReductionType', ['forward', 'kmedoids'])
+    moped.addSub(InputData.parameterInputFactory('reduction_method', contentType=reduction,
+        descr=r"""method for selecting representative realizations when \xmlNode{reduced_samples} is given.
+                  If ``forward'', fast forward selection adds the realization that most reduces the distance to
+                  the full set, one at a time. If ``kmedoids'', the forward selection is further improved by
+                  k-medoids clustering. \default{forward}"""))
+    moped.addSub(InputData.parameterInputFactory('reduction_output', contentType=InputTypes.StringType,
+        descr=r"""if provided with \xmlNode{reduced_samples}, then the selected realizations and their weights
+                  are written to a CSV file with this name."""))
+    moped.addSub(InputData.parameterInputFactory('warm_start', contentType=InputTypes.BoolType,
+        descr=r"""if True, then MOPED first solves the problem with clustered synthetic histories, then solves
+                  the full resolution problem starting from the clustered solution: the optimized capacities, and
+                  the dispatch of each cluster mapped onto the hours of the segments it represents.
+                  \default{False}"""))
+    moped.addSub(InputData.parameterInputFactory('warm_start_margin', contentType=InputTypes.FloatType,
+        descr=r"""if provided with \xmlNode{warm_start}, then the bounds of optimized capacities for the full
+                  resolution problem are tightened to the clustered optimum plus or minus this fraction of the
+                  original bounds range."""))
+    dispatch_output = InputData.parameterInputFactory('dispatch_output',
+        descr=r"""if provided, then the optimized dispatch of MOPED (production, consumption, and storage level,
+                  charge, and discharge of each component) is written to a compressed NetCDF4 (HDF5) file, indexed
+                  by realization, year, cluster, and hour and named as in the standard workflow. Requires the
+                  \texttt{netCDF4} python library. Not available with Benders decomposition or sweep values.""")
+    dispatch_output.addSub(InputData.parameterInputFactory('file', contentType=InputTypes.StringType,
+        descr=r"""name of the file to which dispatch is written. \default{moped_dispatch.nc}"""))
+    dispatch_output.addSub(InputData.parameterInputFactory('compression', contentType=InputTypes.IntegerType,
+        descr=r"""zlib compression level of the file, from 0 (no compression) to 9 (most compression).
+                  \default{4}"""))
+    moped.addSub(dispatch_output)
+    input_specs.addSub(moped)
+
     # not yet implemented TODO
     #econ_metrics = InputTypes.makeEnumType('EconMetrics', 'EconMetricsTypes', ['NPV', 'lcoe'])
     #desc_econ_metrics = r"""indicates the economic metric that should be used for the HERON analysis. For most cases, this
@@ -136,6 +201,22 @@ class Case(Base):
         descr=r"""provides a dispatch plot after running through \xmlNode{inner_samples} and
               \xmlNode{macro_steps} provided. To prevent plotting output during debug mode set to "False".
               \default{True}"""))
+    profile_options = InputTypes.makeEnumType('ProfileMode', 'ProfileModeType', ['time', 'memory'])
+    debug.addSub(InputData.parameterInputFactory('profile', contentType=profile_options,
+        descr=r"""enables profiling of each inner run. The wall time and peak resident memory of each phase
+              (loading, variable extraction, structure detection, dispatch and cashflows per segment, final
+              cashflows, and saving variables) are written to \texttt{heron\_profile.json} in each inner
+              run directory. If ``memory'', then Python allocations are also traced per phase, which is
+              more accurate but slows the run. Profiling can also be enabled without \xmlNode{debug} mode by
+              setting the environment variable \texttt{HERON\_PROFILE} to ``time'' or ``memory''.
+              \default{None}"""))
+    debug.addSub(InputData.parameterInputFactory('evaluation_counts', contentType=InputTypes.BoolType,
+        descr=r"""counts the calls and accumulates the time of each ValuedParam evaluation, CashFlow parameter
+              calculation, and Function or ROM evaluation during each inner run, by owner and parameter. The
+              ranked results are written to \texttt{heron\_evaluations.csv} in each inner run directory.
+              Times are inclusive, so CashFlow times include the times of their ValuedParams. Counting can
+              also be enabled without \xmlNode{debug} mode by setting the environment variable
+              \texttt{HERON\_EVALUATION\_COUNTS}. \default{False}"""))
     input_specs.addSub(debug)
 
     parallel = InputData.parameterInputFactory('parallel', descr=r"""Describes how to parallelize this run. If not present defaults to no parallelization (1 outer, 1 inner)""")
@@ -164,11 +245,42 @@ class Case(Base):
     input_specs.addSub(parallel)
 
     data_handling = InputData.parameterInputFactory('data_handling', descr=r"""Provides options for data handling within HERON operations.""")
-    inner_outer_data = InputTypes.makeEnumType('InnerOuterData', 'InnerOuterDataType', ['csv', 'netcdf'])
+    inner_outer_data = InputTypes.makeEnumType('InnerOuterData', 'InnerOuterDataType', ['csv', 'netcdf', 'npz'])
     data_handling.addSub(InputData.parameterInputFactory('inner_to_outer', contentType=inner_outer_data,
         descr=r"""which type of data format to transfer results from inner (stochastic dispatch optimization) runs to
                   the outer (capacity and meta-variable optimization) run. CSV is generally slower and not recommended,
-                  but may be useful for debugging. NetCDF is more generally more efficient. \default{netcdf}"""))
+                  but may be useful for debugging. NetCDF is more generally more efficient. NPZ stores the
+                  economic metrics and statistics of each inner run in a single compact binary file, which
+                  is faster to write and load than NetCDF for large sweeps; the full dispatch
+                  returned in \xmlNode{debug} mode is still transferred as NetCDF. \default{netcdf}"""))
+    dispatch_cache = InputData.parameterInputFactory('dispatch_cache',
+        descr=r"""if provided, then dispatch results are stored on disk and reused whenever a segment is dispatched
+                  again with identical inputs (capacities, signals, dispatcher settings, and HERON input),
+                  including between inner runs of the outer optimization.""")
+    dispatch_cache.addSub(InputData.parameterInputFactory('max_size', contentType=InputTypes.FloatType,
+        descr=r"""maximum total size of stored dispatch results in MB. When exceeded, the least recently used
+                  results are removed. \default{1024}"""))
+    dispatch_cache.addSub(InputData.parameterInputFactory('location', contentType=InputTypes.StringType,
+        descr=r"""directory in which to store dispatch results, relative to the HERON input file. The directory
+                  may be shared between several HERON runs. \default{dispatch_cache}"""))
+    data_handling.addSub(dispatch_cache)
+    precision = InputTypes.makeEnumType('DispatchPrecision', 'DispatchPrecisionType', ['float64', 'float32'])
+    data_handling.addSub(InputData.parameterInputFactory('dispatch_precision', contentType=precision,
+        descr=r"""floating point precision of the dispatch activity returned from inner runs, when the dispatch is
+                  saved (e.g. in \xmlNode{debug} mode). Single precision (float32) halves the memory and output
+                  size of the dispatch, at the cost of about seven significant digits. \default{float64}"""))
+    dispatch_stream = InputData.parameterInputFactory('dispatch_stream',
+        descr=r"""if provided, then the dispatch of each segment is written to a chunked, compressed NetCDF4 file
+                  in the inner run directory as soon as it is solved, instead of holding the dispatch of all years
+                  in memory until the end of the inner run. Results of segments solved before a failure are kept
+                  in the file. Requires the \texttt{netCDF4} python library.""")
+    dispatch_stream.addSub(InputData.parameterInputFactory('file', contentType=InputTypes.StringType,
+        descr=r"""name of the file to which dispatch is written, in each inner run directory.
+                  \default{dispatch.nc}"""))
+    dispatch_stream.addSub(InputData.parameterInputFactory('compression', contentType=InputTypes.IntegerType,
+        descr=r"""zlib compression level of the file, from 0 (no compression) to 9 (most compression).
+                  \default{4}"""))
+    data_handling.addSub(dispatch_stream)
     input_specs.addSub(data_handling)
 
     input_specs.addSub(InputData.parameterInputFactory('num_arma_samples', contentType=InputTypes.IntegerType,
@@ -405,18 +517,37 @@ class Case(Base):
         'enabled': False,              # whether to enable debug mode
         'inner_samples': 1,            # how many inner realizations to sample
         'macro_steps': 1,              # how many "years" for inner realizations
-        'dispatch_plot': True          # whether to output a plot in debug mode
+        'dispatch_plot': True,         # whether to output a plot in debug mode
+        'profile': None,               # whether to profile inner runs ("time" or "memory")
+        'evaluation_counts': False,    # whether to count ValuedParam and CashFlow evaluations in inner runs
 
     }
 
     self.data_handling = {             # data handling options
-      'inner_to_outer': 'netcdf',      # how to pass inner data to outer (csv, netcdf)
+      'inner_to_outer': 'netcdf',      # how to pass inner data to outer (csv, netcdf, npz)
+      'dispatch_cache': None,          # settings for reusing dispatch results, or None if not reused
+      'dispatch_precision': 'float64', # floating point precision of saved dispatch activity
+      'dispatch_stream': None,         # settings for writing dispatch to disk as solved, or None if not streamed
     }
 
     self._time_discretization = None   # (start, end, number) for constructing time discretization, same as argument to np.linspace
     self._Resample_T = None            # user-set increments for resources
     self._optimization_settings = None # optimization settings dictionary for outer optimization loop
     self._workflow = 'standard' # setting for how to run HERON, default is through raven workflow
+    self.moped = {                     # MOPED solve options
+      'decomposition': 'monolithic',   # how to solve the MOPED problem (monolithic, benders)
+      'tolerance': 1e-4,               # relative gap for Benders convergence
+      'max_iterations': 50,            # maximum number of Benders iterations
+      'workers': 1,                    # number of processes for solving Benders subproblems or sweeps
+      'solver': 'auto',                # solver for MOPED problems, or "auto" to choose by problem structure
+      'capex_segments': 0,             # segments for piecewise-linear capex scaling, or 0 for exact scaling
+      'reduced_samples': 0,            # number of representative realizations, or 0 to use all realizations
+      'reduction_method': 'forward',   # how to select representative realizations (forward, kmedoids)
+      'reduction_output': None,        # file for the selected realizations and weights, or None if not written
+      'warm_start': False,             # whether to start the full resolution solve from the clustered solution
+      'warm_start_margin': None,       # fraction of capacity bounds range kept around the clustered optimum, or None
+      'dispatch_output': None,         # settings for writing the optimized dispatch, or None if not written
+    }
     self._result_statistics = {        # desired result statistics (keys) dictionary with attributes (values)
         'sigma': None,                 # user can specify additional result statistics
         'expectedValue': None,
@@ -496,6 +627,8 @@ class Case(Base):
         self.data_handling = self._read_data_handling(item)
       elif item.getName() == 'workflow':
         self._workflow = item.value
+      elif item.getName() == 'moped':
+        self.moped.update(self._read_moped(item))
       elif item.getName() == 'result_statistics':
         new_result_statistics = self._read_result_statistics(item)
         self._result_statistics.update(new_result_statistics)
@@ -539,9 +672,61 @@ class Case(Base):
       name = sub.getName()
       if name == 'inner_to_outer':
         settings['inner_to_outer'] = sub.value
+      elif name == 'dispatch_cache':
+        cache = {'max_size': 1024, 'location': 'dispatch_cache'}
+        for cache_sub in sub.subparts:
+          cache[cache_sub.getName()] = cache_sub.value
+        cache['location'] = os.path.abspath(os.path.join(self.run_dir, cache['location']))
+        settings['dispatch_cache'] = cache
+      elif name == 'dispatch_precision':
+        settings['dispatch_precision'] = sub.value
+      elif name == 'dispatch_stream':
+        stream = {'file': 'dispatch.nc', 'compression': 4}
+        for stream_sub in sub.subparts:
+          stream[stream_sub.getName()] = stream_sub.value
+        if not 0 <= stream['compression'] <= 9:
+          raise IOError('<data_handling><dispatch_stream><compression> must be between 0 and 9! ' +
+                        f'Got {stream["compression"]}.')
+        settings['dispatch_stream'] = stream
     # set defaults
     if 'inner_to_outer' not in settings:
       settings['inner_to_outer'] = 'netcdf'
+    if 'dispatch_cache' not in settings:
+      settings['dispatch_cache'] = None
+    if 'dispatch_precision' not in settings:
+      settings['dispatch_precision'] = 'float64'
+    if 'dispatch_stream' not in settings:
+      settings['dispatch_stream'] = None
+    return settings
+
+  def _read_moped(self, node):
+    """
+      Reads the MOPED node.
+      @ In, node, InputParams.ParameterInput, MOPED head node
+      @ Out, settings, dict, options for solving with MOPED
+    """
+    settings = {}
+    for sub in node.subparts:
+      if sub.getName() == 'dispatch_output':
+        output = {'file': 'moped_dispatch.nc', 'compression': 4}
+        for output_sub in sub.subparts:
+          output[output_sub.getName()] = output_sub.value
+        if not 0 <= output['compression'] <= 9:
+          raise IOError('<moped><dispatch_output><compression> must be between 0 and 9! ' +
+                        f'Got {output["compression"]}.')
+        settings['dispatch_output'] = output
+      else:
+        settings[sub.getName()] = sub.value
+    if settings.get('tolerance', 1) <= 0:
+      raise IOError(f'<moped><tolerance> must be positive! Got {settings["tolerance"]}.')
+    if settings.get('warm_start_margin', 1) <= 0:
+      raise IOError(f'<moped><warm_start_margin> must be positive! Got {settings["warm_start_margin"]}.')
+    for name in ['capex_segments', 'reduced_samples']:
+      if settings.get(name, 0) < 0:
+        raise IOError(f'<moped><{name}> must not be negative! Got {settings[name]}.')
+    for name in ['max_iterations', 'workers']:
+      if settings.get(name, 1) < 1:
+        raise IOError(f'<moped><{name}> must be at least 1! Got {settings[name]}.')
     return settings
 
   def _read_time_discr(self, node):
@@ -896,7 +896,12 @@ class Storage(Interaction):
     descr=r"""initial quantity of resource assumed to be present in the storage unit at the beginning
           of a given calculation, in units of quantity (not rate). \default{0}. """
     specs.addSub(vp_factory.make_input_specs('initial_stored', descr=descr))
-    descr=r"""control strategy for operating the storage. If not specified, uses a perfect foresight strategy. """
+    descr=r"""control strategy for operating the storage. If not specified, uses a perfect foresight strategy.
+          The Function is given the component and the times of the requested window as
+          \texttt{data['component']} and \texttt{data['time']}, and must return the storage level at each of
+          those times as \texttt{data['level']}. With the \texttt{pyomo} dispatcher, the Function is evaluated
+          again after each solve of the window, with the resulting window dispatch available as
+          \texttt{meta['HERON']['window\_dispatch']}; see \xmlNode{strategy\_convergence}. """
     specs.addSub(vp_factory.make_input_specs('strategy', allowed=['Function'], descr=descr))
     descr = r"""round-trip efficiency for this component as a scalar multiplier. \default{1.0}"""
     specs.addSub(InputData.parameterInputFactory('RTE', contentType=InputTypes.FloatType, descr=descr))
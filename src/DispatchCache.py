@@ -0,0 +1,156 @@
+# Copyright 2020, Battelle Energy Alliance, LLC
+# ALL RIGHTS RESERVED
+"""
+  On-disk cache of dispatch results, shared between inner runs.
+"""
+import os
+import time
+import hashlib
+import tempfile
+
+import numpy as np
+
+class DispatchCache:
+  """
+    Stores dispatch results as numpy archives named by a hash of the inputs that produced them.
+    Files are written to a temporary name and atomically renamed, so concurrent processes can share
+    the same cache directory and never read a partially-written entry.
+  """
+  lock_name = 'eviction.lock'
+  stale_lock = 60 # seconds after which an eviction lock is assumed abandoned
+
+  def __init__(self, location, max_size):
+    """
+      Constructor.
+      @ In, location, str, directory in which to store cached results
+      @ In, max_size, float, maximum total size of cached results in MB
+      @ Out, None
+    """
+    self._location = location
+    self._max_bytes = max_size * 1024 * 1024
+    os.makedirs(location, exist_ok=True)
+
+  @staticmethod
+  def hash_inputs(*items):
+    """
+      Creates a stable hash of nested dictionaries, lists, arrays, and scalars.
+      @ In, items, list, objects to hash
+      @ Out, key, str, hexadecimal hash
+    """
+    digest = hashlib.sha256()
+    for item in items:
+      _update_hash(digest, item)
+    return digest.hexdigest()
+
+  def contains(self, key):
+    """
+      Checks if results are stored for a key.
+      @ In, key, str, hash of the dispatch inputs
+      @ Out, contains, bool, True if stored
+    """
+    return os.path.isfile(self._path(key))
+
+  def load(self, key):
+    """
+      Loads the results stored for a key.
+      @ In, key, str, hash of the dispatch inputs
+      @ Out, arrays, dict, stored arrays by name, or None if not stored
+    """
+    path = self._path(key)
+    try:
+      with np.load(path, allow_pickle=False) as data:
+        arrays = dict((name, data[name]) for name in data.files)
+      # mark as recently used, so it is evicted last
+      os.utime(path)
+    except (OSError, ValueError):
+      # missing, evicted while loading, or otherwise unusable
+      return None
+    return arrays
+
+  def store(self, key, arrays):
+    """
+      Stores results for a key, then evicts old results if the cache is too large.
+      @ In, key, str, hash of the dispatch inputs
+      @ In, arrays, dict, arrays by name to store
+      @ Out, None
+    """
+    handle, temp_path = tempfile.mkstemp(dir=self._location, suffix='.tmp')
+    try:
+      with os.fdopen(handle, 'wb') as temp:
+        np.savez(temp, **arrays)
+      os.replace(temp_path, self._path(key))
+    except OSError:
+      if os.path.exists(temp_path):
+        os.remove(temp_path)
+      raise
+    self._evict()
+
+  def _path(self, key):
+    """
+      Determines the file storing a key.
+      @ In, key, str, hash of the dispatch inputs
+      @ Out, path, str, path to stored results
+    """
+    return os.path.join(self._location, f'{key}.npz')
+
+  def _evict(self):
+    """
+      Removes the least recently used results until the cache fits in its maximum size.
+      Only one process evicts at a time; others skip eviction while the lock is held.
+      @ In, None
+      @ Out, None
+    """
+    lock = os.path.join(self._location, self.lock_name)
+    try:
+      os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except FileExistsError:
+      try:
+        if time.time() - os.path.getmtime(lock) > self.stale_lock:
+          os.remove(lock)
+      except OSError:
+        pass
+      return
+    try:
+      entries = []
+      for entry in os.scandir(self._location):
+        if entry.name.endswith('.npz'):
+          try:
+            stat = entry.stat()
+          except OSError:
+            continue
+          entries.append((stat.st_mtime, stat.st_size, entry.path))
+      total = sum(size for _, size, _ in entries)
+      for _, size, path in sorted(entries):
+        if total <= self._max_bytes:
+          break
+        try:
+          os.remove(path)
+        except OSError:
+          pass
+        total -= size
+    finally:
+      os.remove(lock)
+
+def _update_hash(digest, item):
+  """
+    Adds an item to a hash, recursing through containers.
+    @ In, digest, hashlib hash, hash to update
+    @ In, item, object, item to add
+    @ Out, None
+  """
+  if isinstance(item, dict):
+    digest.update(b'dict')
+    for key in sorted(item, key=str):
+      _update_hash(digest, str(key))
+      _update_hash(digest, item[key])
+  elif isinstance(item, (list, tuple)):
+    digest.update(b'list')
+    for sub in item:
+      _update_hash(digest, sub)
+  elif isinstance(item, np.ndarray) and item.dtype != object:
+    digest.update(f'array{item.dtype.str}{item.shape}'.encode())
+    digest.update(np.ascontiguousarray(item).tobytes())
+  elif isinstance(item, np.ndarray):
+    _update_hash(digest, item.tolist())
+  else:
+    digest.update(repr(item).encode())
@@ -9,6 +9,7 @@
 import os
 import sys
 import pickle as pk
+import tempfile
 from time import time as run_clock
 
 import numpy as np
@@ -16,6 +17,11 @@ from typing_extensions import final
 
 from . import _utils as hutils
 from . import SerializationManager
+from . import EvaluationCounter
+from .DispatchCache import DispatchCache
+from .DispatchStream import DispatchStream
+from .PhaseProfiler import PhaseProfiler
+from .dispatch.DispatchState import NumpyState
 
 raven_path = hutils.get_raven_loc()
 sys.path.append(raven_path)
@@ -52,6 +58,11 @@ class DispatchRunner:
     self._sources = None           # HERON sources (placeholders) list
     self._override_time = None     # override for micro parameter
     self._save_dispatch = False    # if True then maintain and return full dispatch record
+    self._cache = None             # DispatchCache for reusing dispatch results, if requested
+    self._lib_hash = None          # hash of the HERON library file, identifying the problem setup
+    self._capacities = {}          # capacities set on components, by component name
+    self._stream = None            # DispatchStream holding the dispatch on disk, if streaming
+    self._profiler = PhaseProfiler() # records time and memory of run phases, if requested
 
   #####################
   # API
@@ -69,6 +80,7 @@ class DispatchRunner:
       @ In, path, str, path (including filename) to HERON library
       @ Out, None
     """
+    start = run_clock()
     case, components, sources = SerializationManager.load_heron_lib(path, retry=6)
     # arguments
     self._case = case              # HERON case
@@ -78,6 +90,49 @@ class DispatchRunner:
     self._dispatcher = self._case.dispatcher
     if self._case.debug['enabled']:
       self._save_dispatch = True
+    self._profiler = PhaseProfiler.from_settings(self._case, start=start)
+    self._profiler.record('load_heron_lib', run_clock() - start)
+    EvaluationCounter.enable_from_settings(self._case)
+    cache_settings = self._case.data_handling.get('dispatch_cache')
+    if cache_settings is not None:
+      self._cache = DispatchCache(cache_settings['location'], cache_settings['max_size'])
+      with open(path, 'rb') as lib:
+        self._lib_hash = DispatchCache.hash_inputs(lib.read())
+
+  def set_capacities(self, capacities):
+    """
+      Sets the capacities of HERON components.
+      @ In, capacities, dict, new capacity for each component name; components not included are unchanged
+      @ Out, None
+    """
+    for comp in self._components:
+      if comp.name in capacities:
+        comp.set_capacity(capacities[comp.name])
+        self._capacities[comp.name] = capacities[comp.name]
+
+  def get_profiler(self):
+    """
+      Provides the profiler recording the phases of this run.
+      @ In, None
+      @ Out, profiler, PhaseProfiler, profiler (possibly disabled)
+    """
+    return self._profiler
+
+  def get_dispatcher(self):
+    """
+      Provides the dispatcher loaded from the HERON library.
+      @ In, None
+      @ Out, dispatcher, Dispatcher, dispatcher instance
+    """
+    return self._dispatcher
+
+  def get_capacities(self):
+    """
+      Provides the capacities set on HERON components through "set_capacities".
+      @ In, None
+      @ Out, capacities, dict, capacity for each component name
+    """
+    return dict(self._capacities)
 
   def extract_variables(self, raven, raven_dict):
     """
@@ -123,12 +178,14 @@ class DispatchRunner:
         pass_vars[magic] = float(val)
 
     # component capacities
+    capacities = {}
     for comp in self._components:
       name = self.naming_template['comp capacity'].format(comp=comp.name)
       update_capacity = raven_dict.get(name) # TODO is this ever not provided?
       if update_capacity is not None:
-        comp.set_capacity(update_capacity)
+        capacities[comp.name] = update_capacity
         pass_vars[f'{comp.name}_capacity'] = update_capacity
+    self.set_capacities(capacities)
     # TODO other case, component properties
 
     # check macro parameter
@@ -181,7 +238,8 @@ class DispatchRunner:
     self._check_time(raven_vars)
     self._check_signals(raven_vars)
     # determine analysis structure
-    all_structure = self._get_structure(raven_vars)
+    with self._profiler.phase('get_structure'):
+      all_structure = self._get_structure(raven_vars)
     # just need the summary info for now
     structure = all_structure['summary']
     # set up evaluation loops
@@ -215,33 +273,11 @@ class DispatchRunner:
       @ In, all_dispatch, dict, dispatch values
       @ In, metrics, dict, economic metrics
     """
-    template = self.naming_template['dispatch var']
-    for y, (year, year_data) in enumerate(all_dispatch.items()):
-      for c, (cluster, dispatch) in enumerate(year_data.items()):
-        dispatches = dispatch.create_raven_vars(template)
-        # set up index map, first time only
-        if y == c == 0:
-          # string names
-          year_name = self._case.get_year_name()
-          clst_name = '_ROM_Cluster'
-          time_name = self._case.get_time_name()
-          # number of entries for each dim
-          n_year = len(all_dispatch)
-          n_clst = len(year_data)
-          n_time = len(dispatch._times) # NOTE assuming same across clusters!
-          # set indices on raven
-          setattr(raven, time_name, np.asarray(dispatch._times))
-          setattr(raven, year_name, np.asarray(list(all_dispatch.keys())))
-          setattr(raven, clst_name, np.arange(n_clst))
-          if not getattr(raven, '_indexMap', None):
-            raven._indexMap = np.atleast_1d({})
-        for var_name, data in dispatches.items():
-          # if first time, initialize data structure
-          if y == c == 0:
-            shape = (n_year, n_clst, n_time)
-            setattr(raven, var_name, np.empty(shape)) # NOTE could use np.zeros, but slower?
-          getattr(raven, var_name)[y, c] = data
-          getattr(raven, '_indexMap')[0][var_name] = [year_name, clst_name, time_name]
+    if self._stream is not None:
+      if self._save_dispatch:
+        self._save_streamed_variables(raven)
+    elif all_dispatch:
+      self._save_dispatch_variables(raven, all_dispatch)
     for metric, value in metrics.items():
       setattr(raven, metric, np.atleast_1d(value))
     # if component capacities weren't given by Outer, save them as part of Inner
@@ -253,6 +289,75 @@ class DispatchRunner:
 
   #####################
   # UTILITIES
+  def _save_dispatch_variables(self, raven, all_dispatch):
+    """
+      Saves dispatch activity on "raven" object for returning, filling one preallocated buffer
+      that holds all variables, years, clusters, and times.
+      @ In, raven, object, RAVEN object for setting values
+      @ In, all_dispatch, dict, dispatch results as {year: {cluster: DispatchState}}
+      @ Out, None
+    """
+    template = self.naming_template['dispatch var']
+    first_year = next(iter(all_dispatch.values()))
+    first = next(iter(first_year.values()))
+    # the variables are the same for every year and cluster, so find them once
+    layout = first.get_raven_var_layout(template)
+    # number of entries for each dim
+    n_year = len(all_dispatch)
+    n_clst = len(first_year)
+    n_time = len(first._times) # NOTE assuming same across clusters!
+    buffer = np.empty((len(layout), n_year, n_clst, n_time), dtype=self._dispatch_dtype())
+    for y, year_data in enumerate(all_dispatch.values()):
+      for c, dispatch in enumerate(year_data.values()):
+        for v, (_, comp, tracker, r) in enumerate(layout):
+          buffer[v, y, c] = dispatch.get_activity_vector(comp, tracker, r)
+    variables = [var_name for var_name, _, _, _ in layout]
+    self._set_dispatch_variables(raven, variables, buffer, list(all_dispatch.keys()), first._times)
+
+  def _save_streamed_variables(self, raven):
+    """
+      Saves dispatch activity on "raven" object for returning, reading it back from the streamed file.
+      @ In, raven, object, RAVEN object for setting values
+      @ Out, None
+    """
+    variables, buffer, times = self._stream.read()
+    if variables:
+      self._set_dispatch_variables(raven, variables, buffer, self._stream.get_years(), times)
+
+  def _set_dispatch_variables(self, raven, variables, buffer, years, times):
+    """
+      Sets dispatch variables and their indices on "raven" object.
+      @ In, raven, object, RAVEN object for setting values
+      @ In, variables, list(str), names of dispatch variables
+      @ In, buffer, np.array, activity for each (variable, year, cluster, time)
+      @ In, years, list, analysis years
+      @ In, times, list, time values for each segment
+      @ Out, None
+    """
+    # string names
+    year_name = self._case.get_year_name()
+    clst_name = '_ROM_Cluster'
+    time_name = self._case.get_time_name()
+    # set indices on raven
+    setattr(raven, time_name, np.asarray(times))
+    setattr(raven, year_name, np.asarray(years))
+    setattr(raven, clst_name, np.arange(buffer.shape[2]))
+    if not getattr(raven, '_indexMap', None):
+      raven._indexMap = np.atleast_1d({})
+    index_map = raven._indexMap[0]
+    # each variable is a view into the shared buffer
+    for v, var_name in enumerate(variables):
+      setattr(raven, var_name, buffer[v])
+      index_map[var_name] = [year_name, clst_name, time_name]
+
+  def _dispatch_dtype(self):
+    """
+      Determines the floating point type for saved dispatch activity.
+      @ In, None
+      @ Out, dtype, type, floating point type
+    """
+    return np.float32 if self._case.data_handling.get('dispatch_precision') == 'float32' else float
+
   def _do_dispatch(self, meta, all_structure, project_life, interp_years, segs, seg_type):
     """
       perform dispatching
@@ -269,27 +374,164 @@ class DispatchRunner:
     active_index = {}
     dispatch_results = {}
     yearly_cluster_data = next(iter(all_structure['details'].values()))['clusters']
-    for year in range(project_life):
-      interp_year = interp_years[year] if len(interp_years) > 1 else (interp_years[0] + year)
-      if self._save_dispatch:
-        dispatch_results[interp_year] = {}
-      # If the ARMA is interpolated, we need to track which year we're in.
-      # Otherwise, use just the nominal first year.
-      active_index['year'] = year if len(range(*structure['interpolated'])) > 1 else 0 # FIXME MacroID not year
-      for s, seg in enumerate(segs):
-        multiplicity = self._update_meta_for_segment(meta, seg, interp_year, yearly_cluster_data,
-                                                     interp_years, active_index, all_structure)
-        # perform dispatch
-        dispatch = self._dispatcher.dispatch(self._case, self._components, self._sources, meta)
-        if self._save_dispatch:
-          dispatch_results[interp_year][seg] = dispatch
-        # build evaluation cash flows
-        self._segment_cashflow(meta, s, seg, year, dispatch, multiplicity,
-                               project_life, interp_years, all_structure, final_components)
+    # dispatchers may solve the segments of several years together
+    batch_years = self._dispatcher.get_batch_years()
+    batched = {}
+    # optionally write each segment to disk as it is solved, instead of keeping all years in memory
+    template = self.naming_template['dispatch var']
+    stream_settings = self._case.data_handling.get('dispatch_stream')
+    if stream_settings is not None:
+      years = [interp_years[year] if len(interp_years) > 1 else (interp_years[0] + year)
+               for year in range(project_life)]
+      names = (self._case.get_year_name(), '_ROM_Cluster', self._case.get_time_name())
+      self._stream = DispatchStream(os.path.abspath(stream_settings['file']), years, len(segs), names,
+                                    compression=stream_settings['compression'], dtype=self._dispatch_dtype())
+    # if a segment fails, the streamed file keeps the segments solved so far
+    completed = False
+    try:
+      for year in range(project_life):
+        interp_year = interp_years[year] if len(interp_years) > 1 else (interp_years[0] + year)
+        if self._save_dispatch and self._stream is None:
+          dispatch_results[interp_year] = {}
+        # If the ARMA is interpolated, we need to track which year we're in.
+        # Otherwise, use just the nominal first year.
+        active_index['year'] = year if len(range(*structure['interpolated'])) > 1 else 0 # FIXME MacroID not year
+        if batch_years > 0 and year % batch_years == 0:
+          with self._profiler.phase('dispatch_batch', year=year):
+            batched = self._dispatch_batch(meta, range(year, min(year + batch_years, project_life)), segs,
+                                           interp_years, yearly_cluster_data, all_structure)
+        for s, seg in enumerate(segs):
+          with self._profiler.phase('dispatch', year=year, segment=seg):
+            multiplicity = self._update_meta_for_segment(meta, seg, interp_year, yearly_cluster_data,
+                                                         interp_years, active_index, all_structure)
+            # reuse the dispatch from an identical earlier segment, if available
+            cache_key = None
+            cached = None
+            if self._cache is not None:
+              cache_key = self._cache_key(meta)
+              cached = self._load_cached(cache_key, meta)
+            if cached is not None:
+              dispatch, hourly_cashflows = cached
+            else:
+              hourly_cashflows = None
+              # perform dispatch
+              dispatch = batched.get((year, seg))
+              if dispatch is None:
+                dispatch = self._dispatcher.dispatch(self._case, self._components, self._sources, meta)
+          if self._stream is not None:
+            with self._profiler.phase('stream_dispatch', year=year, segment=seg):
+              self._stream.write(year, s, dispatch, template)
+          elif self._save_dispatch:
+            dispatch_results[interp_year][seg] = dispatch
+          # build evaluation cash flows
+          with self._profiler.phase('segment_cashflow', year=year, segment=seg):
+            hourly_cashflows = self._segment_cashflow(meta, s, seg, year, dispatch, multiplicity,
+                                                      project_life, interp_years, all_structure, final_components,
+                                                      hourly_cashflows=hourly_cashflows)
+          if cache_key is not None and cached is None:
+            self._store_cached(cache_key, dispatch, hourly_cashflows)
+      completed = True
+    finally:
+      if self._stream is not None:
+        self._stream.close(complete=completed)
+      self._dispatcher.finalize()
     # TEAL, take it away.
-    cf_metrics = self._final_cashflow(meta, final_components, final_settings)
+    with self._profiler.phase('final_cashflow'):
+      cf_metrics = self._final_cashflow(meta, final_components, final_settings)
     return dispatch_results, cf_metrics
 
+  def _dispatch_batch(self, meta, years, segs, interp_years, yearly_cluster_data, all_structure):
+    """
+      Dispatches the segments of several years together
+      @ In, meta, dict, dictionary of passthrough variables
+      @ In, years, range, project years to dispatch
+      @ In, segs, list(int), segments/clusters/divisions
+      @ In, interp_years, list, actual analysis tagged years (e.g. range(2015, 2045))
+      @ In, yearly_cluster_data, dict, cluster information for each year
+      @ In, all_structure, dict, structure of ARMA sample/realization
+      @ Out, batched, dict, dispatch results as {(year, seg): DispatchState}
+    """
+    structure = all_structure['summary']
+    keys = []
+    metas = []
+    for year in years:
+      interp_year = interp_years[year] if len(interp_years) > 1 else (interp_years[0] + year)
+      for seg in segs:
+        # each segment needs its own copy of the segment-specific information
+        seg_meta = dict(meta)
+        seg_meta['HERON'] = dict(meta['HERON'])
+        active_index = {'year': year if len(range(*structure['interpolated'])) > 1 else 0} # FIXME MacroID not year
+        self._update_meta_for_segment(seg_meta, seg, interp_year, yearly_cluster_data,
+                                      interp_years, active_index, all_structure)
+        if self._cache is not None and self._cache.contains(self._cache_key(seg_meta)):
+          continue
+        keys.append((year, seg))
+        metas.append(seg_meta)
+    if not metas:
+      return {}
+    dispatches = self._dispatcher.dispatch_batch(self._case, self._components, self._sources, metas)
+    return dict(zip(keys, dispatches))
+
+  def _cache_key(self, meta):
+    """
+      Identifies a segment dispatch by hashing everything its results depend on.
+      @ In, meta, dict, auxiliary information, already updated for the segment
+      @ Out, key, str, hash of the segment dispatch inputs
+    """
+    # sliced RAVEN vars include the signals, capacities, and dispatch variables for this segment, so
+    # identical segments share results across years and divisions; Functions may use the active
+    # year and division directly, though, so then they are part of the key
+    active_index = None
+    if any(source.is_type('Function') for source in self._sources):
+      active_index = meta['HERON']['active_index']
+    return DispatchCache.hash_inputs(self._lib_hash,
+                                     type(self._dispatcher).__name__,
+                                     self._dispatcher.get_result_settings(),
+                                     active_index,
+                                     meta['HERON']['RAVEN_vars'])
+
+  def _load_cached(self, key, meta):
+    """
+      Loads a stored segment dispatch and its hourly cashflows.
+      @ In, key, str, hash of the segment dispatch inputs
+      @ In, meta, dict, auxiliary information
+      @ Out, cached, tuple, (NumpyState dispatch, dict hourly cashflows) or None if not stored
+    """
+    arrays = self._cache.load(key)
+    if arrays is None:
+      return None
+    dispatch = NumpyState()
+    dispatch.initialize(self._components, meta['HERON']['resource_indexer'], arrays['time'])
+    activity = {}
+    hourly_cashflows = {}
+    for name, values in arrays.items():
+      kind, _, entry = name.partition('|')
+      if kind == 'dispatch':
+        activity[entry] = values
+      elif kind == 'cashflow':
+        comp_name, cf_name = entry.split('|')
+        hourly_cashflows[(comp_name, cf_name)] = float(values)
+    dispatch.set_data(activity)
+    return dispatch, hourly_cashflows
+
+  def _store_cached(self, key, dispatch, hourly_cashflows):
+    """
+      Stores a segment dispatch and its hourly cashflows for reuse.
+      @ In, key, str, hash of the segment dispatch inputs
+      @ In, dispatch, DispatchState, dispatch results
+      @ In, hourly_cashflows, dict, hourly cashflow totals as {(comp name, cashflow name): total}
+      @ Out, None
+    """
+    if not isinstance(dispatch, NumpyState):
+      # only NumpyState results can be rebuilt from stored arrays
+      return
+    arrays = {'time': np.asarray(dispatch._times)}
+    for entry, values in dispatch.get_data().items():
+      arrays[f'dispatch|{entry}'] = values
+    for (comp_name, cf_name), total in hourly_cashflows.items():
+      arrays[f'cashflow|{comp_name}|{cf_name}'] = np.asarray(total)
+    self._cache.store(key, arrays)
+
   def _build_econ_objects(self, heron_case, heron_components, project_life):
     """
       Generates CashFlow.CashFlow instances from HERON CashFlow instances
@@ -384,12 +626,16 @@ class DispatchRunner:
     return multiplicity
 
   def _segment_cashflow(self, meta, s, seg, year, dispatch, multiplicity,
-                        project_life, interp_years, all_structure, final_components) -> None:
+                        project_life, interp_years, all_structure, final_components,
+                        hourly_cashflows=None) -> dict:
     """
       Update TEAL CashFlow objects with new dispatch information for a segment
       @ In, TODO
-      @ Out, None
+      @ In, hourly_cashflows, dict, optional, if provided then previously-evaluated hourly cashflow totals
+                                    for this segment, as {(comp name, cashflow name): total}
+      @ Out, hourly_totals, dict, hourly cashflow totals for this segment (without multiplicity)
     """
+    hourly_totals = {}
     # LOCAL component cashflows are SPECIFIC TO A DIVISION
     _, local_comps = self._build_econ_objects(self._case, self._components, project_life)
     meta['HERON']['active_index'] = {'year': year if len(interp_years) > 1 else 0, 'division': seg,}
@@ -463,6 +709,12 @@ class DispatchRunner:
               final_cf._yearlyCashflow[year + 1] += contrib
           # hourly recurring need iteration over time
           elif heron_cf.get_period() == 'hour':
+            if hourly_cashflows is not None:
+              total = hourly_cashflows[(comp.name, heron_cf.name)]
+              hourly_totals[(comp.name, heron_cf.name)] = total
+              final_cf._yearlyCashflow[year+1] += total * multiplicity
+              continue
+            total = 0
             for t, time in enumerate(times):
               # fill in the specific activity for this time stamp
               for track_var in comp.get_tracking_vars():
@@ -478,6 +730,8 @@ class DispatchRunner:
               params = heron_cf.calculate_params(specific_meta) # a, D, Dp, x, cost
               contrib = params['cost'] * multiplicity
               final_cf._yearlyCashflow[year+1] += contrib
+              total += params['cost']
+            hourly_totals[(comp.name, heron_cf.name)] = total
           else:
             raise NotImplementedError(
                 f'Unrecognized Recurring period for "{comp.name}" cashflow "{heron_cf.name}": {heron_cf.get_period()}'
@@ -489,6 +743,7 @@ class DispatchRunner:
         # end CashFlow type if
       # end CashFlow per Component loop
     # end Component loop
+    return hourly_totals
 
   def _final_cashflow(self, meta, final_components, final_settings) -> dict:
     """
@@ -719,14 +974,46 @@ class DispatchManager(ExternalModelPluginBase):
     runner = DispatchRunner()
     # load library file
     runner.load_heron_lib(path)
+    profiler = runner.get_profiler()
     # load data from RAVEN
-    raven_vars = runner.extract_variables(raven, raven_dict)
+    with profiler.phase('extract_variables'):
+      raven_vars = runner.extract_variables(raven, raven_dict)
     # TODO clustering, multiyear, etc?
     # add settings from readMoreXML
     override_time = getattr(raven, '_override_time', None)
     if override_time is not None:
       runner.override_time(override_time) # TODO setter
+    # optionally store the inputs, so this run can be replayed without RAVEN (see replay_dispatch.py)
+    capture_dir = os.environ.get('HERON_DISPATCH_CAPTURE')
+    if capture_dir:
+      self._capture_inputs(capture_dir, path, raven_vars, runner.get_capacities(), override_time)
     dispatch, metrics = runner.run(raven_vars)
-    runner.save_variables(raven, dispatch, metrics)
-
-
+    with profiler.phase('save_variables'):
+      runner.save_variables(raven, dispatch, metrics)
+    # summary goes with this inner run's outputs
+    profile_path = profiler.write(os.getcwd())
+    if profile_path is not None:
+      print(f'HERON: wrote inner run profile to "{profile_path}"')
+    counts_path = EvaluationCounter.write(os.getcwd())
+    if counts_path is not None:
+      print(f'HERON: wrote inner run evaluation counts to "{counts_path}"')
+
+  def _capture_inputs(self, capture_dir, lib_path, raven_vars, capacities, override_time):
+    """
+      Stores the inputs of this run for offline replay.
+      @ In, capture_dir, str, directory in which to store the inputs
+      @ In, lib_path, str, path to the HERON library file
+      @ In, raven_vars, dict, variables extracted from RAVEN
+      @ In, capacities, dict, component capacities by component name
+      @ In, override_time, list, arguments for np.linspace to override the time discretization, or None
+      @ Out, None
+    """
+    os.makedirs(capture_dir, exist_ok=True)
+    capture = {'heron_lib': os.path.abspath(lib_path),
+               'raven_vars': raven_vars,
+               'capacities': capacities,
+               'override_time': override_time}
+    handle, capture_path = tempfile.mkstemp(prefix='dispatch_', suffix='.pk', dir=capture_dir)
+    with os.fdopen(handle, 'wb') as capture_file:
+      pk.dump(capture, capture_file)
+    print(f'HERON: captured dispatch inputs to "{capture_path}"')
@@ -0,0 +1,144 @@
+# Copyright 2020, Battelle Energy Alliance, LLC
+# ALL RIGHTS RESERVED
+"""
+  Streams dispatch results to disk one segment at a time.
+"""
+import numpy as np
+try:
+  import netCDF4
+except ImportError:
+  # only needed if streaming is requested
+  netCDF4 = None
+
+class DispatchStream:
+  """
+    Writes the dispatch of each solved segment to a chunked, compressed NetCDF4 (HDF5) file, so the
+    dispatch of the full project life does not need to be held in memory. Each segment is flushed to
+    disk once written, so results up to a failing segment survive; unsolved entries are NaN.
+  """
+  def __init__(self, path, years, n_clst, names, compression=4, dtype=float):
+    """
+      Constructor. The file is created when the first segment is written, since the time
+      discretization and dispatch variables are only known then.
+      @ In, path, str, file to write
+      @ In, years, list, analysis years (e.g. range(2025, 2055))
+      @ In, n_clst, int, number of segments/clusters in each year
+      @ In, names, tuple(str), names for the (year, cluster, time) dimensions
+      @ In, compression, int, optional, zlib compression level (0 for none, up to 9)
+      @ In, dtype, type, optional, floating point type for dispatch activity
+      @ Out, None
+    """
+    if netCDF4 is None:
+      raise IOError('Streaming dispatch output requires the "netCDF4" python library, which was not found!')
+    self._path = path
+    self._years = np.asarray(list(years))
+    self._n_clst = n_clst
+    self._names = names
+    self._compression = compression
+    self._dtype = np.dtype(dtype)
+    self._dataset = None           # open netCDF4 Dataset, once created
+    self._layout = None            # (variable name, component, tracker, resource index) for each variable
+    self._times = None             # time values for each segment
+
+  def write(self, y, c, dispatch, template):
+    """
+      Writes the dispatch of one segment and flushes it to disk.
+      @ In, y, int, index of the project year
+      @ In, c, int, index of the segment/cluster
+      @ In, dispatch, DispatchState, dispatch of the segment
+      @ In, template, str, formating string for variable names (using {comp}, {tracker}, {res})
+      @ Out, None
+    """
+    if self._dataset is None:
+      self._create(dispatch, template)
+    for name, comp, tracker, r in self._layout:
+      self._dataset.variables[name][y, c, :] = dispatch.get_activity_vector(comp, tracker, r)
+    self._dataset.sync()
+
+  def close(self, complete=True):
+    """
+      Closes the file.
+      @ In, complete, bool, optional, False if the dispatch did not finish
+      @ Out, None
+    """
+    if self._dataset is None:
+      return
+    self._dataset.complete = int(complete)
+    self._dataset.close()
+    self._dataset = None
+
+  def read(self):
+    """
+      Reads all dispatch variables back from the (closed) file, one year at a time, so no more than
+      the returned buffer and one year of the dispatch are held in memory.
+      Segments that were not written (e.g. after a failure) are NaN.
+      @ In, None
+      @ Out, variables, list(str), names of dispatch variables
+      @ Out, buffer, np.array, activity for each (variable, year, cluster, time)
+      @ Out, times, np.array, time values for each segment
+    """
+    if self._layout is None:
+      return [], None, None
+    variables = [name for name, _, _, _ in self._layout]
+    buffer = np.empty((len(variables), len(self._years), self._n_clst, len(self._times)), dtype=self._dtype)
+    with netCDF4.Dataset(self._path, 'r') as dataset:
+      for y in range(len(self._years)):
+        for v, values in enumerate(self._read_year(dataset, y).values()):
+          buffer[v, y] = values
+    return variables, buffer, self._times
+
+  def read_year(self, y):
+    """
+      Reads the dispatch variables of one year back from the (closed) file.
+      Segments that were not written (e.g. after a failure) are NaN.
+      @ In, y, int, index of the project year
+      @ Out, year_data, dict, activity for each (cluster, time) by variable name
+    """
+    if self._layout is None:
+      return {}
+    with netCDF4.Dataset(self._path, 'r') as dataset:
+      return self._read_year(dataset, y)
+
+  def _read_year(self, dataset, y):
+    """
+      Reads the dispatch variables of one year from an open file.
+      @ In, dataset, netCDF4.Dataset, file opened for reading
+      @ In, y, int, index of the project year
+      @ Out, year_data, dict, activity for each (cluster, time) by variable name
+    """
+    # unwritten entries already hold the NaN fill value, so skip building masked arrays
+    dataset.set_auto_mask(False)
+    return dict((name, dataset.variables[name][y]) for name, _, _, _ in self._layout)
+
+  def get_years(self):
+    """
+      Provides the analysis years of the dispatch.
+      @ In, None
+      @ Out, years, np.array, analysis years
+    """
+    return self._years
+
+  def _create(self, dispatch, template):
+    """
+      Creates the file, with dimensions and variables laid out following the first dispatch.
+      @ In, dispatch, DispatchState, dispatch of the first segment
+      @ In, template, str, formating string for variable names (using {comp}, {tracker}, {res})
+      @ Out, None
+    """
+    year_name, clst_name, time_name = self._names
+    self._layout = dispatch.get_raven_var_layout(template)
+    self._times = np.asarray(dispatch._times) # NOTE assuming same across clusters!
+    dataset = netCDF4.Dataset(self._path, 'w', format='NETCDF4')
+    dataset.createDimension(year_name, len(self._years))
+    dataset.createDimension(clst_name, self._n_clst)
+    dataset.createDimension(time_name, len(self._times))
+    dataset.createVariable(year_name, self._years.dtype, (year_name,))[:] = self._years
+    dataset.createVariable(clst_name, int, (clst_name,))[:] = np.arange(self._n_clst)
+    dataset.createVariable(time_name, self._times.dtype, (time_name,))[:] = self._times
+    # one chunk per segment, so each write touches only its own chunk
+    for name, _, _, _ in self._layout:
+      dataset.createVariable(name, self._dtype, (year_name, clst_name, time_name),
+                             zlib=self._compression > 0, complevel=self._compression,
+                             chunksizes=(1, 1, len(self._times)), fill_value=np.nan)
+    dataset.complete = 0
+    self._dataset = dataset
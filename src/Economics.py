@@ -10,6 +10,7 @@ import sys
 from collections import defaultdict
 import numpy as np
 from HERON.src import ValuedParams
+from HERON.src import EvaluationCounter
 from HERON.src.ValuedParamHandler import ValuedParamHandler
 import HERON.src._utils as hutils
 framework_path = hutils.get_raven_loc()
@@ -425,7 +426,7 @@ class CashFlow:
       @ Out, None
     """
     vp = ValuedParamHandler(name)
-    vp.set_const_VP(value)
+    vp.set_const_VP(value, owner='CashFlow \'{}\''.format(self.name))
     setattr(self, name, vp)
 
   def _set_valued_param(self, name, spec):
@@ -497,6 +498,8 @@ class CashFlow:
     params = self.calculate_params(values_dict)
     return params['cost']
 
+  @EvaluationCounter.counted(lambda cf, *args, **kwargs: (cf._component.name if cf._component is not None else None,
+                                                          cf.name, 'CashFlow'))
   def calculate_params(self, values_dict):
     """
       Calculates the value of the cash flow parameters.
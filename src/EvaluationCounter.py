@@ -0,0 +1,111 @@
+# Copyright 2020, Battelle Energy Alliance, LLC
+# ALL RIGHTS RESERVED
+"""
+  Counts calls and accumulates time for the evaluations that run on the dispatch and cashflow hot paths:
+  ValuedParamHandler.evaluate, CashFlow.calculate_params, and Function/ROM placeholder evaluations.
+  Those methods are decorated with "counted", which only checks a flag while counting is disabled.
+"""
+import os
+import csv
+import functools
+from time import time as run_clock
+
+env_var = 'HERON_EVALUATION_COUNTS'
+file_name = 'heron_evaluations.csv'
+
+_enabled = False
+_counts = {} # {(owner, parameter, kind): [calls, total time]}
+
+def enable_from_settings(case):
+  """
+    Turns counting on if requested by the environment or by the Case debug settings, and off
+    otherwise, and clears any counts from previous runs.
+    @ In, case, HERON Case, case with debug settings
+    @ Out, enabled, bool, True if counting
+  """
+  set_enabled(bool(os.environ.get(env_var) or case.debug.get('evaluation_counts')))
+  reset()
+  return _enabled
+
+def set_enabled(enabled):
+  """
+    Turns counting on or off.
+    @ In, enabled, bool, True to count evaluations
+    @ Out, None
+  """
+  global _enabled
+  _enabled = enabled
+
+def is_enabled():
+  """
+    Checks if counting is enabled.
+    @ In, None
+    @ Out, enabled, bool, True if counting
+  """
+  return _enabled
+
+def reset():
+  """
+    Clears all counts.
+    @ In, None
+    @ Out, None
+  """
+  _counts.clear()
+
+def ranked():
+  """
+    Provides the counts, ranked by total time.
+    Note the times are inclusive, e.g. CashFlow times include the times of their ValuedParams.
+    @ In, None
+    @ Out, ranked, list, (owner, parameter, kind, calls, total time) tuples, most expensive first
+  """
+  entries = [key + tuple(value) for key, value in _counts.items()]
+  return sorted(entries, key=lambda entry: entry[4], reverse=True)
+
+def write(location):
+  """
+    Writes the ranked counts to file.
+    @ In, location, str, directory in which to write
+    @ Out, path, str, path to the written file, or None if counting is disabled
+  """
+  if not _enabled:
+    return None
+  path = os.path.join(location, file_name)
+  with open(path, 'w', newline='') as f:
+    writer = csv.writer(f)
+    writer.writerow(['rank', 'owner', 'parameter', 'kind', 'calls', 'total_time', 'mean_time'])
+    for rank, (owner, param, kind, calls, total) in enumerate(ranked(), start=1):
+      writer.writerow([rank, owner, param, kind, calls, total, total / calls])
+  return path
+
+def counted(key_function):
+  """
+    Decorates a method so its calls are counted and timed while counting is enabled.
+    @ In, key_function, callable, builds the (owner, parameter, kind) key from the call arguments
+    @ Out, decorator, callable, method decorator
+  """
+  def decorator(method):
+    """
+      Wraps a method with the counter.
+      @ In, method, callable, method to count
+      @ Out, counted_method, callable, counting method
+    """
+    @functools.wraps(method)
+    def counted_method(*args, **kwargs):
+      """
+        Calls the wrapped method, recording the call if counting.
+        @ In, args, list, positional arguments
+        @ In, kwargs, dict, keyword arguments
+        @ Out, result, object, result of wrapped method
+      """
+      if not _enabled:
+        return method(*args, **kwargs)
+      start = run_clock()
+      try:
+        return method(*args, **kwargs)
+      finally:
+        entry = _counts.setdefault(key_function(*args, **kwargs), [0, 0.0])
+        entry[0] += 1
+        entry[1] += run_clock() - start
+    return counted_method
+  return decorator
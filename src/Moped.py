@@ -8,12 +8,19 @@ import os
 import sys
 from functools import partial
 import itertools as it
+import multiprocessing
 
 import pyomo.environ as pyo
-from pyomo.opt import SolverFactory
+from pyomo.opt import SolverFactory, TerminationCondition
+from pyomo.core.expr import polynomial_degree
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
+try:
+  import netCDF4
+except ImportError:
+  # only needed if dispatch output is requested
+  netCDF4 = None
 
 from HERON.src import _utils as hutils
 from HERON.src.base import Base
@@ -26,6 +33,25 @@ from TEAL.src import CashFlows
 import externalROMloader as ROMloader
 from ravenframework.MessageHandler import MessageHandler
 
+# MOPED instance whose problems are solved by forked worker processes
+_worker_moped = None
+
+def _solveBendersSubproblem(task):
+  """
+    Solves one Benders subproblem in a worker process
+    @ In, task, tuple, (realization, year, capacities) as arguments to MOPED.solveSubproblem
+    @ Out, result, tuple, see MOPED.solveSubproblem
+  """
+  return _worker_moped.solveSubproblem(*task)
+
+def _solveSweepPoint(point):
+  """
+    Solves the problem for one combination of swept capacities in a worker process
+    @ In, point, tuple, swept capacities as argument to MOPED.solveSweepPoint
+    @ Out, result, tuple, see MOPED.solveSweepPoint
+  """
+  return _worker_moped.solveSweepPoint(point)
+
 class MOPED(Base):
   def __init__(self):
     """
@@ -45,11 +71,22 @@ class MOPED(Base):
     self._component_meta = {}             # Primary data structure for MOPED, organizes important information for problem construction
     self._cf_meta = {}                    # Secondary data structure for MOPED, contains cashflow info
     self._resources = []                  # List of resources used in this analysis
-    self._solver = SolverFactory('ipopt') # Solver for optimization solve, default is 'ipopt', TODO allow user to specify
+    self._solver = None                   # Solver for optimization solve, or None to choose from the problem structure
+    self._subproblem_solver = None        # Solver for Benders subproblems
     self._cf_components = []              # List of TEAL.Components objects generated for analysis
     self._dispatch = []                   # List of pyomo vars/params for each realization and year
     self._multiplicity_meta = {}          # Dictionary of analysis years, clusters, and associated multiplicity
+    self._mult_array = None               # Multiplicity of each [year, hour of year], for weighting hourly cashflows
+    self._hourly_cashflows = []           # (component name, alpha, dispatch, TEAL cashflow) for each hourly cashflow
     self._plot = False                    # Boolean to determine if a dispatch plot is made for the analysis (defaults to false)
+    self._seed = None                     # Seed for sampling synthetic histories, or None to not reseed
+    self._rom_runners = {}                # Synthetic history ROM runner for each evaluation mode, loaded once
+    self._synthetic_cache = {}            # Unscaled synthetic history samples by (source, signal, eval mode, samples, seed)
+    self._subproblems = {}                # Benders dispatch subproblem for each (realization, year)
+    self._realization_weights = None      # Probability of each (possibly representative) realization
+    self._sweep_values = {}               # Values of each swept capacity, by component name
+    self._sweep_solver = None             # Solver for capacity sweeps
+    self._dispatch_template = 'Dispatch__{comp}__{tracker}__{res}' # Same naming as the standard workflow dispatch
 
     self.messageHandler = MessageHandler()
 
@@ -69,9 +106,7 @@ class MOPED(Base):
           if cf._period == 'year':
             activity.append(f'{comp.name}|Yearly')
             continue
-          # Necessary to have activity indicator account for multiple dispatch realizations
-          for real in range(self._case._num_samples):
-            activity.append(f'{comp.name}|Dispatching_{real+1}')
+          activity.append(f'{comp.name}|Dispatching')
     self.raiseADebug(f'Built activity Indicator: {activity}')
     return activity
 
@@ -128,7 +163,7 @@ class MOPED(Base):
       @ In, None
       @ Out, None
     """
-    structure = hutils.get_synthhist_structure(self._sources[0]._target_file)
+    structure = hutils.get_synthhist_structure(self.getSyntheticSource()._target_file)
     cluster_years = sorted(structure['clusters'])
     for i in range(len(cluster_years)):
       self._multiplicity_meta[i+1] = {}
@@ -149,42 +184,186 @@ class MOPED(Base):
       @ In, multiplier, int/float, value to multiply synthetic history evaluations by
       @ Out, synthetic_data, dict, contains data from evaluated ROM
     """
-    # NOTE self._sources[0]._var_names are the user assigned signal names in DataGenerators
-    if signal not in self._sources[0]._var_names:
+    # NOTE _var_names are the user assigned signal names in DataGenerators
+    if signal not in self.getSyntheticSource()._var_names:
       raise IOError('The requested signal name is not available'
                     'from the synthetic history, check DataGenerators node in input')
-    # Initializing ravenROMexternal object gives PATH access to xmlUtils
-    runner = ROMloader.ravenROMexternal(self._sources[0]._target_file,
-                                        hutils.get_raven_loc())
-    from ravenframework.utils import xmlUtils
-    inp = {'scaling': [1]}
-    # TODO expand to change other pickledROM settings withing this method
-    nodes = []
-    node = xmlUtils.newNode('ROM', attrib={'name': 'SyntheticHistory', 'subType': 'pickledRom'})
-    node.append(xmlUtils.newNode('clusterEvalMode', text=self._eval_mode))
-    nodes.append(node)
-    runner.setAdditionalParams(nodes)
-    synthetic_data = {}
-    for real in range(self._case._num_samples):
-      self.raiseAMessage(f'Loading synthetic history for signal: {signal}')
-      name = f'Realization_{real + 1}'
-      current_realization = runner.evaluate(inp)[0]
-      # applying mult to each realization is easier than iteration through dict object later
-      current_realization[signal] *= multiplier
-      if self._eval_mode == 'full':
-        # reshape so that a filler cluster index is made
-        current_realization[signal] = np.expand_dims(current_realization[signal], axis=1)
-      synthetic_data[name] = current_realization[signal]
-    cluster_count = synthetic_data['Realization_1'].shape[1]
-    hour_count = synthetic_data['Realization_1'].shape[2]
-    self._m.c = pyo.Set(initialize=np.arange(cluster_count))
     if self._eval_mode not in ['clustered', 'full']:
       raise IOError('Improper ROM evaluation mode detected, try "clustered" or "full".')
-    # How many dispatch points we will have for each year
-    self._yearly_hours = hour_count * cluster_count
-    self._m.t = pyo.Set(initialize=np.arange(hour_count))
+    samples = self.sampleSyntheticHistory(signal)
+    # applying mult to all realizations at once is easier than iteration through dict object later
+    scaled = samples * multiplier
+    # Each realization is a view into the scaled samples, as [year, cluster, hour]
+    synthetic_data = dict((f'Realization_{real + 1}', scaled[real]) for real in range(len(scaled)))
+    if self._m.component('c') is None:
+      cluster_count = samples.shape[2]
+      hour_count = samples.shape[3]
+      self._m.c = pyo.Set(initialize=np.arange(cluster_count))
+      # How many dispatch points we will have for each year
+      self._yearly_hours = hour_count * cluster_count
+      self._m.t = pyo.Set(initialize=np.arange(hour_count))
     return synthetic_data
 
+  def sampleSyntheticHistory(self, signal):
+    """
+      Provides realizations of a signal, sampling all synthetic history signals MOPED needs together
+      the first time any is requested, and reusing them afterwards
+      @ In, signal, string, name of signal to sample
+      @ Out, samples, np.array, unscaled samples as [realization, year, cluster, hour]
+    """
+    key = self._syntheticKey(signal)
+    if key not in self._synthetic_cache:
+      signals = self.collectSyntheticSignals()
+      if signal not in signals:
+        signals.append(signal)
+      runner = self.loadSyntheticRunner()
+      if self._seed is not None:
+        from ravenframework.utils import randomUtils
+        randomUtils.randomSeed(self._seed)
+      self.raiseAMessage(f'Loading {self._case._num_samples} synthetic history realizations for signals: {signals}')
+      inp = {'scaling': [1]}
+      realizations = [runner.evaluate(inp)[0] for _ in range(self._case._num_samples)]
+      all_samples = {}
+      for name in signals:
+        samples = np.asarray([rlz[name] for rlz in realizations], dtype=float)
+        if self._eval_mode == 'full':
+          # reshape so that a filler cluster index is made
+          samples = np.expand_dims(samples, axis=2)
+        all_samples[name] = samples
+      selected = np.arange(self._case._num_samples)
+      self._realization_weights = np.full(self._case._num_samples, 1 / self._case._num_samples)
+      if 0 < self._case.moped['reduced_samples'] < self._case._num_samples:
+        selected, self._realization_weights = self.reduceScenarios(all_samples)
+      for name, samples in all_samples.items():
+        self._synthetic_cache[self._syntheticKey(name)] = samples[selected]
+    return self._synthetic_cache[key]
+
+  def reduceScenarios(self, samples):
+    """
+      Selects weighted representative realizations of the synthetic histories, considering all signals together
+      @ In, samples, dict, {signal: samples as [realization, year, cluster, hour]}
+      @ Out, selected, np.array, indices of representative realizations
+      @ Out, weights, np.array, probability of each representative realization
+    """
+    num_samples = self._case._num_samples
+    count = self._case.moped['reduced_samples']
+    method = self._case.moped['reduction_method']
+    # Signals are normalized so each contributes comparably to distances between realizations
+    features = []
+    for signal in samples.values():
+      flat = signal.reshape(num_samples, -1)
+      spread = flat.std()
+      features.append(flat / spread if spread > 0 else flat)
+    features = np.hstack(features)
+    squared = np.einsum('ij,ij->i', features, features)
+    distances = np.sqrt(np.maximum(squared[:, np.newaxis] + squared[np.newaxis, :] - 2 * features @ features.T, 0))
+    np.fill_diagonal(distances, 0)
+    probability = np.full(num_samples, 1 / num_samples)
+    # Fast forward selection: add the realization that most reduces the distance to the full set
+    cost = distances.copy()
+    remaining = np.ones(num_samples, dtype=bool)
+    selected = []
+    for _ in range(count):
+      candidates = np.flatnonzero(remaining)
+      candidate_costs = probability[remaining] @ cost[np.ix_(remaining, remaining)]
+      choice = candidates[np.argmin(candidate_costs)]
+      if not selected:
+        single_distance = candidate_costs.min()
+      selected.append(choice)
+      remaining[choice] = False
+      cost = np.minimum(cost, cost[:, [choice]])
+    selected = np.array(selected)
+    if method == 'kmedoids':
+      for _ in range(100):
+        nearest = np.argmin(distances[:, selected], axis=1)
+        medoids = selected.copy()
+        for k in range(count):
+          members = np.flatnonzero(nearest == k)
+          if len(members) == 0:
+            # duplicate realizations may leave a medoid without members
+            continue
+          medoids[k] = members[np.argmin(distances[np.ix_(members, members)].sum(axis=0))]
+        if np.array_equal(medoids, selected):
+          break
+        selected = medoids
+    # Each realization is represented by its nearest selected realization
+    nearest = np.argmin(distances[:, selected], axis=1)
+    weights = np.bincount(nearest, weights=probability, minlength=count)
+    distance = probability @ distances[np.arange(num_samples), selected[nearest]]
+    relative = distance / single_distance if single_distance > 0 else 0.0
+    self.raiseAMessage(f'Reduced {num_samples} synthetic history realizations to {count} with {method} selection; '
+                       f'distance to the full set is {distance:1.6e} ({relative:1.2%} of the distance with a single realization)')
+    output = self._case.moped['reduction_output']
+    if output is not None:
+      pd.DataFrame({'realization': selected + 1, 'weight': weights}).to_csv(output, index=False)
+    return selected, weights
+
+  def getRealizationWeights(self):
+    """
+      Provides the probability of each realization in the problem
+      @ In, None
+      @ Out, weights, np.array, probability of each realization
+    """
+    if self._realization_weights is None:
+      return np.full(self._case._num_samples, 1 / self._case._num_samples)
+    return self._realization_weights
+
+  def loadSyntheticRunner(self):
+    """
+      Loads the synthetic history ROM, only once for each evaluation mode
+      @ In, None
+      @ Out, runner, externalROMloader.ravenROMexternal, ROM runner set to the evaluation mode
+    """
+    if self._eval_mode not in self._rom_runners:
+      # Initializing ravenROMexternal object gives PATH access to xmlUtils
+      runner = ROMloader.ravenROMexternal(self.getSyntheticSource()._target_file,
+                                          hutils.get_raven_loc())
+      from ravenframework.utils import xmlUtils
+      # TODO expand to change other pickledROM settings withing this method
+      nodes = []
+      node = xmlUtils.newNode('ROM', attrib={'name': 'SyntheticHistory', 'subType': 'pickledRom'})
+      node.append(xmlUtils.newNode('clusterEvalMode', text=self._eval_mode))
+      nodes.append(node)
+      runner.setAdditionalParams(nodes)
+      self._rom_runners[self._eval_mode] = runner
+    return self._rom_runners[self._eval_mode]
+
+  def getSyntheticSource(self):
+    """
+      Finds the synthetic history ROM among the sources
+      @ In, None
+      @ Out, source, Placeholders.ARMA, source of synthetic histories
+    """
+    for source in self._sources:
+      if source.is_type('ARMA'):
+        return source
+    raise IOError('MOPED requires a synthetic history <ARMA> in the DataGenerators node of the input!')
+
+  def collectSyntheticSignals(self):
+    """
+      Searches through components for all signals taken from synthetic histories
+      @ In, None
+      @ Out, signals, list, names of signals used for capacities and cashflow prices
+    """
+    signals = []
+    for comp in self._components:
+      for element in comp._produces + comp._demands + comp._stores:
+        if element._capacity.type == 'SyntheticHistory':
+          signals.append(element._capacity._vp._var_name)
+      for cf in comp._economics._cash_flows:
+        if cf._alpha.type == 'SyntheticHistory':
+          signals.append(cf._alpha._vp._var_name)
+    return list(dict.fromkeys(signals))
+
+  def _syntheticKey(self, signal):
+    """
+      Identifies samples of a signal in the synthetic history cache
+      @ In, signal, string, name of signal
+      @ Out, key, tuple, (source, signal, evaluation mode, number of samples, seed, reduced samples, reduction method)
+    """
+    return (self.getSyntheticSource()._target_file, signal, self._eval_mode, self._case._num_samples, self._seed,
+            self._case.moped['reduced_samples'], self._case.moped['reduction_method'])
+
   def setCapacityMeta(self, mode, resource, comp, element, kind='produces'):
     """
       Checks the capacity type, dispatch type, and resources involved for each component
@@ -231,8 +410,18 @@ class MOPED(Base):
       # This is a capacity we make a decision on
       var = pyo.Var(initialize=0.5 * opt_bounds[1], bounds=(opt_bounds[0], opt_bounds[1]))
       setattr(self._m, f'{comp.name}', var)
-    elif mode == 'SweepValues':  # TODO Add capability to handle sweepvalues, maybe multiple pyo.Params?
-      raise IOError('MOPED does not currently support sweep values option')
+    elif mode == 'SweepValues':
+      self.raiseADebug(f'Building pyomo swept capacity parameter for '
+                       f'{comp.name}')
+      values = np.asarray(element._capacity._vp._parametric, dtype=float)
+      # Considering user inputs for default heron sign convention
+      if values.max() < 1:
+        values *= -1
+      values *= capacity_mult
+      # Mutable, so the same problem is solved again for each swept value
+      param = pyo.Param(initialize=values[0], mutable=True)
+      setattr(self._m, f'{comp.name}', param)
+      self._sweep_values[comp.name] = values
     elif mode == 'FixedValue':
       self.raiseADebug(f'Building pyomo capacity parameter for '
                        f'{comp.name}')
@@ -346,6 +535,35 @@ class MOPED(Base):
     cf.setParams(cfParams)
     return cf
 
+  def linearizeCapexScaling(self, comp, alpha, capacity, unique_params):
+    """
+      Replaces the economies of scale of a capex cashflow, (D/D_ref)^X, with a piecewise-linear
+      approximation over the capacity bounds
+      @ In, comp, HERON component
+      @ In, alpha, float, reference price for capex cost
+      @ In, capacity, pyomo var, size of the component that drives the cost
+      @ In, unique_params, dict, settings for inflation, tax, and mult for cf
+      @ Out, scaling, pyomo var, approximated (D/D_ref)^X, to use as driver
+      @ Out, linear_params, dict, settings for the cashflow with linear scaling of the driver
+    """
+    segments = self._case.moped['capex_segments']
+    reference = unique_params['reference']
+    scale = unique_params['X']
+    self.raiseADebug(f'Approximating capex scaling of {comp.name} with {segments} linear segments')
+    points = list(np.linspace(*capacity.bounds, segments + 1))
+    scaling = pyo.Var()
+    setattr(self._m, f'{comp.name}_capex_scaling', scaling)
+    # Costs only need a lower bound on the scaling (revenues an upper bound), which pyomo
+    # represents without binary variables when the scaling is convex (concave for revenues)
+    bound = 'LB' if alpha < 0 else 'UB'
+    piecewise = pyo.Piecewise(scaling, capacity, pw_pts=points, pw_constr_type=bound, pw_repn='INC',
+                              f_rule=lambda m, x: (x / reference) ** scale)
+    setattr(self._m, f'{comp.name}_capex_piecewise', piecewise)
+    linear_params = dict(unique_params)
+    linear_params['reference'] = 1
+    linear_params['X'] = 1
+    return scaling, linear_params
+
   def createRecurringYearly(self, comp, alpha, driver, unique_params):
     """
       Constructs the parameters for capital expenditures
@@ -372,33 +590,72 @@ class MOPED(Base):
     cf.computeYearlyCashflow(alphas, drivers)
     return cf
 
-  def createRecurringHourly(self, comp, alpha, driver, real, unique_params):
+  def createRecurringHourly(self, comp, unique_params):
     """
-      Generates recurring hourly cashflows, mostly for dispatch and sales
+      Generates the TEAL settings for recurring hourly cashflows, mostly for dispatch and sales.
+      Their NPV is linear in the dispatch, so it is built directly by buildHourlyNPV instead of through TEAL.
       @ In, comp, TEAL component
-      @ In, alpha, float/np.array, reference price of sale
-      @ In, driver, numpy array of pyomo.var.values that drive cost
-      @ In, real, int, current realization number
       @ In, unique_params, dict, settings for inflation, tax, and mult for cf
       @ Out, cf, TEAL cashflow
     """
-    # Necessary to make integer for numpy arrays
-    life = int(self._case._global_econ['ProjectTime'])
     cf = CashFlows.Recurring()
-    cfParams = {'name': f'Dispatching_{real+1}',
+    cfParams = {'name': 'Dispatching',
                 'X': unique_params['X'],
                 'mult_target': unique_params['mult_target'],
                 }
     cf.setParams(cfParams)
-    cf.initParams(life, pyomoVar=True)
-    # Necessary to shift year index by one since no recurring cashflows on first build year
-    for year in range(life + 1):
+    return cf
+
+  def buildHourlyNPV(self, hourly_cashflows=None):
+    """
+      Builds the NPV of all recurring hourly cashflows as a sparse linear expression of the dispatch.
+      Discounting, tax, and inflation for each year, the probability of each realization, and the
+      multiplicity of each cluster are collected into one numeric coefficient per dispatch variable.
+      Only the realizations and years of the current pyomo model are included.
+      @ In, hourly_cashflows, list, optional, (component name, alpha, dispatch, TEAL cashflow) for each
+                                    hourly cashflow, defaults to those of the full problem
+      @ Out, npv, pyomo expression, NPV of hourly cashflows
+    """
+    if hourly_cashflows is None:
+      hourly_cashflows = self._hourly_cashflows
+    project_life = int(self._case._global_econ['ProjectTime'])
+    weights = self.getRealizationWeights()
+    num_samples = len(weights)
+    # Project years with recurring cashflows, year zero is the build year
+    years = np.arange(1, project_life + 1)
+    discount = np.power(1.0 + self._econ_settings.getDiscountRate(), -years)
+    # Weighting each dispatch by the probability of its realization and multiplicity of its cluster
+    weight = weights[:, np.newaxis, np.newaxis] * self._mult_array[np.newaxis, :, :]
+    coefficients = []
+    variables = []
+    constant = 0.0
+    reals = list(self._m.r)
+    model_years = list(self._m.y)
+    for comp_name, alpha, dispatch, cf in hourly_cashflows:
+      self.raiseADebug(f'Building hourly NPV terms for {comp_name}')
+      # Same conventions TEAL applies to recurring cashflows
+      tax_mult = 1.0 - self._econ_settings.getTax() if cf.isTaxable() else 1.0
+      infl_rate = 1.0 + self._econ_settings.getInflation() if cf.isInflated() else 1.0
+      mult = cf.getMultiplier()
+      if mult is None:
+        mult = 1.0
+      yearly = mult * tax_mult * discount * np.power(infl_rate, -years)
       # Alpha can be a fixed single value price or an array of prices for each timestep
-      if isinstance(alpha, float):
-        cf.computeIntrayearCashflow(year, alpha, driver[year, :])
+      if isinstance(alpha, np.ndarray):
+        alpha = alpha[:, 1:, :]
+      coeffs = alpha * yearly[np.newaxis, :, np.newaxis] * weight
+      # Flattened [realization, year, hour] follows the dispatch index order
+      coeffs = np.broadcast_to(coeffs, (num_samples, project_life, self._yearly_hours))
+      coeffs = coeffs[np.ix_(reals, model_years)].ravel()
+      if dispatch.ctype is pyo.Param:
+        values = np.fromiter((dispatch[index] for index in dispatch), dtype=float, count=coeffs.size)
+        constant += float(coeffs @ values)
       else:
-        cf.computeIntrayearCashflow(year, alpha[year, :], driver[year, :])
-    return cf
+        nonzero = np.flatnonzero(coeffs)
+        data = list(dispatch.values())
+        coefficients.extend(coeffs[nonzero].tolist())
+        variables.extend(data[i] for i in nonzero)
+    return pyo.quicksum(c * v for c, v in zip(coefficients, variables)) + constant
 
   def collectResources(self):
     """
@@ -416,6 +673,18 @@ class MOPED(Base):
         if resource not in self._resources:
             self._resources.append(resource)
 
+  def buildIndexSets(self):
+    """
+      Generates pyomo sets for the realization and year indices of dispatch variables,
+      cluster and hour sets are built when loading synthetic histories
+      @ In, None
+      @ Out, None
+    """
+    project_life = int(self._case._global_econ['ProjectTime'])
+    self._m.r = pyo.Set(initialize=np.arange(len(self.getRealizationWeights())))
+    self._m.y = pyo.Set(initialize=np.arange(project_life))
+    self._m.resources = pyo.Set(initialize=self._resources)
+
   def buildMultiplicityVariables(self):
     """
       Generates pyomo params for applying multiplicity to dispatch vars/params
@@ -426,27 +695,21 @@ class MOPED(Base):
       self.raiseADebug('Building multiplicity vector for clustered ROM evaluation...')
     else:
       self.raiseADebug('Building multiplicity filler for full ROM evaluation...')
-    project_life = int(self._case._global_econ['ProjectTime'])
-    for year in range(project_life):
-      # Multiplicity used to scaled dispatches based on cluster and year
-      mult = pyo.Param(self._m.c, self._m.t,
-                          initialize=lambda m, c, t: self._multiplicity_meta[year+1][c],
-                          domain=pyo.NonNegativeReals
-                          )
-      setattr(self._m, f'multiplicity_{year+1}',mult)
+    # Multiplicity used to scaled dispatches based on cluster and year
+    self._m.multiplicity = pyo.Param(self._m.y, self._m.c,
+                                     initialize=lambda m, y, c: self._multiplicity_meta[y+1][c],
+                                     domain=pyo.NonNegativeReals)
+    # Same values, laid out as [year, hour of year] for weighting hourly cashflows
+    self._mult_array = np.repeat(np.array([[self._multiplicity_meta[y+1][c] for c in self._m.c] for y in self._m.y]),
+                                 len(self._m.t), axis=1)
 
   def buildDispatchVariables(self, comp):
     """
       Generates dispatch vars and value arrays to build components
       @ In, comp, HERON component
       @ Out, capacity, np.array/pyomo.var, capacity variable for the component
-      @ Out, template_array, np.array, array of pyo.values used for TEAL cfs
+      @ Out, dispatch, pyomo indexed var/param, dispatch indexed by realization, year, cluster, and hour
     """
-    # NOTE Assumes that all components will remain functional for project life
-    project_life = int(self._case._global_econ['ProjectTime'])
-    # Necessary to make year index one larger than project life so that year zero
-    # Can be empty for recurring cashflows
-    template_array = np.zeros((self._case._num_samples, project_life + 1, self._yearly_hours), dtype=object)
     capacity = self._component_meta[comp.name]['Capacity']
     dispatch_type = self._component_meta[comp.name]['Dispatch']
     # What to have user be able to define consuming components capacity in terms of either resource
@@ -463,46 +726,29 @@ class MOPED(Base):
     dummy_type = type(self._m.dummy)
     placeholder_type = type(self._m.placeholder)
     self.raiseADebug(f'Preparing dispatch container for {comp.name}...')
-    for real in range(self._case._num_samples):
-      for year in range(project_life):
-        mult = getattr(self._m,f'multiplicity_{year+1}')
-        # TODO account for other variations of component settings, specifically if dispatchable
-        if isinstance(capacity, (dummy_type, placeholder_type)):
-          # Currently independent and dependent are interchangable
-          if dispatch_type in ['independent', 'dependent']:
-            var = pyo.Var(self._m.c, self._m.t,
-                          initialize=lambda m, c, t: 0,
-                          domain=pyo.NonNegativeReals
-                          )
-            setattr(self._m, f'{comp.name}_dispatch_{real+1}_{year+1}', var)
-            # Shifting index such that year 0 remains 0
-            # Weighting each dispatch by the number of realizations (equal weight for each realization)
-            # This corrects the NPV value
-            template_array[real, year + 1, :] = (1 / self._case._num_samples) * np.array(list(var.values())) * np.array(list(mult.values()))
-          elif dispatch_type == 'fixed':
-            param = pyo.Var(self._m.c, self._m.t,
-                            initialize=lambda m, c, t: capacity.value,
-                            domain=pyo.NonNegativeReals,)
-            setattr(self._m, f'{comp.name}_dispatch_{real+1}_{year+1}', param)
-            con = pyo.Constraint(self._m.c, self._m.t, expr=lambda m, c, t: param[(c, t)] == reverse_transfer*capacity)
-            setattr(self._m, f'{comp.name}_fixed_{real+1}_{year+1}', con)
-            template_array[real, year + 1, :] = (1 / self._case._num_samples) * np.array(list(param.values())) * np.array(list(mult.values()))
-        else:
-          if dispatch_type in ['independent', 'dependent']:
-            var = pyo.Var(self._m.c, self._m.t,
-                          initialize=lambda m, c, t: 0,
-                          domain=pyo.NonNegativeReals,
-                          bounds=lambda m, c, t: (0, capacity[f'Realization_{real+1}'][year, c, t])
-                          )
-            setattr(self._m, f'{comp.name}_dispatch_{real+1}_{year+1}', var)
-            template_array[real, year + 1, :] = (1 / self._case._num_samples) * np.array(list(var.values())) * np.array(list(mult.values()))
-          elif dispatch_type == 'fixed':
-            param = pyo.Param(self._m.c, self._m.t,
-                              initialize=lambda m, c, t: reverse_transfer*capacity[f'Realization_{real+1}'][year, c, t]
-                              )
-            setattr(self._m, f'{comp.name}_dispatch_{real+1}_{year+1}', param)
-            template_array[real, year + 1, :] = (1 / self._case._num_samples) * np.array(list(param.values())) * np.array(list(mult.values()))
-    return capacity, template_array
+    # One indexed variable over all realizations, years, clusters, and hours
+    index = (self._m.r, self._m.y, self._m.c, self._m.t)
+    # TODO account for other variations of component settings, specifically if dispatchable
+    if isinstance(capacity, (dummy_type, placeholder_type)):
+      # Currently independent and dependent are interchangable
+      if dispatch_type in ['independent', 'dependent']:
+        dispatch = pyo.Var(*index, initialize=0, domain=pyo.NonNegativeReals)
+        setattr(self._m, f'{comp.name}_dispatch', dispatch)
+      elif dispatch_type == 'fixed':
+        dispatch = pyo.Var(*index, initialize=capacity.value, domain=pyo.NonNegativeReals)
+        setattr(self._m, f'{comp.name}_dispatch', dispatch)
+        con = pyo.Constraint(*index, rule=lambda m, r, y, c, t: dispatch[r, y, c, t] == reverse_transfer*capacity)
+        setattr(self._m, f'{comp.name}_fixed', con)
+    else:
+      if dispatch_type in ['independent', 'dependent']:
+        dispatch = pyo.Var(*index, initialize=0, domain=pyo.NonNegativeReals,
+                           bounds=lambda m, r, y, c, t: (0, capacity[f'Realization_{r+1}'][y, c, t]))
+        setattr(self._m, f'{comp.name}_dispatch', dispatch)
+      elif dispatch_type == 'fixed':
+        dispatch = pyo.Param(*index,
+                             initialize=lambda m, r, y, c, t: reverse_transfer*capacity[f'Realization_{r+1}'][y, c, t])
+        setattr(self._m, f'{comp.name}_dispatch', dispatch)
+    return capacity, dispatch
 
   def buildConsumptionVariables(self, comp):
     """
@@ -510,85 +756,66 @@ class MOPED(Base):
       @ In, comp, HERON component object
       @ Out, None
     """
-    # NOTE Assumes that all components will remain functional for project life
-    project_life = int(self._case._global_econ['ProjectTime'])
     transfer = self._component_meta[comp.name]['Transfer']
-    for real in range(self._case._num_samples):
-      for year in range(project_life):
-        dispatch = getattr(self._m,f'{comp.name}_dispatch_{real+1}_{year+1}')
-        var = pyo.Var(self._m.c, self._m.t,
-                      initialize=lambda m, c, t: 0,
-                      domain=pyo.NonNegativeReals)
-        setattr(self._m,f'{comp.name}_consume_{real+1}_{year+1}',var)
-        con = pyo.Constraint(self._m.c,self._m.t,
-                             rule=lambda m, c, t: var[(c,t)] == transfer*dispatch[(c,t)])
-        setattr(self._m,f'{comp.name}_consumption_limit_{real+1}_{year+1}',con)
+    index = (self._m.r, self._m.y, self._m.c, self._m.t)
+    dispatch = getattr(self._m, f'{comp.name}_dispatch')
+    var = pyo.Var(*index, initialize=0, domain=pyo.NonNegativeReals)
+    setattr(self._m, f'{comp.name}_consume', var)
+    con = pyo.Constraint(*index, rule=lambda m, r, y, c, t: var[r, y, c, t] == transfer*dispatch[r, y, c, t])
+    setattr(self._m, f'{comp.name}_consumption_limit', con)
 
   def buildStorageVariables(self, comp):
     """
       Builds storage dispatch(charge/discharge), level, and dependencies in pyomo
       @ In, comp, HERON component object
       @ Out, capacity, np.array/pyomo.var, capacity variable for the component
-      @ Out, template_array, np.array, array of pyo.values used for TEAL cfs
+      @ Out, discharge, pyomo indexed var, discharge indexed by realization, year, cluster, and hour
     """
     self.raiseADebug(f'Preparing storage variables for {comp.name}')
-    # NOTE Assumes that all components will remain functional for project life
-    project_life = int(self._case._global_econ['ProjectTime'])
-    # Necessary to make year index one larger than project life so that year zero
-    # Can be empty for recurring cashflows
-    template_array = np.zeros((self._case._num_samples, project_life + 1, self._yearly_hours), dtype=object)
     capacity = self._component_meta[comp.name]['Capacity']
     # NOTE we assume independent for all storage components
-    dispatch_type = self._component_meta[comp.name]['Dispatch']
     initial_value = self._component_meta[comp.name]['Initial Value']
     trip_efficiency = self._component_meta[comp.name]['SRTE']
     # TODO how to dynamically generate the time-step value?
     dt = self._m.t[2] - self._m.t[1]
     cluster_end = self._m.t[-1]
-    for real in range(self._case._num_samples):
-      for year in range(project_life):
-        mult = getattr(self._m,f'multiplicity_{year+1}')
-        # battery needs to track level, charging, and discharging
-        level = pyo.Var(self._m.c, self._m.t,
-                        domain=pyo.NonNegativeReals)
-        setattr(self._m,f'{comp.name}_level_{real+1}_{year+1}',level)
-        level_upper = pyo.Constraint(self._m.c, self._m.t,
-                                     rule=lambda m, c, t: level[(c,t)] <= capacity)
-        setattr(self._m,f'{comp.name}_level_upper_{real+1}_{year+1}',level_upper)
-        charge = pyo.Var(self._m.c, self._m.t,
-                         domain=pyo.NonNegativeReals)
-        setattr(self._m,f'{comp.name}_charge_{real+1}_{year+1}',charge)
-        discharge = pyo.Var(self._m.c, self._m.t,
-                         domain=pyo.NonNegativeReals)
-        setattr(self._m,f'{comp.name}_discharge_{real+1}_{year+1}',discharge)
-        discharge_limit = pyo.Constraint(self._m.c, self._m.t,
-                                         rule=lambda m, c, t:
-                                         discharge[(c,t)] <= trip_efficiency*self.getPreviousIndex(comp.name, level, real+1, year+1, c, t, initial_value))
-        setattr(self._m,f'{comp.name}_discharge_limit_{real+1}_{year+1}',discharge_limit)
-        # level is time dependent and requires propagation via constraints
-        level_propagation = pyo.Constraint(self._m.c, self._m.t,
-                                           rule=lambda m, c, t:
-                                           level[(c,t)] == self.getPreviousIndex(comp.name, level, real+1, year+1, c, t, initial_value) +
-                                           dt*(trip_efficiency*charge[(c,t)] - (1/trip_efficiency)*discharge[(c,t)]))
-        setattr(self._m,f'{comp.name}_level_propagation_{real+1}_{year+1}',level_propagation)
-        # Storage set points should enforce shorter time horizons for storage decisions
-        level_point_set_lower = pyo.Constraint(self._m.c,
-                                         rule=lambda m, c: level[(c,0)] == initial_value)
-        setattr(self._m,f'{comp.name}_level_setpoint_lower_{real+1}_{year+1}',level_point_set_lower)
-        level_point_set_upper = pyo.Constraint(self._m.c,
-                                         rule=lambda m, c: level[(c,cluster_end)] == initial_value)
-        setattr(self._m,f'{comp.name}_level_setpoint_upper_{real+1}_{year+1}',level_point_set_upper)
-        # TODO currently only considering costs associated with discharging the storage, however charging and level should be considered
-        # This will involve handling a separate template_array as a driver for a separate TEAL cashflow
-        template_array[real, year+1, :] = (1 / self._case._num_samples) * np.array(list(discharge.values())) * np.array(list(mult.values()))
-    return capacity, template_array
+    index = (self._m.r, self._m.y, self._m.c, self._m.t)
+    # battery needs to track level, charging, and discharging
+    level = pyo.Var(*index, domain=pyo.NonNegativeReals)
+    setattr(self._m, f'{comp.name}_level', level)
+    level_upper = pyo.Constraint(*index, rule=lambda m, r, y, c, t: level[r, y, c, t] <= capacity)
+    setattr(self._m, f'{comp.name}_level_upper', level_upper)
+    charge = pyo.Var(*index, domain=pyo.NonNegativeReals)
+    setattr(self._m, f'{comp.name}_charge', charge)
+    discharge = pyo.Var(*index, domain=pyo.NonNegativeReals)
+    setattr(self._m, f'{comp.name}_discharge', discharge)
+    discharge_limit = pyo.Constraint(*index,
+                                     rule=lambda m, r, y, c, t:
+                                     discharge[r, y, c, t] <= trip_efficiency*self.getPreviousIndex(level, r, y, c, t, initial_value))
+    setattr(self._m, f'{comp.name}_discharge_limit', discharge_limit)
+    # level is time dependent and requires propagation via constraints
+    level_propagation = pyo.Constraint(*index,
+                                       rule=lambda m, r, y, c, t:
+                                       level[r, y, c, t] == self.getPreviousIndex(level, r, y, c, t, initial_value) +
+                                       dt*(trip_efficiency*charge[r, y, c, t] - (1/trip_efficiency)*discharge[r, y, c, t]))
+    setattr(self._m, f'{comp.name}_level_propagation', level_propagation)
+    # Storage set points should enforce shorter time horizons for storage decisions
+    level_point_set_lower = pyo.Constraint(self._m.r, self._m.y, self._m.c,
+                                           rule=lambda m, r, y, c: level[r, y, c, 0] == initial_value)
+    setattr(self._m, f'{comp.name}_level_setpoint_lower', level_point_set_lower)
+    level_point_set_upper = pyo.Constraint(self._m.r, self._m.y, self._m.c,
+                                           rule=lambda m, r, y, c: level[r, y, c, cluster_end] == initial_value)
+    setattr(self._m, f'{comp.name}_level_setpoint_upper', level_point_set_upper)
+    # TODO currently only considering costs associated with discharging the storage, however charging and level should be considered
+    # This will involve handling a separate driver for a separate hourly cashflow
+    return capacity, discharge
 
   def createCashflowComponent(self, comp, capacity, dispatch):
     """
       Builds TEAL component using pyomo dispatch and capacity variables
       @ In, capacity, pyomo.var/pyomo.param, primary driver
       @ In, life, int, number of years the component operates without replacement
-      @ In, dispatch, np.array, pyomo values for dispatch variables
+      @ In, dispatch, pyomo indexed var/param, dispatch indexed by realization, year, cluster, and hour
       @ Out, component, TEAL.Component
     """
     # Need to have TEAL component for cashflow functionality
@@ -608,7 +835,11 @@ class MOPED(Base):
         capex_params = cf_meta['Capex Params']
         capex_driver = cf_meta['Capex Driver']
         if capex_driver is None:
-          capex = self.createCapex(component, value, capacity, capex_params)
+          if isinstance(capacity, pyo.Var) and capex_params['X'] != 1 and self._case.moped['capex_segments'] > 0:
+            driver, capex_params = self.linearizeCapexScaling(comp, value, capacity, capex_params)
+            capex = self.createCapex(component, value, driver, capex_params)
+          else:
+            capex = self.createCapex(component, value, capacity, capex_params)
         else:
           capex = self.createCapex(component, value, capex_driver, capex_params)
         cfs.append(capex)
@@ -635,16 +866,11 @@ class MOPED(Base):
         dispatching_params = cf_meta['Dispatching Params']
         dispatch_driver = cf_meta['Dispatch Driver']
         if dispatch_driver is None:
+          var_om = self.createRecurringHourly(component, dispatching_params)
           if isinstance(value, dict):
-            for real in range(self._case._num_samples):
-              alpha_realization = self.reshapeAlpha(value)
-              var_om = self.createRecurringHourly(component, alpha_realization[real, :, :], dispatch[real, :, :], real, dispatching_params)
-              cfs.append(var_om)
-          else:
-            # Necessary to create a unique cash flow for each dispatch realization
-            for real in range(self._case._num_samples):
-              var_om = self.createRecurringHourly(component, value, dispatch[real, :, :], real, dispatching_params)
-              cfs.append(var_om)
+            value = self.reshapeAlpha(value)
+          # Added to the NPV as a linear expression, see buildHourlyNPV
+          self._hourly_cashflows.append((comp.name, value, dispatch, var_om))
         else:
           raise IOError('MOPED does not currently handle non activity drivers for dispatch recurring cashflows')
       else:
@@ -658,64 +884,68 @@ class MOPED(Base):
       @ In, alpha, dict, dictionary of numpy arrays
       @ Out, reshaped_alpha, numpy array, same data in new shape
     """
-    project_life = int(self._case._global_econ['ProjectTime'])
-    # plus 1 to year term to allow for 0 recurring costs during build year
-    reshaped_alpha = np.zeros((self._case._num_samples,project_life+1,self._yearly_hours))
-    for real in range(self._case._num_samples):
-      # it necessary to have alpha be [real,year,hour] instead of [real,year,cluster,hour]
-      realized_alpha = np.hstack([alpha[f'Realization_{real+1}'][:,i,:] for i in range(alpha[f'Realization_{real+1}'].shape[1])])
-      reshaped_alpha[real,1:,:] = realized_alpha
-    # TODO effective way of checking to see if reshape was successful?
+    num_realizations = len(alpha)
+    realizations = [alpha[f'Realization_{real+1}'] for real in range(num_realizations)]
+    # the realizations from loadSyntheticHistory are views into one stacked array, so use it rather than copying
+    realized_alpha = realizations[0].base
+    if realized_alpha is None or any(rlz.base is not realized_alpha for rlz in realizations) \
+        or realized_alpha.shape != (num_realizations, *realizations[0].shape):
+      realized_alpha = np.stack(realizations)
+    # it necessary to have alpha be [real,year,hour] instead of [real,year,cluster,hour]
+    # clusters are contiguous in each year, so this is the same as stacking them in order
+    realized_alpha = realized_alpha.reshape(num_realizations, -1, self._yearly_hours)
+    # pad one year ahead to allow for 0 recurring costs during build year
+    reshaped_alpha = np.pad(realized_alpha, ((0, 0), (1, 0), (0, 0)))
     return reshaped_alpha
 
-  def conserveResource(self, resource, real, year, M, c, t):
+  def buildResourceIncidence(self):
     """
-      Generates pyomo constraints for resource conservation
-      @ In, resource, string, name of resource we are conserving
-      @ In, real, int, the current realization
-      @ In, year, int, the current year
-      @ In, M, pyomo.ConcreteModel
-      @ In, c, int, index from pyomo set self._m.c
-      @ In, t, int, index from pyomo set self._m.t
-      @ Out, rule, boolean expression
+      Tabulates which dispatch variables supply and use each resource, so conservation constraints
+      do not need to search the components for every index
+      @ In, None
+      @ Out, incidence, dict, {resource: {'supply': [pyomo indexed var/param], 'use': [pyomo indexed var/param]}}
     """
-    # Initializing production and demand trackers
-    produced = 0
-    demanded = 0
-    consumed = 0
-    charged = 0
-    discharged = 0
-    # Necessary to check all components involved in the analysis
+    incidence = dict((resource, {'supply': [], 'use': []}) for resource in self._resources)
     for comp in self._components:
       comp_meta = self._component_meta[comp.name]
-      # Conservation constrains the dispatch decisions
       if comp_meta['Stores'] is not None:
-        charge_value = getattr(self._m, f'{comp.name}_charge_{real + 1}_{year + 1}')
-        discharge_value = getattr(self._m, f'{comp.name}_discharge_{real + 1}_{year + 1}')
+        terms = [(comp_meta['Stores'], 'supply', 'discharge'), (comp_meta['Stores'], 'use', 'charge')]
       else:
-        dispatch_value = getattr(self._m, f'{comp.name}_dispatch_{real + 1}_{year + 1}')
+        terms = [(comp_meta['Produces'], 'supply', 'dispatch'), (comp_meta['Demands'], 'use', 'dispatch')]
       if comp_meta['Consumes'] is not None:
-        consumption_value = getattr(self._m,f'{comp.name}_consume_{real+1}_{year+1}')
-      for key, value in comp_meta.items():
-        if key == 'Produces' and value == resource:
-          produced += dispatch_value[(c,t)]
-        elif key == 'Demands' and value == resource:
-          demanded += dispatch_value[(c,t)]
-        elif key == 'Consumes' and value == resource:
-          consumed += consumption_value[(c,t)]
-        elif key == 'Stores' and value == resource:
-          charged += charge_value[(c,t)]
-          discharged += discharge_value[(c,t)]
+        terms.append((comp_meta['Consumes'], 'use', 'consume'))
+      for resource, role, kind in terms:
         # TODO consider consumption and incorrect input information
-    return produced + discharged == demanded + consumed + charged
+        if resource in incidence:
+          incidence[resource][role].append(getattr(self._m, f'{comp.name}_{kind}'))
+    for resource, roles in incidence.items():
+      self.raiseADebug(f'{resource} supplied by {[var.name for var in roles["supply"]]}, '
+                       f'used by {[var.name for var in roles["use"]]}')
+    return incidence
 
-  def upper(self, comp, real, year, M, c, t):
+  def conserveResource(self, incidence, M, resource, r, y, c, t):
+    """
+      Generates pyomo constraints for resource conservation
+      @ In, incidence, dict, dispatch variables supplying and using each resource, see buildResourceIncidence
+      @ In, M, pyomo.ConcreteModel
+      @ In, resource, string, name of resource we are conserving
+      @ In, r, int, index from pyomo set self._m.r
+      @ In, y, int, index from pyomo set self._m.y
+      @ In, c, int, index from pyomo set self._m.c
+      @ In, t, int, index from pyomo set self._m.t
+      @ Out, rule, boolean expression
+    """
+    supplied = sum(var[r, y, c, t] for var in incidence[resource]['supply'])
+    used = sum(var[r, y, c, t] for var in incidence[resource]['use'])
+    return supplied == used
+
+  def upper(self, comp, M, r, y, c, t):
     """
       Restricts independently dispatched compononents based on their capacity
       @ In, comp, HERON comp object
-      @ In, real, int, current realization
-      @ In, year, int, current year
       @ In, M, pyomo model object, MOPED pyomo ConcreteModel
+      @ In, r, int, index for realization
+      @ In, y, int, index for year
       @ In, c, int, index for cluster
       @ In, t, int, index for hour within cluster
       @ Out, rule, boolean expression for upper bounding
@@ -728,9 +958,9 @@ class MOPED(Base):
     else:
       reverse_transfer = 1
       # This is allows for the capacity to be an upper bound and decision variable
-    upper_bound = reverse_transfer*getattr(self._m, f'{comp.name}')
-    dispatch_value = getattr(self._m, f'{comp.name}_dispatch_{real+1}_{year+1}')
-    return dispatch_value[(c, t)] <= upper_bound
+    upper_bound = reverse_transfer*self._component_meta[comp.name]['Capacity']
+    dispatch_value = getattr(self._m, f'{comp.name}_dispatch')
+    return dispatch_value[r, y, c, t] <= upper_bound
 
   def buildConstraints(self):
     """
@@ -738,43 +968,49 @@ class MOPED(Base):
       @ In, None
       @ Out, None
     """
-    # Convert to int to make range() viable
-    project_life = int(self._case._global_econ['ProjectTime'])
     # Type variables used for checking capacity type, based on pyomo vars
     # Defined as part of the self._m pyomo model
     dummy_type = type(self._m.dummy)
     placeholder_type = type(self._m.placeholder)
+    index = (self._m.r, self._m.y, self._m.c, self._m.t)
     self.raiseAMessage(f'Building necessary constraints for {self._case.name}')
-    for real in range(self._case._num_samples):
-      for year in range(project_life):
-        # Separating constraints makes sense
-        # Resource conservation
-        for resource in self._resources:
-          con = pyo.Constraint(self._m.c, self._m.t,
-                               rule=partial(self.conserveResource, resource, real, year))
-          setattr(self._m, f'{resource}_con_{real+1}_{year+1}', con)
-        # Bounding constraints on dispatches
-        for comp in self._components:
-          # storage has constraints build elsewhere see (buildStorageComponents)
-          if self._component_meta[comp.name]['Stores'] is not None:
-            continue
-          capacity = self._component_meta[comp.name]['Capacity']
-          if isinstance(capacity, (dummy_type, placeholder_type)):
-            con = pyo.Constraint(self._m.c, self._m.t,
-                                 rule=partial(self.upper, comp, real, year))
-            setattr(self._m, f'{comp.name}_upper_{real+1}_{year+1}', con)
+    # Separating constraints makes sense
+    # Resource conservation
+    incidence = self.buildResourceIncidence()
+    self._m.conservation = pyo.Constraint(self._m.resources, *index,
+                                          rule=partial(self.conserveResource, incidence))
+    # Bounding constraints on dispatches
+    for comp in self._components:
+      # storage has constraints build elsewhere see (buildStorageComponents)
+      if self._component_meta[comp.name]['Stores'] is not None:
+        continue
+      capacity = self._component_meta[comp.name]['Capacity']
+      if isinstance(capacity, (dummy_type, placeholder_type)):
+        con = pyo.Constraint(*index, rule=partial(self.upper, comp))
+        setattr(self._m, f'{comp.name}_upper', con)
 
-  def solveAndDisplay(self):
+  def solveAndDisplay(self, warmstart=False):
     """
       Presents results of the optimization run
-      @ In, None
+      @ In, warmstart, bool, optional, if True then the solver starts from the current values of the variables
       @ Out, None
     """
-    columns = []
-    values = []
+    solver = self.getSolver(self._m)
+    # ipopt always starts from the current values, other solvers only use them if asked to
+    options = {'warmstart': True} if warmstart and solver.warm_start_capable() else {}
     # Results provide run times and optimizer final status
-    results = self._solver.solve(self._m)
+    results = solver.solve(self._m, **options)
     self.raiseAMessage(f'Optimizer has finished running, here are the results\n{results}')
+    self.displaySolution(pyo.value(self._m.NPV))
+
+  def displaySolution(self, NPV):
+    """
+      Presents the optimized capacities and NPV, and writes them to file
+      @ In, NPV, float, expected NPV at the optimized capacities
+      @ Out, None
+    """
+    columns = []
+    values = []
     for comp in self._components:
       # Not all components will have a pyomo variable
       try:
@@ -785,13 +1021,276 @@ class MOPED(Base):
         comp_print.pprint()
       except:
         self.raiseAMessage(f'{comp.name} does not have a standard capacity')
-    NPV = pyo.value(self._m.NPV)
     self.raiseAMessage(f"The final NPV is: {NPV}")
     columns.append('Expected NPV')
     values.append(NPV)
     output_data = pd.DataFrame([values], columns=columns)
     output_data.to_csv('opt_solution.csv')
 
+  def buildSubproblem(self, r, y):
+    """
+      Builds the dispatch for one realization and year as its own pyomo model, for Benders decomposition.
+      Capacities decided by the master problem are copied into the subproblem and fixed by linking
+      constraints, whose duals give the sensitivity of the dispatch NPV to each capacity.
+      @ In, r, int, index of the realization
+      @ In, y, int, index of the year
+      @ Out, sub, pyomo.ConcreteModel, subproblem minimizing the negative dispatch NPV
+    """
+    master = self._m
+    master_meta = self._component_meta
+    sub = pyo.ConcreteModel(name=f'{self._case.name}_realization_{r+1}_year_{y+1}')
+    sub.r = pyo.Set(initialize=[r])
+    sub.y = pyo.Set(initialize=[y])
+    sub.c = pyo.Set(initialize=list(master.c))
+    sub.t = pyo.Set(initialize=list(master.t))
+    sub.resources = pyo.Set(initialize=self._resources)
+    # Builders work on self._m and self._component_meta, so these point to the subproblem while building
+    self._component_meta = {}
+    linked = []
+    for name, meta in master_meta.items():
+      meta = dict(meta)
+      capacity = meta['Capacity']
+      if isinstance(capacity, pyo.Var):
+        # Unbounded copy, so the sensitivity is all given by the linking constraint
+        setattr(sub, name, pyo.Var(initialize=capacity.value))
+        meta['Capacity'] = getattr(sub, name)
+        linked.append(name)
+      elif isinstance(capacity, pyo.Param):
+        setattr(sub, name, pyo.Param(initialize=pyo.value(capacity)))
+        meta['Capacity'] = getattr(sub, name)
+      self._component_meta[name] = meta
+    sub.capacity_target = pyo.Param(linked, initialize=lambda m, name: master_meta[name]['Capacity'].value,
+                                    mutable=True)
+    sub.capacity_link = pyo.Constraint(linked, rule=lambda m, name: getattr(m, name) == m.capacity_target[name])
+    self._m = sub
+    try:
+      dispatches = {}
+      for comp in self._components:
+        if self._component_meta[comp.name]['Stores'] is None:
+          _, dispatches[comp.name] = self.buildDispatchVariables(comp)
+        else:
+          _, dispatches[comp.name] = self.buildStorageVariables(comp)
+        if self._component_meta[comp.name]['Consumes'] is not None:
+          self.buildConsumptionVariables(comp)
+      self.buildConstraints()
+      hourly = [(name, alpha, dispatches[name], cf) for name, alpha, _, cf in self._hourly_cashflows]
+      sub.cost = pyo.Objective(expr=-self.buildHourlyNPV(hourly), sense=pyo.minimize)
+    finally:
+      self._m = master
+      self._component_meta = master_meta
+    sub.dual = pyo.Suffix(direction=pyo.Suffix.IMPORT)
+    return sub
+
+  def solveSubproblem(self, r, y, capacities):
+    """
+      Solves the Benders subproblem of one realization and year for given capacities
+      @ In, r, int, index of the realization
+      @ In, y, int, index of the year
+      @ In, capacities, dict, {component name: capacity} decided by the master problem
+      @ Out, r, int, index of the realization
+      @ Out, y, int, index of the year
+      @ Out, npv, float, dispatch NPV of the realization and year
+      @ Out, slopes, dict, {component name: derivative of the dispatch NPV with respect to the capacity}
+    """
+    sub = self._subproblems[r, y]
+    for name, value in capacities.items():
+      sub.capacity_target[name] = value
+    results = self._subproblem_solver.solve(sub)
+    condition = results.solver.termination_condition
+    if condition != TerminationCondition.optimal:
+      raise IOError(f'Benders subproblem for realization {r+1}, year {y+1} was not solved ({condition})! '
+                    'Benders decomposition requires a feasible dispatch for all capacities within their bounds.')
+    # The subproblem minimizes the negative NPV
+    npv = -pyo.value(sub.cost)
+    slopes = dict((name, -sub.dual[sub.capacity_link[name]]) for name in capacities)
+    return r, y, npv, slopes
+
+  def solveBenders(self, capital_npv):
+    """
+      Optimizes the capacities with Benders decomposition. The master problem maximizes the capital NPV plus
+      one recourse variable per realization and year, bounded by optimality cuts from the dispatch subproblems.
+      @ In, capital_npv, pyomo expression, NPV of cashflows driven by capacities (capex, yearly, amortization)
+      @ Out, None
+    """
+    settings = self._case.moped
+    linked = [name for name, meta in self._component_meta.items() if isinstance(meta['Capacity'], pyo.Var)]
+    capacity_vars = dict((name, self._component_meta[name]['Capacity']) for name in linked)
+    tasks = list(it.product(self._m.r, self._m.y))
+    self.raiseAMessage(f'Building {len(tasks)} Benders dispatch subproblems for {self._case.name}')
+    self._subproblems = dict(((r, y), self.buildSubproblem(r, y)) for r, y in tasks)
+    self._m.recourse = pyo.Var(self._m.r, self._m.y)
+    self._m.cuts = pyo.ConstraintList()
+    self._m.NPV = pyo.Objective(expr=capital_npv + pyo.quicksum(self._m.recourse[r, y] for r, y in tasks),
+                                sense=pyo.maximize)
+    master_solver = self.getSolver(self._m)
+    self._subproblem_solver = self.getSolver(self._subproblems[tasks[0]])
+    # Forked workers share the subproblems already built here
+    pool = self.createWorkerPool(len(tasks))
+    capacities = dict((name, var.value) for name, var in capacity_vars.items())
+    best_npv = -np.inf
+    best_capacities = capacities
+    history = []
+    converged = False
+    try:
+      for iteration in range(1, settings['max_iterations'] + 1):
+        subtasks = [(r, y, capacities) for r, y in tasks]
+        if pool is None:
+          results = [self.solveSubproblem(*task) for task in subtasks]
+        else:
+          results = pool.map(_solveBendersSubproblem, subtasks)
+        # Capacities of this iteration are feasible, so give a lower bound
+        for name, var in capacity_vars.items():
+          var.set_value(capacities[name])
+        npv = pyo.value(capital_npv) + sum(result[2] for result in results)
+        if npv > best_npv:
+          best_npv = npv
+          best_capacities = capacities
+        for r, y, sub_npv, slopes in results:
+          self._m.cuts.add(self._m.recourse[r, y] <= sub_npv +
+                           sum(slopes[name] * (var - capacities[name]) for name, var in capacity_vars.items()))
+        master_results = master_solver.solve(self._m)
+        condition = master_results.solver.termination_condition
+        if condition != TerminationCondition.optimal:
+          raise IOError(f'Benders master problem was not solved ({condition})!')
+        upper = pyo.value(self._m.NPV)
+        gap = (upper - best_npv) / max(1.0, abs(upper))
+        history.append((iteration, best_npv, upper, gap))
+        self.raiseAMessage(f'Benders iteration {iteration}: best NPV {best_npv:1.8e}, '
+                           f'upper bound {upper:1.8e}, relative gap {gap:1.3e}')
+        if gap <= settings['tolerance']:
+          converged = True
+          break
+        capacities = dict((name, var.value) for name, var in capacity_vars.items())
+    finally:
+      if pool is not None:
+        pool.close()
+        pool.join()
+    if converged:
+      self.raiseAMessage(f'Benders decomposition converged after {len(history)} iterations')
+    else:
+      self.raiseAWarning(f'Benders decomposition did not converge in {len(history)} iterations, '
+                         f'the relative gap is {history[-1][3]:1.3e}')
+    pd.DataFrame(history, columns=['iteration', 'best NPV', 'upper bound', 'relative gap']).to_csv(
+        'benders_convergence.csv', index=False)
+    for name, var in capacity_vars.items():
+      var.set_value(best_capacities[name])
+    self.displaySolution(best_npv)
+
+  def createWorkerPool(self, tasks):
+    """
+      Creates a pool of forked processes that share this MOPED instance, including its built problems.
+      Built problems hold the rules used to construct them, which cannot be pickled for spawned processes,
+      so where fork is not available (Windows) problems are solved serially.
+      @ In, tasks, int, number of tasks to solve in parallel
+      @ Out, pool, multiprocessing.Pool, pool of worker processes, or None to solve serially
+    """
+    workers = min(self._case.moped['workers'], tasks)
+    if workers < 2:
+      return None
+    if 'fork' not in multiprocessing.get_all_start_methods():
+      self.raiseAWarning('Solving MOPED problems in parallel requires the "fork" start method, '
+                         'which is not available on this platform; solving serially.')
+      return None
+    global _worker_moped
+    _worker_moped = self
+    return multiprocessing.get_context('fork').Pool(workers)
+
+  def solveSweep(self):
+    """
+      Solves the problem for each combination of swept capacities, reusing the same pyomo model,
+      and writes the NPV and optimized capacities of each combination
+      @ In, None
+      @ Out, None
+    """
+    names = list(self._sweep_values)
+    grid = list(it.product(*self._sweep_values.values()))
+    self.raiseAMessage(f'Solving {len(grid)} combinations of swept capacities for {names}')
+    self._sweep_solver = self.getSolver(self._m)
+    # Forked workers share the problem already built here
+    pool = self.createWorkerPool(len(grid))
+    try:
+      if pool is None:
+        results = [self.solveSweepPoint(point) for point in grid]
+      else:
+        results = pool.map(_solveSweepPoint, grid)
+    finally:
+      if pool is not None:
+        pool.close()
+        pool.join()
+    columns = [f'{comp.name} Capacity' for comp in self._components
+               if isinstance(self._component_meta[comp.name]['Capacity'], (pyo.Var, pyo.Param))]
+    columns.append('Expected NPV')
+    for point, (_, condition) in zip(grid, results):
+      if condition != TerminationCondition.optimal:
+        self.raiseAWarning(f'No solution for swept capacities {dict(zip(names, map(float, point)))} ({condition})')
+    output_data = pd.DataFrame([row for row, _ in results], columns=columns)
+    best = output_data['Expected NPV'].idxmax() if output_data['Expected NPV'].notna().any() else None
+    if best is not None:
+      self.raiseAMessage(f'The best NPV of the sweep is {output_data["Expected NPV"][best]}, with capacities\n'
+                         f'{output_data.loc[best, columns[:-1]].to_string()}')
+    output_data.to_csv('opt_solution.csv')
+
+  def solveSweepPoint(self, point):
+    """
+      Solves the problem for one combination of swept capacities
+      @ In, point, tuple, value of each swept capacity, in the order of self._sweep_values
+      @ Out, row, list, capacity of each component with a pyomo capacity and NPV, NaN where not solved
+      @ Out, condition, pyomo.opt.TerminationCondition, solver termination condition
+    """
+    for name, value in zip(self._sweep_values, point):
+      self._component_meta[name]['Capacity'].set_value(value)
+    results = self._sweep_solver.solve(self._m, load_solutions=False)
+    condition = results.solver.termination_condition
+    solved = condition == TerminationCondition.optimal
+    if solved:
+      self._m.solutions.load_from(results)
+    row = []
+    for comp in self._components:
+      capacity = self._component_meta[comp.name]['Capacity']
+      if isinstance(capacity, pyo.Param):
+        row.append(pyo.value(capacity))
+      elif isinstance(capacity, pyo.Var):
+        row.append(capacity.value if solved else np.nan)
+    row.append(pyo.value(self._m.NPV) if solved else np.nan)
+    return row, condition
+
+  def isLinear(self, model):
+    """
+      Checks if all active objectives and constraints of a pyomo model are linear
+      @ In, model, pyomo.ConcreteModel, model to check
+      @ Out, linear, bool, True if the model is linear (possibly with integer variables)
+    """
+    for obj in model.component_data_objects(pyo.Objective, active=True):
+      if polynomial_degree(obj.expr) not in (0, 1):
+        return False
+    for con in model.component_data_objects(pyo.Constraint, active=True):
+      if polynomial_degree(con.body) not in (0, 1):
+        return False
+    return True
+
+  def getSolver(self, model):
+    """
+      Provides the solver for a pyomo model; unless set by the user, linear models go to the first
+      available LP/MILP solver and only nonlinear models to ipopt
+      @ In, model, pyomo.ConcreteModel, model to solve
+      @ Out, solver, pyomo solver
+    """
+    if self._solver is not None:
+      return self._solver
+    if not self.isLinear(model):
+      self.raiseAMessage(f'Problem {model.name} is nonlinear, solving with ipopt')
+      return SolverFactory('ipopt')
+    for name in ['appsi_highs', 'cbc', 'glpk']:
+      solver = SolverFactory(name)
+      if solver.available(exception_flag=False):
+        self.raiseAMessage(f'Problem {model.name} is linear, solving with {name}')
+        return solver
+    if any(var.is_integer() for var in model.component_data_objects(pyo.Var)):
+      raise IOError('Piecewise-linear capex scaling requires a MILP solver (HiGHS, CBC, or GLPK), '
+                    'but none was found! Set <moped><capex_segments> to 0 to solve with ipopt instead.')
+    self.raiseAWarning(f'Problem {model.name} is linear, but no LP solver was found; solving with ipopt')
+    return SolverFactory('ipopt')
+
   def dispatchPlot(self, real=1, year=1, cluster=0):
     """
       Plots the dispatch behavior for a given realization, year, and cluster
@@ -802,6 +1301,9 @@ class MOPED(Base):
     """
     self.raiseAMessage(f'Generating resource dispatch plots for {self._case.name}')
     time = np.array(self._m.t)
+    dispatch = self.extractDispatch()
+    template = self._dispatch_template
+    window = (real-1, year-1, cluster)
     for res in self._resources:
       plot_colors = ['green','red','blue','orange','teal','violet','brown','black','yellow']
       plt.figure(figsize=(2,1))
@@ -812,18 +1314,12 @@ class MOPED(Base):
       main.set_xlim((0,time[-1]))
       for comp in self._components:
         if self._component_meta[comp.name]['Produces'] == res:
-          plot_dispatch = np.zeros(len(self._m.t))
-          dispatch = getattr(self._m,f'{comp.name}_dispatch_{real}_{year}')
-          for t in self._m.t:
-            plot_dispatch[t] = pyo.value(dispatch[(cluster,t)])
+          plot_dispatch = dispatch[template.format(comp=comp.name, tracker='production', res=res)][window]
           label = f'{comp.name} Production'
           main.plot(time,plot_dispatch,label=label,color=plot_colors[0])
           plot_colors.pop(0)
         elif self._component_meta[comp.name]['Demands'] == res:
-          plot_dispatch = np.zeros(len(self._m.t))
-          dispatch = getattr(self._m,f'{comp.name}_dispatch_{real}_{year}')
-          for t in self._m.t:
-            plot_dispatch[t] = -1*pyo.value(dispatch[(cluster,t)])
+          plot_dispatch = dispatch[template.format(comp=comp.name, tracker='production', res=res)][window]
           if self._component_meta[comp.name]['Dispatch'] =='fixed':
             label = f'{comp.name} Demand'
           else:
@@ -831,24 +1327,14 @@ class MOPED(Base):
           main.plot(time,plot_dispatch,label=label,color=plot_colors[0])
           plot_colors.pop(0)
         elif self._component_meta[comp.name]['Consumes'] == res:
-          plot_dispatch = np.zeros(len(self._m.t))
-          dispatch = getattr(self._m,f'{comp.name}_consume_{real}_{year}')
-          for t in self._m.t:
-            plot_dispatch[t] = -1*pyo.value(dispatch[(cluster,t)])
+          plot_dispatch = dispatch[template.format(comp=comp.name, tracker='production', res=res)][window]
           label = f'{comp.name} Consumption'
           main.plot(time,plot_dispatch,label=label,color=plot_colors[0])
           plot_colors.pop(0)
         elif self._component_meta[comp.name]['Stores'] == res:
-          plot_level = np.zeros(len(self._m.t))
-          plot_charge = np.zeros(len(self._m.t))
-          plot_discharge = np.zeros(len(self._m.t))
-          level = getattr(self._m,f'{comp.name}_level_{real}_{year}')
-          charge = getattr(self._m,f'{comp.name}_charge_{real}_{year}')
-          discharge = getattr(self._m,f'{comp.name}_discharge_{real}_{year}')
-          for t in self._m.t:
-            plot_level[t] = pyo.value(level[(cluster,t)])
-            plot_charge[t] = -1*pyo.value(charge[(cluster,t)])
-            plot_discharge[t] = pyo.value(discharge[(cluster,t)])
+          plot_level = dispatch[template.format(comp=comp.name, tracker='level', res=res)][window]
+          plot_charge = dispatch[template.format(comp=comp.name, tracker='charge', res=res)][window]
+          plot_discharge = dispatch[template.format(comp=comp.name, tracker='discharge', res=res)][window]
           label = f'{comp.name} Charging'
           main.plot(time,plot_charge,label=label,color=plot_colors[0],marker='x',ls='--')
           label = f'{comp.name} Discharging'
@@ -875,13 +1361,40 @@ class MOPED(Base):
       @ In, None
       @ Out, None
     """
+    if self._case.moped['solver'] != 'auto':
+      self.setSolver(self._case.moped['solver'])
+    if not self._case.moped['warm_start']:
+      self.runProblem()
+      return
+    # Clustered solution provides the starting point for the full resolution problem
+    self.raiseAMessage('Solving with clustered synthetic histories to warm start the full resolution solve')
+    self._eval_mode = 'clustered'
+    self.runProblem()
+    start = self.getWarmStart()
+    self.resetProblem()
+    self.raiseAMessage('Solving with full resolution synthetic histories')
+    self._eval_mode = 'full'
+    self.runProblem(start)
+
+  def runProblem(self, start=None):
+    """
+      Builds and solves the problem for the current evaluation mode
+      @ In, start, dict, optional, clustered solution to start from, see getWarmStart
+      @ Out, None
+    """
     # Settings and metas help to build pyomo problem with cashflows
     self.buildEconSettings()
     self.buildComponentMeta()
     self.buildCashflowMeta()
     self.buildMultiplicityMeta()
     self.collectResources()
+    self.buildIndexSets()
     self.buildMultiplicityVariables()
+    if self._case.moped['decomposition'] == 'benders':
+      if self._sweep_values:
+        raise IOError('MOPED does not support sweep values with Benders decomposition')
+      self.runBenders(start)
+      return
     # Each component will have dispatch and cashflow associated
     for comp in self._components:
       # Storage components have their own unique set of pyomo variables
@@ -895,18 +1408,199 @@ class MOPED(Base):
       self._cf_components.append(cf_comp)
     self.raiseAMessage(f'Building pyomo cash flow expression for {self._case.name}')
     # TEAL is our cost function generator here
+    # Only capex, yearly, and amortization cashflows remain symbolic in TEAL
     metrics = RunCashFlow.run(self._econ_settings, self._cf_components, {}, pyomoVar=True)
-    self._m.NPV = pyo.Objective(expr=metrics['NPV'], sense=pyo.maximize)
+    self._m.NPV = pyo.Objective(expr=metrics['NPV'] + self.buildHourlyNPV(), sense=pyo.maximize)
     # Constraints need to be built for conservation and bounds of dispatch
     self.buildConstraints()
+    if start is not None:
+      self.applyWarmStart(start)
     # NOTE this currently displays just optimizer info and capacities and cost funtion
     # TODO does this need to present information about dispatches, how to do this?
     self.raiseAMessage(f'Running Optimizer...')
-    self.solveAndDisplay()
+    if self._sweep_values:
+      # Each combination has its own dispatch, so there is no single dispatch to plot
+      if self._case.moped['dispatch_output'] is not None:
+        self.raiseAWarning('Dispatch output is not available with sweep values')
+      self.solveSweep()
+      return
+    self.solveAndDisplay(warmstart=start is not None)
+    output = self._case.moped['dispatch_output']
+    if output is not None:
+      self.writeDispatch(output['file'], output['compression'])
     # TODO provide way for user to turn plotting on and off, defaults to off
     if self._plot:
       self.dispatchPlot()
 
+  def runBenders(self, start=None):
+    """
+      Runs the workflow with Benders decomposition, after the settings and metas are built
+      @ In, start, dict, optional, clustered solution to start from, see getWarmStart
+      @ Out, None
+    """
+    # Dispatch is only built in the subproblems, hourly cashflows are linked to it there
+    for comp in self._components:
+      capacity = self._component_meta[comp.name]['Capacity']
+      self._cf_components.append(self.createCashflowComponent(comp, capacity, None))
+    self.raiseAMessage(f'Building pyomo capital cash flow expression for {self._case.name}')
+    metrics = RunCashFlow.run(self._econ_settings, self._cf_components, {}, pyomoVar=True)
+    if start is not None:
+      # Only the capacities apply, they are the first point evaluated by the subproblems
+      self.applyWarmStart(start)
+    self.raiseAMessage(f'Running Benders decomposition...')
+    self.solveBenders(metrics['NPV'])
+    if self._plot:
+      self.raiseAWarning('Dispatch plots are not available with Benders decomposition')
+    if self._case.moped['dispatch_output'] is not None:
+      self.raiseAWarning('Dispatch output is not available with Benders decomposition')
+
+  def resetProblem(self):
+    """
+      Clears the problem built by a previous run, keeping loaded synthetic histories
+      @ In, None
+      @ Out, None
+    """
+    self._m = None
+    self._component_meta = {}
+    self._cf_meta = {}
+    self._cf_components = []
+    self._hourly_cashflows = []
+    self._multiplicity_meta = {}
+    self._resources = []
+    self._subproblems = {}
+    self._sweep_values = {}
+
+  def getDispatchArray(self, var):
+    """
+      Collects the values of a variable indexed by realization, year, cluster, and hour into an array
+      @ In, var, pyomo indexed var/param, variable (or fixed dispatch parameter) of the current model
+      @ Out, values, np.array, values as [realization, year, cluster, hour], NaN where not set
+    """
+    shape = (len(self._m.r), len(self._m.y), len(self._m.c), len(self._m.t))
+    if var.ctype is pyo.Param:
+      values = np.fromiter((pyo.value(v) for v in var.values()), dtype=float, count=len(var))
+    else:
+      values = np.fromiter((np.nan if v.value is None else v.value for v in var.values()), dtype=float, count=len(var))
+    return values.reshape(shape)
+
+  def extractDispatch(self):
+    """
+      Collects the optimized dispatch of all components, with the same naming and sign convention as the
+      standard workflow (resources supplied are positive, resources used are negative)
+      @ In, None
+      @ Out, dispatch, dict, {variable name: np.array of activity as [realization, year, cluster, hour]}
+    """
+    template = self._dispatch_template
+    dispatch = {}
+    for comp in self._components:
+      meta = self._component_meta[comp.name]
+      if meta['Stores'] is not None:
+        for tracker, sign in [('level', 1), ('charge', -1), ('discharge', 1)]:
+          values = self.getDispatchArray(getattr(self._m, f'{comp.name}_{tracker}'))
+          dispatch[template.format(comp=comp.name, tracker=tracker, res=meta['Stores'])] = sign * values
+        continue
+      activity = self.getDispatchArray(getattr(self._m, f'{comp.name}_dispatch'))
+      if meta['Produces'] is not None:
+        dispatch[template.format(comp=comp.name, tracker='production', res=meta['Produces'])] = activity
+      if meta['Demands'] is not None:
+        dispatch[template.format(comp=comp.name, tracker='production', res=meta['Demands'])] = -activity
+      if meta['Consumes'] is not None:
+        consume = self.getDispatchArray(getattr(self._m, f'{comp.name}_consume'))
+        dispatch[template.format(comp=comp.name, tracker='production', res=meta['Consumes'])] = -consume
+    return dispatch
+
+  def writeDispatch(self, path, compression=4):
+    """
+      Writes the optimized dispatch of all components to a compressed NetCDF4 (HDF5) file in one pass
+      @ In, path, str, file to write
+      @ In, compression, int, optional, zlib compression level (0 for none, up to 9)
+      @ Out, None
+    """
+    if netCDF4 is None:
+      raise IOError('Writing MOPED dispatch requires the "netCDF4" python library, which was not found!')
+    dispatch = self.extractDispatch()
+    dims = ('realization', 'year', 'cluster', 'hour')
+    coords = (np.arange(len(self._m.r)) + 1, np.array(list(self._m.y)) + 1,
+              np.array(list(self._m.c)), np.array(list(self._m.t)))
+    multiplicity = np.array([[pyo.value(self._m.multiplicity[y, c]) for c in self._m.c] for y in self._m.y])
+    with netCDF4.Dataset(path, 'w', format='NETCDF4') as dataset:
+      for name, values in zip(dims, coords):
+        dataset.createDimension(name, len(values))
+        dataset.createVariable(name, int, (name,))[:] = values
+      # Realization weights and cluster multiplicities are needed to aggregate dispatch as in the NPV
+      dataset.createVariable('weight', float, ('realization',))[:] = self.getRealizationWeights()
+      dataset.createVariable('multiplicity', float, ('year', 'cluster'))[:] = multiplicity
+      for name, values in dispatch.items():
+        # one chunk per realization and year
+        dataset.createVariable(name, float, dims, zlib=compression > 0, complevel=compression,
+                               chunksizes=(1, 1, len(coords[2]), len(coords[3])))[:] = values
+    self.raiseAMessage(f'Wrote dispatch of {len(dispatch)} variables to "{path}"')
+
+  def getWarmStart(self):
+    """
+      Collects the clustered solution for starting the full resolution solve
+      @ In, None
+      @ Out, start, dict, optimized capacities, dispatch values as [realization, year, cluster, hour] by variable
+                          name, and the cluster representing each segment of each year
+    """
+    capacities = {}
+    for name, meta in self._component_meta.items():
+      if isinstance(meta['Capacity'], pyo.Var):
+        capacities[name] = meta['Capacity'].value
+    # Benders models have no dispatch on the master problem
+    dispatch = {}
+    for var in self._m.component_objects(pyo.Var, active=True):
+      if var.dim() == 4:
+        dispatch[var.local_name] = self.getDispatchArray(var)
+    structure = hutils.get_synthhist_structure(self.getSyntheticSource()._target_file)
+    segment_clusters = []
+    for year in sorted(structure['clusters']):
+      clusters = structure['clusters'][year]
+      mapping = np.zeros(1 + max(int(seg) for info in clusters for seg in info['represents']), dtype=int)
+      for info in clusters:
+        mapping[[int(seg) for seg in info['represents']]] = info['id']
+      segment_clusters.append(mapping)
+    return {'capacities': capacities, 'dispatch': dispatch, 'segment_clusters': segment_clusters,
+            'segment_hours': len(self._m.t)}
+
+  def applyWarmStart(self, start):
+    """
+      Initializes the current problem from a clustered solution. The dispatch of each hour is set to the
+      dispatch of the same hour of the cluster representing its segment.
+      @ In, start, dict, clustered solution, see getWarmStart
+      @ Out, None
+    """
+    margin = self._case.moped['warm_start_margin']
+    for name, value in start['capacities'].items():
+      var = self._component_meta[name]['Capacity']
+      lower, upper = var.bounds
+      if margin is not None:
+        width = margin * (upper - lower)
+        lower = max(lower, value - width)
+        upper = min(upper, value + width)
+        var.setlb(lower)
+        var.setub(upper)
+        self.raiseADebug(f'Capacity bounds of {name} tightened to ({lower}, {upper})')
+      var.set_value(min(max(value, lower), upper))
+    segment_hours = start['segment_hours']
+    hours = np.arange(len(self._m.c) * len(self._m.t))
+    for name, values in start['dispatch'].items():
+      var = self._m.component(name)
+      if var is None:
+        continue
+      mapped = np.empty((len(self._m.r), len(self._m.y), len(hours)))
+      for y in self._m.y:
+        segment_clusters = start['segment_clusters'][y]
+        segments = np.minimum(hours // segment_hours, len(segment_clusters) - 1)
+        offsets = np.minimum(hours - segments * segment_hours, segment_hours - 1)
+        for r in self._m.r:
+          # realizations are sampled independently at each resolution, so any clustered realization is a fair start
+          mapped[r, y] = values[r % len(values), y, segment_clusters[segments], offsets]
+      for v, value in zip(var.values(), mapped.ravel()):
+        if not np.isnan(value):
+          v.set_value(value, skip_validation=True)
+    self.raiseAMessage(f'Initialized {self._case.name} from the clustered solution')
+
   # ===========================
   # UTILITIES
   # ===========================
@@ -954,6 +1648,18 @@ class MOPED(Base):
     self._sources = sources
     self.raiseADebug(f'Setting MOPED sources variable to {sources}')
 
+  def setSeed(self, seed):
+    """
+      Sets the seed for sampling synthetic histories
+      NOTE the synthetic history ROM draws from RAVEN's global random number generator, so
+      sampleSyntheticHistory reseeds it (randomUtils.randomSeed) and this seed carries over to
+      anything sampled from it afterwards in the same process
+      @ In, seed, int, seed for the random number generator, or None to not reseed
+      @ Out, None
+    """
+    self._seed = seed
+    self.raiseADebug(f'Set synthetic history seed to {seed}')
+
   def setSolver(self, solver):
     """
       Sets optimizer that pyomo runs in MOPED
@@ -988,14 +1694,13 @@ class MOPED(Base):
       raise IOError(f'Your {target} is not a valid attribute for MOPED.',
                     f'Please select from {acceptable_targets}')
 
-  def getPreviousIndex(self, comp_name, variable, real, year, c, t, initial_value):
+  def getPreviousIndex(self, variable, r, y, c, t, initial_value):
     """
       Given an indexed variable, returns the value of the same variable, but of the previous index
       This is specifically useful for the development of battery level constraints
-      @ In, comp_name, string, name of component that variable belongs to
-      @ In, variable, pyomo var object
-      @ In, real, int, realization of the variable
-      @ In, year, int, year of the variable
+      @ In, variable, pyomo var object, indexed by realization, year, cluster, and hour
+      @ In, r, int, realization of the variable
+      @ In, y, int, year of the variable
       @ In, c, int, current cluster index
       @ In, t, int, current time index
       @ In, initial_value, float, initial value of var prior to analysis start
@@ -1006,13 +1711,12 @@ class MOPED(Base):
     cluster = len(self._m.c)
     if t == 0:
       if c == 0:
-        if year == 1:
+        if y == self._m.y.first():
           return initial_value
         else:
-          previous_level = getattr(self._m,f'{comp_name}_level_{real}_{year}')
           # Indexing pyomo vars is more direct hence the -1
-          return previous_level[(cluster-1,time-1)]
+          return variable[r, y-1, cluster-1, time-1]
       else:
-        return variable[(c-1,time-1)]
+        return variable[r, y, c-1, time-1]
     else:
-      return variable[(c, t-1)]
+      return variable[r, y, c, t-1]
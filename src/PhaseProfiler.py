@@ -0,0 +1,133 @@
+# Copyright 2020, Battelle Energy Alliance, LLC
+# ALL RIGHTS RESERVED
+"""
+  Records the wall time and memory use of the phases of an inner run.
+"""
+import os
+import json
+import tracemalloc
+from contextlib import contextmanager
+from time import time as run_clock
+try:
+  import resource
+except ImportError:
+  # not available on Windows; peak resident memory is then not reported
+  resource = None
+
+class PhaseProfiler:
+  """
+    Collects timing and memory records for named phases, optionally labeled (e.g. by year and segment).
+    When disabled, phases cost almost nothing, so instrumentation can stay in place.
+  """
+  modes = ['time', 'memory']
+  env_var = 'HERON_PROFILE'
+  file_name = 'heron_profile.json'
+
+  @classmethod
+  def from_settings(cls, case, start=None):
+    """
+      Creates a profiler as requested by the environment or, if not set there, by the Case debug settings.
+      @ In, case, HERON Case, case with debug settings
+      @ In, start, float, optional, time at which the profiled run started, if before now
+      @ Out, profiler, PhaseProfiler, profiler (possibly disabled)
+    """
+    mode = os.environ.get(cls.env_var) or case.debug.get('profile')
+    return cls(mode, start=start)
+
+  def __init__(self, mode=None, start=None):
+    """
+      Constructor.
+      @ In, mode, str, optional, "time" for wall time and peak resident memory, "memory" to also trace
+                       Python allocations, or None to disable profiling
+      @ In, start, float, optional, time at which the profiled run started, if before now
+      @ Out, None
+    """
+    if mode is not None and mode not in self.modes:
+      raise IOError(f'Unrecognized profiling mode "{mode}" from {self.env_var} or <debug><profile>! ' +
+                    f'Options are {self.modes}.')
+    self._mode = mode
+    self._records = []
+    self._start = run_clock() if start is None else start
+    if mode == 'memory' and not tracemalloc.is_tracing():
+      tracemalloc.start()
+
+  def is_enabled(self):
+    """
+      Checks if profiling is enabled.
+      @ In, None
+      @ Out, enabled, bool, True if profiling
+    """
+    return self._mode is not None
+
+  @contextmanager
+  def phase(self, name, **labels):
+    """
+      Profiles the enclosed code as one phase. Phases are not expected to be nested.
+      @ In, name, str, name of the phase
+      @ In, labels, dict, additional labels for this record (e.g. year, segment)
+      @ Out, None
+    """
+    if self._mode is None:
+      yield
+      return
+    if self._mode == 'memory':
+      tracemalloc.reset_peak()
+    start = run_clock()
+    try:
+      yield
+    finally:
+      self.record(name, run_clock() - start, **labels)
+
+  def record(self, name, wall_time, **labels):
+    """
+      Adds a record for a phase that was timed separately.
+      @ In, name, str, name of the phase
+      @ In, wall_time, float, wall time of the phase in seconds
+      @ In, labels, dict, additional labels for this record (e.g. year, segment)
+      @ Out, None
+    """
+    if self._mode is None:
+      return
+    entry = {'phase': name, 'wall_time': wall_time}
+    entry.update(labels)
+    if resource is not None:
+      # peak of the process so far; ru_maxrss is in kB on Linux
+      entry['peak_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    if self._mode == 'memory':
+      entry['traced_peak_mb'] = tracemalloc.get_traced_memory()[1] / 1024**2
+    self._records.append(entry)
+
+  def summarize(self):
+    """
+      Aggregates the records by phase.
+      @ In, None
+      @ Out, summary, dict, {phase: {count, total_time, max_time, fraction}} in order of first occurrence
+    """
+    total = run_clock() - self._start
+    summary = {}
+    for entry in self._records:
+      info = summary.setdefault(entry['phase'], {'count': 0, 'total_time': 0.0, 'max_time': 0.0})
+      info['count'] += 1
+      info['total_time'] += entry['wall_time']
+      info['max_time'] = max(info['max_time'], entry['wall_time'])
+      if 'traced_peak_mb' in entry:
+        info['traced_peak_mb'] = max(info.get('traced_peak_mb', 0.0), entry['traced_peak_mb'])
+    for info in summary.values():
+      info['fraction'] = info['total_time'] / total if total > 0 else 0.0
+    return summary
+
+  def write(self, location):
+    """
+      Writes the summary and all records to file.
+      @ In, location, str, directory in which to write
+      @ Out, path, str, path to the written file, or None if profiling is disabled
+    """
+    if self._mode is None:
+      return None
+    path = os.path.join(location, self.file_name)
+    with open(path, 'w') as f:
+      json.dump({'mode': self._mode,
+                 'total_time': run_clock() - self._start,
+                 'summary': self.summarize(),
+                 'records': self._records}, f, indent=2, default=str)
+    return path
@@ -11,6 +11,7 @@ import copy
 
 import HERON.src._utils as hutils
 from HERON.src.base import Base
+from HERON.src import EvaluationCounter
 
 FRAMEWORK_PATH = hutils.get_raven_loc()
 sys.path.append(FRAMEWORK_PATH)
@@ -321,6 +322,7 @@ class Function(Placeholder):
         continue
       self._module_methods[name] = member
 
+  @EvaluationCounter.counted(lambda fn, method, *args, **kwargs: (fn.name, method, 'Function'))
   def evaluate(self, method, request, data_dict):
     """
       Evaluates requested method in stored module.
@@ -382,6 +384,7 @@ class ROM(Placeholder):
     self._runner = ravenROMexternal(self._target_file, FRAMEWORK_PATH)
     # TODO is this serializable? or get/set state for this?
 
+  @EvaluationCounter.counted(lambda rom, *args, **kwargs: (rom.name, 'evaluate', 'ROM'))
   def evaluate(self, rlz):
     """
       Evaluates requested method in stored module.
@@ -0,0 +1,200 @@
+# Copyright 2020, Battelle Energy Alliance, LLC
+# ALL RIGHTS RESERVED
+"""
+  Compact binary transfer of the inner run summary to the outer run.
+  The inner writes its economic metrics and statistics to a single ".npz" store
+  through the SummaryStore OutStream, and the outer loads it through the RAVEN
+  code interface defined here, in place of a NetCDF database or CSV.
+"""
+import os
+import sys
+
+import numpy as np
+import xarray as xr
+
+from . import _utils as hutils
+
+raven_path = hutils.get_raven_loc()
+sys.path.append(raven_path)
+from ravenframework import DataObjects
+from ravenframework.PluginBaseClasses.OutStreamPlotPlugin import PlotPlugin, InputTypes, InputData
+from ravenframework.PluginBaseClasses.CodePluginBase import CodePluginBase
+from ravenframework.CodeInterfaceClasses.RAVEN import RAVENInterface, RAVENparser
+sys.path.pop()
+
+extension = '.npz'
+
+def write_summary(path, dataset):
+  """
+    Writes the realizations of a summary to a store.
+    @ In, path, str, path of the store to write
+    @ In, dataset, xr.Dataset, summary realizations, indexed only by the sample tag
+    @ Out, None
+  """
+  variables = {}
+  for var in dataset.data_vars:
+    values = dataset[var].values
+    # object arrays can only be stored by pickling, so store them as numbers or text instead
+    if values.dtype == object:
+      try:
+        values = values.astype(float)
+      except (TypeError, ValueError):
+        values = values.astype(str)
+    variables[var] = values
+  np.savez(path, **variables)
+
+def read_summary(path, sample_tag):
+  """
+    Reads the realizations of a summary from a store.
+    @ In, path, str, path of the store to read
+    @ In, sample_tag, str, name of the realization index
+    @ Out, dataset, xr.Dataset, summary realizations
+  """
+  with np.load(path, allow_pickle=False) as store:
+    variables = dict((var, (sample_tag, store[var])) for var in store.files)
+  samples = len(next(iter(variables.values()))[1]) if variables else 0
+  return xr.Dataset(variables, coords={sample_tag: np.arange(samples)})
+
+
+class SummaryStore(PlotPlugin):
+  """
+    Writes the scalar summary of an inner run to a single binary store.
+  """
+  @classmethod
+  def getInputSpecification(cls):
+    """
+      Define the acceptable user inputs for this class.
+      @ In, None
+      @ Out, specs, InputData.ParameterInput,
+    """
+    specs = super().getInputSpecification()
+    specs.addSub(InputData.parameterInputFactory('source', contentType=InputTypes.StringType))
+    return specs
+
+  def __init__(self):
+    """
+      Constructor.
+      @ In, None
+      @ Out, None
+    """
+    super().__init__()
+    self.printTag = 'HERON.SummaryStore'
+    self._sourceName = None
+    self._source = None
+
+  def handleInput(self, spec):
+    """
+      Reads in data from the input file
+      @ In, spec, InputData.ParameterInput, input information
+      @ Out, None
+    """
+    super().handleInput(spec)
+    for node in spec.subparts:
+      if node.getName() == 'source':
+        self._sourceName = node.value
+
+  def initialize(self, stepEntities):
+    """
+      Set up the store for each run
+      @ In, stepEntities, dict, entities from the Step
+      @ Out, None
+    """
+    super().initialize(stepEntities)
+    src = self.findSource(self._sourceName, stepEntities)
+    if src is None:
+      self.raiseAnError(IOError, f'Source DataObject "{self._sourceName}" was not found in the Step!')
+    self._source = src
+
+  def run(self):
+    """
+      Write the store
+      @ In, None
+      @ Out, None
+    """
+    ds = self._source.asDataset()
+    if ds is None:
+      self.raiseAWarning(f'No data in "{self._source.name}" data object; nothing to store!')
+      return
+    path = self.name + extension
+    write_summary(path, ds)
+    self.raiseADebug(f'Stored summary to "{path}"')
+
+
+def find_summary_stores(tree):
+  """
+    Finds the SummaryStore OutStreams written in the active Steps of an inner RAVEN input.
+    @ In, tree, xml.etree.ElementTree.Element, root of the inner RAVEN input
+    @ Out, stores, dict, path of each store relative to the inner working directory, by store name
+  """
+  stores = {}
+  sequence = [step.strip() for step in tree.find('.//RunInfo/Sequence').text.split(',')]
+  for step in tree.find('.//Steps'):
+    if step.attrib['name'] not in sequence:
+      continue
+    for role in step.findall('Output'):
+      if role.attrib['class'] != 'OutStreams' or role.attrib['type'] != 'Plot':
+        continue
+      name = role.text.strip()
+      store = tree.find(f'.//OutStreams/Plot[@name="{name}"]')
+      if store is not None and store.attrib.get('subType') == 'HERON.SummaryStore':
+        stores[name] = name + extension
+  return stores
+
+
+class RAVEN(RAVENInterface.RAVEN, CodePluginBase):
+  """
+    RAVEN code interface that loads the inner results from a SummaryStore.
+    Named after the RAVEN interface so the outer Code model handles it as RAVEN running RAVEN.
+  """
+  def __init__(self):
+    """
+      Constructor.
+      @ In, None
+      @ Out, None
+    """
+    super().__init__()
+    self.printTag = 'HERON RAVEN INTERFACE'
+
+  def getInputExtension(self):
+    """
+      This method returns a list of extension the code interface accepts for the input file (the main one)
+      @ In, None
+      @ Out, tuple, tuple of strings containing accepted input extension
+    """
+    # the plugin base only declares this, so use the extensions set up by the RAVEN interface
+    return tuple(self.inputExtensions)
+
+  def initialize(self, runInfo, oriInputFiles):
+    """
+      Method to initialize the run of a new step
+      @ In, runInfo, dict,  dictionary of the info in the <RunInfo> XML block
+      @ In, oriInputFiles, list, list of the original input files
+      @ Out, None
+    """
+    # the RAVEN parser only lists <Print> OutStreams and NetCDF databases as outputs, so the
+    # summary stores are added here before checking the linked database as the base class does
+    # NOTE this class shares the name of the RAVEN interface, so this is its private method
+    index = self.__findInputFile(oriInputFiles)
+    parser = RAVENparser.RAVENparser(oriInputFiles[index].getAbsFile())
+    self.outStreamsNamesAndType, self.outDatabases = parser.returnOutputs()
+    self.outDatabases.update(find_summary_stores(parser.tree))
+    if self.linkedDatabaseName not in self.outDatabases:
+      raise IOError(f'{self.printTag} ERROR: The HERON.SummaryStore OutStream named "{self.linkedDatabaseName}" listed '+
+                    'in <outputDatabase> was not found among the OutStreams written in active Steps in the inner RAVEN! '+
+                    f'Found: {list(self.outDatabases.keys())}')
+    self.variableGroups = parser.returnVarGroups()
+    self.innerWorkingDir = parser.workingDir
+
+  def finalizeCodeOutput(self, command, output, workingDir):
+    """
+      Loads the summary of the inner run from its store.
+      @ In, command, string, the command used to run the just ended job
+      @ In, output, string, the Output name root
+      @ In, workingDir, string, current working dir
+      @ Out, dataObjectsToReturn, dict, data object with the inner summary, by store name
+    """
+    name = self.linkedDatabaseName
+    path = os.path.join(workingDir, self.innerWorkingDir, self.outDatabases[name])
+    data = DataObjects.factory.returnInstance('DataSet')
+    data.setData(read_summary(path, data.sampleTag), {})
+    return {name: data}
@@ -9,6 +9,7 @@ import os
 import sys
 
 from HERON.src import _utils as hutils
+from HERON.src import EvaluationCounter
 from HERON.src.ValuedParams import Parametric
 from HERON.src.ValuedParams import factory as VPFactory
 
@@ -58,6 +59,7 @@ class ValuedParamHandler(MessageUser):
     super().__init__()
     self.name = name         # member whom this ValuedParam provides values, e.g. Component.economics.alpha
     self._vp = None          # ValuedParam instance
+    self._owner = None       # name of the entity (e.g. component) this ValuedParam belongs to
     self._multiplier = None  # scalar multiplier for evaluation values
     self._growth_val = None  # used to grow the value year-by-year
     self._growth_mode = None # mode for growth (e.g. exponenetial, linear)
@@ -92,6 +94,7 @@ class ValuedParamHandler(MessageUser):
     # aliases get used to convert variable names, notably for the cashflow's "capacity"
     if alias_dict is None:
       alias_dict = {}
+    self._owner = comp_name
     # instantiate the requested ValuedParam
     found = False
     knownVPs = VPFactory.knownTypes()
@@ -170,13 +173,15 @@ class ValuedParamHandler(MessageUser):
     """
     return isinstance(self._vp, Parametric)
 
-  def set_const_VP(self, value):
+  def set_const_VP(self, value, owner=None):
     """
       Force the Handler to set a ValuedParam without doing reading.
       Mostly for testing.
       @ In, value, float, fixed value
+      @ In, owner, str, optional, name of the entity this ValuedParam belongs to
       @ Out, None
     """
+    self._owner = owner
     self._vp = VPFactory.returnInstance('fixed_value')
     self._vp.set_value(value)
 
@@ -200,6 +205,7 @@ class ValuedParamHandler(MessageUser):
     """
     self._vp.set_object(obj)
 
+  @EvaluationCounter.counted(lambda vp, *args, **kwargs: (getattr(vp, '_owner', None), vp.name, vp.type))
   def evaluate(self, *args, util_factor=False, **kwargs):
     """
       Evaluate the ValuedParam, wherever it gets its data from
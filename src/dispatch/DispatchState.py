@@ -15,6 +15,7 @@ class DispatchState:
     self._components = None # list of HERON Component objects
     self._resources = None  # Map of resources to indices for components, as {comp.name: {res, r}}
     self._times = None      # numpy array of time values, monotonically increasing
+    self._telemetry = []    # records describing how the dispatch was obtained, e.g. one per window
 
   def initialize(self, components, resources_map, times):
     """
@@ -36,6 +37,22 @@ class DispatchState:
     """
     return '<HERON generic DispatchState object>'
 
+  def add_telemetry(self, record):
+    """
+      Stores a record describing how (part of) the dispatch was obtained.
+      @ In, record, dict, telemetry record, such as timings and model sizes
+      @ Out, None
+    """
+    self._telemetry.append(record)
+
+  def get_telemetry(self):
+    """
+      Provides the records describing how the dispatch was obtained.
+      @ In, None
+      @ Out, telemetry, list, telemetry records (dicts) in the order they were stored
+    """
+    return self._telemetry
+
   def get_activity(self, comp, activity, res, time, **kwargs):
     """
       Getter for activity level.
@@ -89,6 +106,32 @@ class DispatchState:
     # to be overwritten by implementing classes
     raise NotImplementedError
 
+  def get_activity_vector(self, comp, activity, r):
+    """
+      Getter for activity level at all times.
+      @ In, comp, HERON Component, component whose information should be retrieved
+      @ In, activity, str, tracking variable name for activity subset
+      @ In, r, int, index of resource to retrieve (as given by meta[HERON][resource_indexer])
+      @ Out, activity, np.array, activity level at each time
+    """
+    result = np.empty(len(self._times))
+    for t in range(len(self._times)):
+      result[t] = self.get_activity_indexed(comp, activity, r, t)
+    return result
+
+  def get_raven_var_layout(self, template):
+    """
+      Lists the RAVEN variables written for this dispatch and where their values come from.
+      @ In, template, str, formating string for variable names (using {comp}, {tracker}, {res})
+      @ Out, layout, list, (variable name, component, tracker, resource index) for each variable
+    """
+    layout = []
+    for comp in self._components:
+      for tracker in comp.get_tracking_vars():
+        for res, r in self._resources[comp].items():
+          layout.append((template.format(comp=comp.name, tracker=tracker, res=res), comp, tracker, r))
+    return layout
+
   def create_raven_vars(self, template):
     """
       Writes out RAVEN variables as expected
@@ -97,13 +140,8 @@ class DispatchState:
     """
     #template = 'Dispatch__{c}__{r}' # standardized via input
     data = {}
-    for comp in self._components:
-      for tracker in comp.get_tracking_vars():
-        for res, r in self._resources[comp].items():
-          result = np.empty(len(self._times))
-          for t, time in enumerate(self._times):
-            result[t] = self.get_activity_indexed(comp, tracker, r, t)
-          data[template.format(comp=comp.name, tracker=tracker, res=res)] = result
+    for name, comp, tracker, r in self.get_raven_var_layout(template):
+      data[name] = np.array(self.get_activity_vector(comp, tracker, r))
     return data
 
 # NumpyState is the nominal DispatchState implementation
@@ -180,6 +218,16 @@ class NumpyState(DispatchState):
     """
     self._data[f'{comp.name}_{activity}'][r, t] = value
 
+  def get_activity_vector(self, comp, activity, r):
+    """
+      Getter for activity level at all times.
+      @ In, comp, HERON Component, component whose information should be retrieved
+      @ In, activity, str, tracking variable name for activity subset
+      @ In, r, int, index of resource to retrieve (as given by meta[HERON][resource_indexer])
+      @ Out, activity, np.array, activity level at each time (not a copy)
+    """
+    return self._data[f'{comp.name}_{activity}'][r]
+
   # def set_activity_vector(self, comp, tracker, res, start_time, end_time, values):
   def set_activity_vector(self, comp, res, values, tracker='production', start_idx=0, end_idx=None):
     """
@@ -199,3 +247,22 @@ class NumpyState(DispatchState):
 
     r = self._resources[comp][res]
     self._data[f'{comp.name}_{tracker}'][r, start_idx:end_idx] = values
+
+  def get_data(self):
+    """
+      Provides all stored activity, e.g. for saving to disk.
+      @ In, None
+      @ Out, data, dict, np.array activity (resources by time) for each "{component}_{tracker}"
+    """
+    return self._data
+
+  def set_data(self, data):
+    """
+      Sets all stored activity, e.g. when loading from disk. Must be called after "initialize".
+      @ In, data, dict, np.array activity (resources by time) for each "{component}_{tracker}"
+      @ Out, None
+    """
+    for key, values in data.items():
+      if key not in self._data:
+        raise KeyError(f'Unrecognized activity "{key}" for NumpyState!')
+      self._data[key][:] = values
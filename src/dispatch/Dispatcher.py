@@ -54,6 +54,14 @@ class Dispatcher(MessageUser, InputDataUser):
     """
     pass
 
+  def finalize(self):
+    """
+      Releases anything held over the dispatches of a run, e.g. worker processes.
+      @ In, None
+      @ Out, None
+    """
+    pass
+
   # ---------------------------------------------
   # GETTER AND SETTERS
   def get_time_discr(self):
@@ -75,6 +83,22 @@ class Dispatcher(MessageUser, InputDataUser):
     # don't expand into linspace right now, just store the pieces
     self._time_discretization = info
 
+  def get_batch_years(self):
+    """
+      Provides the number of years whose segments should be dispatched together through "dispatch_batch".
+      @ In, None
+      @ Out, batch_years, int, number of years per batch, or 0 if segments are dispatched one at a time
+    """
+    return 0
+
+  def get_result_settings(self):
+    """
+      Provides the settings that change the dispatch results, e.g. for identifying stored results.
+      @ In, None
+      @ Out, settings, dict, setting values by name
+    """
+    return {'time_discretization': self._time_discretization}
+
   def set_validator(self, validator):
     """
       Sets the dispatch validation instance to use in dispatching.
@@ -96,6 +120,18 @@ class Dispatcher(MessageUser, InputDataUser):
     """
     raise NotImplementedError # must be implemented by inheriting classes
 
+  def dispatch_batch(self, case, components, sources, metas):
+    """
+      Performs technoeconomic dispatch for several independent segments.
+      By default, each segment is dispatched separately.
+      @ In, case, Case, HERON case
+      @ In, components, list, HERON components
+      @ In, sources, list, HERON sources
+      @ In, metas, list, additional variables passed through, one dict for each segment
+      @ Out, results, list, dispatch results for each segment
+    """
+    return [self.dispatch(case, components, sources, meta) for meta in metas]
+
   def validate(self, components, activity, times, meta):
     """
       Method to validate a dispatch activity.
@@ -114,7 +150,8 @@ class Dispatcher(MessageUser, InputDataUser):
 
   # ---------------------------------------------
   # UTILITY METHODS
-  def _compute_cashflows(self, components, activity, times, meta, state_args=None, time_offset=0):
+  def _compute_cashflows(self, components, activity, times, meta, state_args=None, time_offset=0,
+                         time_indices=None, weights=None):
     """
       Method to compute CashFlow evaluations given components and their activity.
       @ In, components, list, HERON components whose cashflows should be evaluated
@@ -123,6 +160,8 @@ class Dispatcher(MessageUser, InputDataUser):
       @ In, meta, dict, additional info to be passed through to functional evaluations
       @ In, state_args, dict, optional, additional arguments to pass while getting activity state
       @ In, time_offset, int, optional, increase time index tracker by this value if provided
+      @ In, time_indices, np.array(int), optional, if provided then time index tracker for each time value
+      @ In, weights, np.array, optional, if provided then number of time steps each time value represents
       @ Out, total, float, total cashflows for given components
     """
     if state_args is None:
@@ -143,10 +182,12 @@ class Dispatcher(MessageUser, InputDataUser):
           specific_activity[tracker] = {}
           for resource in resource_indexer[comp]:
             specific_activity[tracker][resource] = activity.get_activity(comp, tracker, resource, time, **state_args)
-        specific_meta['HERON']['time_index'] = t + time_offset
+        specific_meta['HERON']['time_index'] = t + time_offset if time_indices is None else time_indices[t]
         specific_meta['HERON']['time_value'] = time
         cfs = comp.get_state_cost(specific_activity, specific_meta, marginal=True)
         time_subtotal = sum(cfs.values())
+        if weights is not None:
+          time_subtotal *= weights[t]
         comp_subtotal += time_subtotal
       total += comp_subtotal
     return total
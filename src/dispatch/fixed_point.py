@@ -0,0 +1,63 @@
+# Copyright 2020, Battelle Energy Alliance, LLC
+# ALL RIGHTS RESERVED
+"""
+  Accelerators for fixed-point (Picard) iterations of the form x = G(x).
+"""
+import numpy as np
+
+class FixedPointAccelerator:
+  """
+    Proposes the next iterate of a fixed-point iteration from the current iterate and its image.
+  """
+  methods = ['none', 'relaxation', 'anderson']
+
+  def __init__(self, method='none', relaxation=1.0, depth=3):
+    """
+      Constructor.
+      @ In, method, str, optional, one of "none" (plain Picard), "relaxation", or "anderson"
+      @ In, relaxation, float, optional, fraction of the step towards G(x) to take
+      @ In, depth, int, optional, number of previous iterates used by Anderson acceleration
+      @ Out, None
+    """
+    if method not in self.methods:
+      raise IOError(f'Unrecognized fixed point acceleration method "{method}"! Options are {self.methods}.')
+    self._method = method
+    self._relaxation = relaxation
+    self._depth = depth
+    self._iterates = []  # recent iterates x_k
+    self._residuals = [] # recent residuals G(x_k) - x_k
+
+  def update(self, x, g, lower=None, upper=None):
+    """
+      Determines the next iterate.
+      @ In, x, np.array, current iterate
+      @ In, g, np.array, image of the current iterate, G(x)
+      @ In, lower, np.array, optional, lower bound for each entry of the iterate
+      @ In, upper, np.array, optional, upper bound for each entry of the iterate
+      @ Out, new, np.array, next iterate
+    """
+    x = np.asarray(x, dtype=float)
+    g = np.asarray(g, dtype=float)
+    if self._method == 'none':
+      return g
+    residual = g - x
+    if self._method == 'relaxation':
+      return x + self._relaxation * residual
+    # Anderson acceleration, using differences of the recent iterates and residuals
+    self._iterates.append(x)
+    self._residuals.append(residual)
+    if len(self._iterates) > self._depth + 1:
+      self._iterates.pop(0)
+      self._residuals.pop(0)
+    if len(self._iterates) < 2:
+      return x + self._relaxation * residual
+    d_x = np.diff(np.asarray(self._iterates), axis=0).T
+    d_f = np.diff(np.asarray(self._residuals), axis=0).T
+    gamma = np.linalg.lstsq(d_f, residual, rcond=None)[0]
+    new = x + self._relaxation * residual - (d_x + self._relaxation * d_f) @ gamma
+    # extrapolation can overshoot, so stay within the bounds of each entry, if given,
+    # and otherwise within the values seen so far
+    seen = np.concatenate(self._iterates + [g])
+    lower = seen.min() if lower is None else lower
+    upper = seen.max() if upper is None else upper
+    return np.clip(new, lower, upper)
@@ -7,9 +7,13 @@
 
 import os
 import sys
+import copy
+import json
+import tempfile
 import time as time_mod
 import platform
 from itertools import compress
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 import pprint
 
 import numpy as np
@@ -25,6 +29,8 @@ from pyutilib.common._exceptions import ApplicationError
 
 from .Dispatcher import Dispatcher
 from .DispatchState import DispatchState, NumpyState
+from . import time_aggregation
+from .fixed_point import FixedPointAccelerator
 try:
   import _utils as hutils
 except (ModuleNotFoundError, ImportError):
@@ -71,9 +77,98 @@ class Pyomo(Dispatcher):
     specs.addSub(InputData.parameterInputFactory('debug_mode', contentType=InputTypes.BoolType,
         descr=r"""Enables additional printing in the pyomo dispatcher. Highly discouraged for production runs.
         \default{False}."""))
+    specs.addSub(InputData.parameterInputFactory('verbose', contentType=InputTypes.BoolType,
+        descr=r"""Enables printing of progress messages (window starts, solve attempts, solve times, and so on)
+        in the pyomo dispatcher. Solve failures are reported regardless. \default{False}."""))
+    specs.addSub(InputData.parameterInputFactory('telemetry', contentType=InputTypes.StringType,
+        descr=r"""If provided, then a record for each solved window is appended as one line of JSON to the file
+        at this path. Each record includes the year and division of the segment, the window bounds, the time
+        taken to build the model, the objective, the solve, validation, and retrieval, the number of variables
+        and constraints, the number of validation attempts and strategy (Picard) iterations, and the solver
+        status. Relative paths are relative to each inner run, so an absolute path is needed to collect
+        records from all inner runs in one file. The same records are always available from the resulting
+        dispatch through \texttt{get\_telemetry}. \default{None}."""))
     specs.addSub(InputData.parameterInputFactory('solver', contentType=InputTypes.StringType,
         descr=r"""Indicates which solver should be used by pyomo. Options depend on individual installation.
         \default{'glpk' for Windows, 'cbc' otherwise}."""))
+    specs.addSub(InputData.parameterInputFactory('pipeline_windows', contentType=InputTypes.BoolType,
+        descr=r"""Enables pipelined rolling windows, in which the optimization model for the next rolling
+        window is constructed on a worker thread while the solver is working on the current window.
+        The initial storage levels of the next window are set once the current window is solved.
+        Not used if any component is governed by a strategy, since those windows are solved iteratively.
+        \default{False}."""))
+    parallel = InputData.parameterInputFactory('parallel_windows', ordered=False,
+        descr=r"""Enables solving the rolling windows of each history concurrently in a process pool.
+        Since each window needs the storage levels at the end of the previous window, these boundary
+        levels are first estimated, then all windows are solved from the estimates, and finally a
+        sequential reconciliation pass re-solves only those windows whose estimated initial storage
+        levels differ from the actual levels by more than a tolerance. The process pool is started once
+        and kept for all segments and years of an inner run. Each worker receives only the
+        signal values of the windows it solves, so strategies and functions evaluated in a window should
+        only use the signal values within that window.""")
+    parallel.addSub(InputData.parameterInputFactory('workers', contentType=InputTypes.IntegerType,
+        descr=r"""number of processes to use for solving windows concurrently. \default{2}"""))
+    boundary_options = InputTypes.makeEnumType('BoundaryEstimate', 'BoundaryEstimateType',
+                                               ['initial', 'previous', 'coarse'])
+    parallel.addSub(InputData.parameterInputFactory('boundary_estimate', contentType=boundary_options,
+        descr=r"""method for estimating the storage levels at the start of each window. If \xmlString{initial},
+        the initial level of each storage component is used for every window. If \xmlString{previous}, the
+        levels from the most recent dispatch of a history of the same length are used, falling back to the
+        initial levels if none is available. If \xmlString{coarse}, the whole history is first solved at once
+        with its time steps merged into uniform blocks, about as many blocks as there are time steps in a
+        rolling window, and the resulting levels are used; this falls back to the initial levels if any
+        component is governed by a strategy or a validator is in use. \default{previous}"""))
+    parallel.addSub(InputData.parameterInputFactory('tolerance', contentType=InputTypes.FloatType,
+        descr=r"""relative tolerance on the difference between estimated and actual initial storage levels,
+        beyond which a window is re-solved during reconciliation. \default{1e-3}"""))
+    specs.addSub(parallel)
+    specs.addSub(InputData.parameterInputFactory('time_aggregation', contentType=InputTypes.FloatType,
+        descr=r"""Enables adaptive aggregation of time steps within each rolling window. Consecutive time steps
+        are merged into a single block of longer duration as long as none of the time-dependent signals
+        (such as prices, demands, or renewable availability) varies by more than this fraction of its range
+        over the window. The reduced problem is solved and the results are expanded back to the original
+        time steps; production is constant and storage levels change linearly within each block. Capacity
+        and minimum production limits are enforced at their most restrictive value within each block,
+        so the expanded dispatch respects the limits of every time step.
+        Smaller values give more accurate results, while larger values give smaller problems.
+        Not used if any component is governed by a strategy or if a validator is in use.
+        \default{no aggregation}"""))
+    specs.addSub(InputData.parameterInputFactory('warm_start', contentType=InputTypes.BoolType,
+        descr=r"""Enables warm-starting each rolling window from the most similar window already solved:
+        first the same window in the same segment (or cluster) of a previous year, then the same window in
+        the previously-solved segment. Variable values are always initialized from that solution, and the
+        solver's warm start interface is used if the solver supports it. Solutions are only reused while the
+        component capacities (e.g. those set by an outer optimization) are unchanged.
+        \default{False}."""))
+    convergence = InputData.parameterInputFactory('strategy_convergence', ordered=False,
+        descr=r"""Controls the iterative solution of rolling windows that include components governed by a
+        strategy. Each iteration solves the window with fixed governed activity, then evaluates the strategies
+        again with the resulting window dispatch available as \texttt{meta['HERON']['window\_dispatch']}, as
+        \{component name: \{tracking variable: \{resource: values for each time in the window\}\}\}. This entry
+        is not present for the first evaluation of each window, so strategies that don't respond to the
+        dispatch need not use it. Iteration stops as soon as the strategy output no longer changes.""")
+    convergence.addSub(InputData.parameterInputFactory('tolerance', contentType=InputTypes.FloatType,
+        descr=r"""relative L2 tolerance on the change in governed activity. \default{1e-4}"""))
+    convergence.addSub(InputData.parameterInputFactory('iterations', contentType=InputTypes.IntegerType,
+        descr=r"""maximum number of window solves per rolling window; must be at least 1. \default{10}"""))
+    acceleration_options = InputTypes.makeEnumType('Acceleration', 'AccelerationType', FixedPointAccelerator.methods)
+    convergence.addSub(InputData.parameterInputFactory('acceleration', contentType=acceleration_options,
+        descr=r"""method to accelerate convergence of the governed activity. If \xmlString{none}, the strategy
+        output is used directly for the next solve. If \xmlString{relaxation}, the next activity moves only part
+        of the way towards the strategy output. If \xmlString{anderson}, Anderson acceleration is applied using
+        the most recent iterations. \default{none}"""))
+    convergence.addSub(InputData.parameterInputFactory('relaxation', contentType=InputTypes.FloatType,
+        descr=r"""fraction of the step towards the strategy output to take each iteration, for
+        \xmlString{relaxation} and \xmlString{anderson} acceleration. \default{0.5}"""))
+    convergence.addSub(InputData.parameterInputFactory('depth', contentType=InputTypes.IntegerType,
+        descr=r"""number of previous iterations used by \xmlString{anderson} acceleration. \default{3}"""))
+    specs.addSub(convergence)
+    specs.addSub(InputData.parameterInputFactory('batch_years', contentType=InputTypes.IntegerType,
+        descr=r"""Enables batched dispatch, in which the segments (or clusters) of this many consecutive years are
+        stacked into a single block-diagonal optimization problem and solved with one solver call. This avoids
+        repeated solver startup costs when segments are short. Only used if each segment fits in a single
+        rolling window and no component is governed by a strategy; otherwise segments are dispatched one at a time.
+        \default{0, no batching}"""))
     # TODO specific for pyomo dispatcher
     return specs
 
@@ -85,9 +180,31 @@ class Pyomo(Dispatcher):
     """
     self.name = 'PyomoDispatcher' # identifying name
     self.debug_mode = False       # whether to print additional information
+    self._verbose = False         # whether to print progress messages
+    self._telemetry_file = None   # JSON lines file to append window telemetry to, if any
     self._window_len = 24         # time window length to dispatch at a time # FIXME user input
     self._solver = None           # overwrite option for solver
     self._picard_limit = 10       # iterative solve limit
+    self._picard_tol = 1e-4       # relative tolerance for iterative solves
+    self._acceleration = 'none'   # fixed point acceleration method for iterative solves
+    self._relaxation = 0.5        # relaxation factor for accelerated iterative solves
+    self._anderson_depth = 3      # number of iterations kept for Anderson acceleration
+    self._batch_years = 0         # number of years of segments to dispatch in a single solve, if any
+    self._pipeline = False        # whether to build the next window while solving the current one
+    self._parallel_workers = 0    # number of processes for concurrent window solves, if > 1
+    self._boundary_estimate = 'previous' # how to estimate storage levels at window boundaries
+    self._reconcile_tol = 1e-3    # relative boundary mismatch tolerance for re-solving windows
+    self._previous_levels = {}    # storage levels from the last dispatch, as {comp.name: np.array}
+    self._aggregation_tol = None  # relative signal variation allowed when merging time steps, if any
+    self._warm_start = False      # whether to initialize windows from previously-solved windows
+    self._warm_by_segment = {}    # last solution as {(capacities, division, time offset, length): {var: {index: value}}}
+    self._warm_by_window = {}     # last solution as {(capacities, time offset, length): {var: {index: value}}}
+    self._warm_capacities = None  # component capacities of the stored warm start solutions
+    self._model_export = None     # (directory, format) to write each window optimization problem to, if any
+    self._model_export_counts = {} # number of times each exported problem was written, as {name: count}
+    self._model_export_pending = None # in pool workers, (name, temporary path) of problems written for the parent
+    self._pool = None             # process pool for parallel rolling windows, kept over a run
+    self._pool_problem = None     # (case, components, sources, resources) the pool workers hold
 
   def read_input(self, specs):
     """
@@ -105,10 +222,64 @@ class Pyomo(Dispatcher):
     if debug_node is not None:
       self.debug_mode = debug_node.value
 
+    verbose_node = specs.findFirst('verbose')
+    if verbose_node is not None:
+      self._verbose = verbose_node.value
+
+    telemetry_node = specs.findFirst('telemetry')
+    if telemetry_node is not None:
+      self._telemetry_file = telemetry_node.value
+
     solver_node = specs.findFirst('solver')
     if solver_node is not None:
       self._solver = solver_node.value
 
+    pipeline_node = specs.findFirst('pipeline_windows')
+    if pipeline_node is not None:
+      self._pipeline = pipeline_node.value
+
+    parallel_node = specs.findFirst('parallel_windows')
+    if parallel_node is not None:
+      self._parallel_workers = 2
+      workers_node = parallel_node.findFirst('workers')
+      if workers_node is not None:
+        self._parallel_workers = workers_node.value
+      estimate_node = parallel_node.findFirst('boundary_estimate')
+      if estimate_node is not None:
+        self._boundary_estimate = estimate_node.value
+      tol_node = parallel_node.findFirst('tolerance')
+      if tol_node is not None:
+        self._reconcile_tol = tol_node.value
+
+    aggregation_node = specs.findFirst('time_aggregation')
+    if aggregation_node is not None:
+      self._aggregation_tol = aggregation_node.value
+
+    warm_node = specs.findFirst('warm_start')
+    if warm_node is not None:
+      self._warm_start = warm_node.value
+
+    batch_node = specs.findFirst('batch_years')
+    if batch_node is not None:
+      self._batch_years = batch_node.value
+
+    convergence_node = specs.findFirst('strategy_convergence')
+    if convergence_node is not None:
+      for sub in convergence_node.subparts:
+        name = sub.getName()
+        if name == 'tolerance':
+          self._picard_tol = sub.value
+        elif name == 'iterations':
+          self._picard_limit = sub.value
+        elif name == 'acceleration':
+          self._acceleration = sub.value
+        elif name == 'relaxation':
+          self._relaxation = sub.value
+        elif name == 'depth':
+          self._anderson_depth = sub.value
+      if self._picard_limit < 1:
+        raise IOError(f'<strategy_convergence><iterations> must be at least 1, but got {self._picard_limit}!')
+
     # check solver exists
     if self._solver is None:
       self._solver = SOLVER
@@ -142,6 +313,85 @@ class Pyomo(Dispatcher):
 
 
   ### API
+  def set_model_export(self, location, fmt='lp'):
+    """
+      Requests each window optimization problem be written to file before solving, e.g. for solver benchmarking.
+      Files are named by year, segment, window start, and the number of times that window was solved.
+      Windows solved in parallel are named by this process too, once the workers return them.
+      @ In, location, str, directory in which to write the problems
+      @ In, fmt, str, optional, file format recognized by Pyomo (e.g. "lp" or "mps")
+      @ Out, None
+    """
+    os.makedirs(location, exist_ok=True)
+    self._model_export = (location, fmt)
+    self._model_export_counts = {}
+
+  def get_batch_years(self):
+    """
+      Provides the number of years whose segments should be dispatched together.
+      @ In, None
+      @ Out, batch_years, int, number of years per batch, or 0 if not batching
+    """
+    return self._batch_years
+
+  def get_result_settings(self):
+    """
+      Provides the settings that change the dispatch results, e.g. for identifying stored results.
+      Progress, telemetry, export, and performance settings are not included.
+      @ In, None
+      @ Out, settings, dict, setting values by name
+    """
+    settings = super().get_result_settings()
+    settings.update({'window_len': self._window_len,
+                     'solver': self._solver,
+                     'picard_limit': self._picard_limit,
+                     'picard_tol': self._picard_tol,
+                     'acceleration': self._acceleration,
+                     'relaxation': self._relaxation,
+                     'anderson_depth': self._anderson_depth,
+                     'aggregation_tol': self._aggregation_tol})
+    return settings
+
+  def dispatch_batch(self, case, components, sources, metas):
+    """
+      Performs dispatch for several independent segments, stacking them into one problem if possible.
+      @ In, case, HERON Case, Case that this dispatch is part of
+      @ In, components, list, HERON components available to the dispatch
+      @ In, sources, list, HERON source (placeholders) for signals
+      @ In, metas, list, additional variables passed through, one dict for each segment
+      @ Out, dispatches, list, resulting dispatch for each segment
+    """
+    t_start, t_end, t_num = self.get_time_discr()
+    time = np.linspace(t_start, t_end, t_num) # Note we don't care about segment/cluster here
+    windows = self._get_window_bounds(len(time))
+    # segments can only be stacked if each is a single, non-iterative window
+    if len(windows) > 1 or self.needs_convergence(components):
+      return super().dispatch_batch(case, components, sources, metas)
+    resources = sorted(list(hutils.get_all_resources(components))) # list of all active resources
+    self._print(f'DEBUGG starting batched dispatch of {len(metas)} segments')
+    start = time_mod.time()
+    top = pyo.ConcreteModel()
+    parts = []
+    for b, meta in enumerate(metas):
+      # each segment is an independent block of the full problem
+      top.add_component(f'segment_{b}', pyo.Block())
+      m = getattr(top, f'segment_{b}')
+      initial_levels = self._get_initial_levels(components, None, meta)
+      self._build_window(time, 0, case, components, sources, resources, initial_levels, meta, m=m)
+      m.obj.deactivate()
+      parts.append((m, meta))
+    top.obj = pyo.Objective(expr=sum(m.obj.expr for m, _ in parts), sense=pyo.maximize)
+    results = self._solve_models(top, parts)
+    self._print('DEBUGG batched solve time: {} s'.format(time_mod.time()-start))
+    dispatches = []
+    for meta, subdisp in zip(metas, results):
+      dispatch = NumpyState()
+      dispatch.initialize(components, meta['HERON']['resource_indexer'], time)
+      self._store_window(dispatch, components, subdisp, 0, len(time))
+      self._write_telemetry(dispatch, meta)
+      dispatches.append(dispatch)
+    return dispatches
+
   def dispatch(self, case, components, sources, meta):
     """
       Performs dispatch.
@@ -159,9 +409,361 @@ class Pyomo(Dispatcher):
     dispatch = NumpyState()# dict((comp.name, dict((res, np.zeros(len(time))) for res in comp.get_resources())) for comp in components)
     dispatch.initialize(components, meta['HERON']['resource_indexer'], time)
     # rolling window
-    start_index = 0
-    final_index = len(time)
     # TODO window overlap!  ( )[ ] -> (   [  )   ]
+    windows = self._get_window_bounds(len(time))
+    if self._parallel_workers > 1 and len(windows) > 1:
+      self._dispatch_parallel(time, windows, case, components, sources, resources, meta, dispatch)
+      self._write_telemetry(dispatch, meta)
+      return dispatch
+    # pipelining only makes sense if each window is built and solved exactly once
+    if self._pipeline and not self.needs_convergence(components):
+      self._dispatch_pipelined(time, windows, case, components, sources, resources, meta, dispatch)
+      self._write_telemetry(dispatch, meta)
+      return dispatch
+    subdisp = None
+    for start_index, end_index in windows:
+      specific_time = time[start_index:end_index]
+      self._print('DEBUGG starting window {} to {}'.format(start_index, end_index))
+      start = time_mod.time()
+      # set initial storage levels
+      initial_levels = self._get_initial_levels(components, subdisp, meta)
+      subdisp = self._solve_window_converged(specific_time, start_index,
+                                             case, components, sources, resources,
+                                             initial_levels, meta)
+      end = time_mod.time()
+      self._print('DEBUGG solve time: {} s'.format(end-start))
+      # store result in corresponding part of dispatch
+      self._store_window(dispatch, components, subdisp, start_index, end_index)
+    self._write_telemetry(dispatch, meta)
+    return dispatch
+
+  ### INTERNAL
+  def _solve_window_converged(self, time, time_offset,
+                              case, components, sources, resources,
+                              initial_levels, meta):
+    """
+      Dispatches one window, iterating if governed components require convergence.
+      @ In, time, np.array, value of time to evaluate
+      @ In, time_offset, int, offset of the time index in the greater history
+      @ In, case, HERON Case, Case that this dispatch is part of
+      @ In, components, list, HERON components available to the dispatch
+      @ In, sources, list, HERON source (placeholders) for signals
+      @ In, resources, list, sorted list of all resources in problem
+      @ In, initial_levels, dict, initial storage levels if any
+      @ In, meta, dict, additional variables passed through
+      @ Out, subdisp, dict, results of window dispatch
+    """
+    if not self.needs_convergence(components):
+      return self.dispatch_window(time, time_offset,
+                                  case, components, sources, resources,
+                                  initial_levels, meta)
+    # allow for converging solution iteratively
+    accelerator = FixedPointAccelerator(self._acceleration, self._relaxation, self._anderson_depth)
+    names = sorted(comp.name for comp in components if comp.get_interaction().is_governed())
+    lengths = np.cumsum([len(time)] * len(names))[:-1]
+    lower, upper = self._get_governed_bounds(time, time_offset, components, names, meta)
+    # start from strategies that haven't seen this window's dispatch
+    meta['HERON'].pop('window_dispatch', None)
+    governed = self._evaluate_strategies(time, components, meta)
+    previous = None
+    for conv_counter in range(1, self._picard_limit + 1):
+      self._print(f'DEBUGG iteratively solving window, iteration {conv_counter}/{self._picard_limit} ...')
+      subdisp = self.dispatch_window(time, time_offset,
+                                    case, components, sources, resources,
+                                    initial_levels, meta, governed=governed)
+      # let the strategies respond to the new dispatch
+      meta['HERON']['window_dispatch'] = subdisp
+      strategy = self._evaluate_strategies(time, components, meta)
+      # the solve is consistent if the strategies reproduce the activity it used
+      if self.check_converged(strategy, governed, components):
+        break
+      # if the strategies stopped changing, their output is the fixed point
+      if self.check_converged(strategy, previous, components):
+        governed = strategy
+      else:
+        flat = accelerator.update(np.concatenate([governed[n] for n in names]),
+                                  np.concatenate([strategy[n] for n in names]),
+                                  lower=lower, upper=upper)
+        governed = dict(zip(names, np.split(flat, lengths)))
+      previous = strategy
+    meta['HERON'].pop('window_dispatch', None)
+    subdisp['_telemetry']['picard_iterations'] = conv_counter
+    return subdisp
+
+  def _get_governed_bounds(self, time, time_offset, components, names, meta):
+    """
+      Determines the limits of the activity of governed components within a window.
+      @ In, time, np.array, value of time to evaluate
+      @ In, time_offset, int, offset of the time index in the greater history
+      @ In, components, list, HERON components available to the dispatch
+      @ In, names, list, sorted names of the governed components
+      @ In, meta, dict, additional variables passed through
+      @ Out, lower, np.array, lower limit at each time for each governed component, concatenated
+      @ Out, upper, np.array, upper limit at each time for each governed component, concatenated
+    """
+    by_name = dict((comp.name, comp) for comp in components)
+    lower = []
+    upper = []
+    for name in names:
+      comp = by_name[name]
+      cap_res = comp.get_capacity_var()
+      caps = np.zeros(len(time))
+      for t in range(len(time)):
+        meta['HERON']['time_index'] = t + time_offset
+        caps[t] = comp.get_capacity(meta)[0][cap_res]
+      # storage levels are between empty and full; other activity may be consuming (negative) instead
+      lower.append(np.minimum(caps, 0))
+      upper.append(np.maximum(caps, 0))
+    return np.concatenate(lower), np.concatenate(upper)
+
+  def _dispatch_parallel(self, time, windows, case, components, sources, resources, meta, dispatch):
+    """
+      Dispatches all rolling windows concurrently from estimated initial storage levels, then
+      sequentially re-solves windows whose estimated initial levels turned out to be inaccurate.
+      @ In, time, np.array, values of time for the full history
+      @ In, windows, list, (start, end) index pairs for each rolling window
+      @ In, case, HERON Case, Case that this dispatch is part of
+      @ In, components, list, HERON components available to the dispatch
+      @ In, sources, list, HERON source (placeholders) for signals
+      @ In, resources, list, sorted list of all resources in problem
+      @ In, meta, dict, additional variables passed through
+      @ In, dispatch, NumpyState, results structure to fill with window solutions
+      @ Out, None
+    """
+    start = time_mod.time()
+    coarse = None
+    if self._boundary_estimate == 'coarse':
+      coarse = self._solve_coarse(time, case, components, sources, resources, meta)
+    estimates = self._estimate_boundary_levels(components, windows, len(time), meta, coarse=coarse)
+    # workers hold the problem definition from when the pool started, and receive only the
+    # segment variables and the signal values of its window with each task
+    pool = self._get_pool(case, components, sources, resources)
+    raven_vars = meta['HERON']['RAVEN_vars']
+    signals = self._get_signal_names(raven_vars, len(time))
+    worker_meta = dict(meta)
+    worker_meta['HERON'] = dict((key, value) for key, value in meta['HERON'].items() if key not in _WORKER_EXCLUDED)
+    worker_vars = dict((name, value) for name, value in raven_vars.items() if name not in signals)
+    futures = [pool.submit(_solve_window_worker, time[start_index:end_index], start_index, estimates[w],
+                           worker_meta, worker_vars,
+                           dict((name, raven_vars[name][start_index:end_index]) for name in signals))
+               for w, (start_index, end_index) in enumerate(windows)]
+    results = []
+    for future in futures:
+      subdisp, exported = future.result()
+      for name, path in exported:
+        self._name_export(name, path)
+      results.append(subdisp)
+    self._print('DEBUGG parallel window solve time: {} s'.format(time_mod.time()-start))
+    # reconcile window boundaries in order, since re-solving a window changes its final levels
+    by_name = dict((comp.name, comp) for comp in components)
+    subdisp = None
+    resolved = 0
+    for w, (start_index, end_index) in enumerate(windows):
+      if subdisp is not None:
+        actual = self._get_initial_levels(components, subdisp, meta)
+        if self._boundary_mismatch(by_name, actual, estimates[w], results[w]):
+          self._print('DEBUGG reconciling window {} to {}'.format(start_index, end_index))
+          results[w] = self._solve_window_converged(time[start_index:end_index], start_index,
+                                                    case, components, sources, resources,
+                                                    actual, meta)
+          resolved += 1
+      subdisp = results[w]
+      self._store_window(dispatch, components, subdisp, start_index, end_index)
+    self._print(f'DEBUGG reconciliation re-solved {resolved} of {len(windows) - 1} windows')
+    # keep the levels for estimating boundaries of the next history
+    self._previous_levels = {}
+    for name, comp in by_name.items():
+      if comp.get_interaction().is_type('Storage'):
+        res = comp.get_interaction().get_resource()
+        self._previous_levels[name] = np.concatenate([result[name]['level'][res] for result in results])
+
+  def _get_pool(self, case, components, sources, resources):
+    """
+      Provides the process pool for parallel rolling windows, starting it the first time it is needed.
+      Workers receive the problem definition once, so the pool is restarted only if the problem changes.
+      @ In, case, HERON Case, Case that this dispatch is part of
+      @ In, components, list, HERON components available to the dispatch
+      @ In, sources, list, HERON source (placeholders) for signals
+      @ In, resources, list, sorted list of all resources in problem
+      @ Out, pool, ProcessPoolExecutor, pool with the problem definition loaded in each worker
+    """
+    if self._pool is not None:
+      old_case, old_components, old_sources, old_resources = self._pool_problem
+      if old_case is case and old_components is components and old_sources is sources and old_resources == resources:
+        return self._pool
+      self.finalize()
+    self._pool = ProcessPoolExecutor(max_workers=self._parallel_workers, initializer=_init_window_worker,
+                                     initargs=(self._get_worker_copy(), case, components, sources, resources))
+    self._pool_problem = (case, components, sources, resources)
+    return self._pool
+
+  def finalize(self):
+    """
+      Shuts down the worker processes for parallel rolling windows, if any were started.
+      @ In, None
+      @ Out, None
+    """
+    if self._pool is not None:
+      self._pool.shutdown()
+      self._pool = None
+      self._pool_problem = None
+
+  def _get_worker_copy(self):
+    """
+      Makes a copy of this dispatcher to send to worker processes, without the state kept between dispatches.
+      @ In, None
+      @ Out, worker, Pyomo, dispatcher copy
+    """
+    worker = copy.copy(self)
+    worker._previous_levels = {}
+    worker._warm_by_segment = {}
+    worker._warm_by_window = {}
+    worker._warm_capacities = None
+    worker._pool = None
+    worker._pool_problem = None
+    # problems are written to temporary files and named by this process, which counts all solves
+    worker._model_export_pending = []
+    return worker
+
+  def _get_signal_names(self, raven_vars, final_index):
+    """
+      Finds the RAVEN variables that are signals indexed by time over the history.
+      @ In, raven_vars, dict, RAVEN variables sliced to the current segment
+      @ In, final_index, int, length of the history
+      @ Out, names, list, names of signal variables
+    """
+    names = []
+    for name in raven_vars['_indexMap'][0]:
+      values = np.asarray(raven_vars[name])
+      if values.ndim == 1 and len(values) >= final_index:
+        names.append(name)
+    return names
+
+  def _solve_coarse(self, time, case, components, sources, resources, meta):
+    """
+      Solves the whole history at once, with its time steps merged into uniform blocks so that the
+      problem is about the size of a rolling window, for estimating storage levels at window boundaries.
+      @ In, time, np.array, values of time for the full history
+      @ In, case, HERON Case, Case that this dispatch is part of
+      @ In, components, list, HERON components available to the dispatch
+      @ In, sources, list, HERON source (placeholders) for signals
+      @ In, resources, list, sorted list of all resources in problem
+      @ In, meta, dict, additional variables passed through
+      @ Out, levels, dict, storage levels at each time step as {comp.name: np.array}, or None if not possible
+    """
+    # strategies and validators work with individual time steps
+    if self._validator is not None or self.needs_convergence(components):
+      return None
+    size = int(np.ceil(len(time) / self._window_len))
+    counts = np.diff(np.append(np.arange(0, len(time), size), len(time)))
+    start = time_mod.time()
+    initial_levels = self._get_initial_levels(components, None, meta)
+    m = self._build_window(time, 0, case, components, sources, resources, initial_levels, meta, counts=counts)
+    subdisp = self._solve_window(m, meta)
+    self._print('DEBUGG coarse solve of {} blocks: {} s'.format(len(counts), time_mod.time()-start))
+    levels = {}
+    for comp in initial_levels:
+      levels[comp.name] = subdisp[comp.name]['level'][comp.get_interaction().get_resource()]
+    return levels
+
+  def _estimate_boundary_levels(self, components, windows, final_index, meta, coarse=None):
+    """
+      Estimates the initial storage levels for each rolling window.
+      @ In, components, list, HERON components available to the dispatch
+      @ In, windows, list, (start, end) index pairs for each rolling window
+      @ In, final_index, int, length of the history
+      @ In, meta, dict, additional variables passed through
+      @ In, coarse, dict, optional, storage levels from the coarse solve as {comp.name: np.array}
+      @ Out, estimates, list, initial storage levels for each window as {comp.name: level}
+    """
+    initial = self._get_initial_levels(components, None, meta)
+    estimates = []
+    for w, (start_index, _) in enumerate(windows):
+      estimate = {}
+      for comp, level in initial.items():
+        previous = self._previous_levels.get(comp.name)
+        if w > 0 and coarse is not None:
+          level = coarse[comp.name][start_index - 1]
+        elif w > 0 and self._boundary_estimate == 'previous' and previous is not None and len(previous) == final_index:
+          level = previous[start_index - 1]
+        estimate[comp.name] = level
+      estimates.append(estimate)
+    return estimates
+
+  def _boundary_mismatch(self, by_name, actual, estimate, subdisp):
+    """
+      Determines whether the estimated initial storage levels of a window are too inaccurate.
+      @ In, by_name, dict, HERON components as {comp.name: comp}
+      @ In, actual, dict, actual initial storage levels as {comp: level}
+      @ In, estimate, dict, estimated initial storage levels as {comp.name: level}
+      @ In, subdisp, dict, results of window dispatch solved from the estimated levels
+      @ Out, mismatch, bool, True if the window needs to be solved again
+    """
+    for comp, level in actual.items():
+      intr = comp.get_interaction()
+      # governed storage levels don't depend on the initial levels given to the window
+      if intr.is_governed():
+        continue
+      levels = subdisp[comp.name]['level'][intr.get_resource()]
+      scale = np.max(np.abs(levels))
+      diff = abs(level - estimate[comp.name]) / (scale if scale != 0 else 1)
+      if diff > self._reconcile_tol:
+        return True
+    return False
+
+  def _dispatch_pipelined(self, time, windows, case, components, sources, resources, meta, dispatch):
+    """
+      Dispatches all rolling windows in order, building the model for the next window on a worker
+      thread while the current window is being solved.
+      @ In, time, np.array, values of time for the full history
+      @ In, windows, list, (start, end) index pairs for each rolling window
+      @ In, case, HERON Case, Case that this dispatch is part of
+      @ In, components, list, HERON components available to the dispatch
+      @ In, sources, list, HERON source (placeholders) for signals
+      @ In, resources, list, sorted list of all resources in problem
+      @ In, meta, dict, additional variables passed through
+      @ In, dispatch, NumpyState, results structure to fill with window solutions
+      @ Out, None
+    """
+    # storage levels are only known once the previous window is solved, so build with placeholders
+    placeholder_levels = dict((comp, 0.0) for comp in components if comp.get_interaction().is_type('Storage'))
+    def build(start_index, end_index):
+      """
+        Builds the model for a window using its own copy of the time-index metadata.
+        @ In, start_index, int, first time index of the window
+        @ In, end_index, int, end time index (exclusive) of the window
+        @ Out, m, pyo.ConcreteModel, window model
+      """
+      build_meta = dict(meta)
+      build_meta['HERON'] = dict(meta['HERON'])
+      return self._build_window(time[start_index:end_index], start_index,
+                                case, components, sources, resources,
+                                placeholder_levels, build_meta)
+
+    subdisp = None
+    with ThreadPoolExecutor(max_workers=1) as builder:
+      next_model = builder.submit(build, *windows[0])
+      for w, (start_index, end_index) in enumerate(windows):
+        self._print('DEBUGG starting window {} to {}'.format(start_index, end_index))
+        start = time_mod.time()
+        m = next_model.result()
+        # start building the next window before handing this one to the solver
+        if w + 1 < len(windows):
+          next_model = builder.submit(build, *windows[w + 1])
+        self._set_initial_levels(m, self._get_initial_levels(components, subdisp, meta))
+        subdisp = self._solve_window(m, meta)
+        end = time_mod.time()
+        self._print('DEBUGG solve time: {} s'.format(end-start))
+        self._store_window(dispatch, components, subdisp, start_index, end_index)
+
+  def _get_window_bounds(self, final_index):
+    """
+      Determines the start and end indices of each rolling window in a history.
+      @ In, final_index, int, length of the history
+      @ Out, windows, list, (start, end) index pairs for each rolling window
+    """
+    windows = []
+    start_index = 0
     while start_index < final_index:
       end_index = start_index + self._window_len
       if end_index > final_index:
@@ -170,51 +772,89 @@ class Pyomo(Dispatcher):
         # TODO custom error raise for catching in DispatchManager?
         raise IOError("A rolling window of length 1 was requested, but this causes crashes in pyomo. " +
                       "Change the length of the rolling window to avoid length 1 histories.")
-      specific_time = time[start_index:end_index]
-      print('DEBUGG starting window {} to {}'.format(start_index, end_index))
-      start = time_mod.time()
-      # set initial storage levels
-      initial_levels = {}
-      for comp in components:
-        if comp.get_interaction().is_type('Storage'):
-          if start_index == 0:
-            initial_levels[comp] = comp.get_interaction().get_initial_level(meta)
-          else:
-            initial_levels[comp] = subdisp[comp.name]['level'][comp.get_interaction().get_resource()][-1]
-      # allow for converging solution iteratively
-      converged = False
-      conv_counter = 0
-      previous = None
-      while not converged:
-        conv_counter += 1
-        if conv_counter > self._picard_limit:
-          break
-        # dispatch
-        subdisp = self.dispatch_window(specific_time, start_index,
-                                      case, components, sources, resources,
-                                      initial_levels, meta)
-        # do we need a convergence criteria? Check now.
-        if self.needs_convergence(components):
-          print(f'DEBUGG iteratively solving window, iteration {conv_counter}/{self._picard_limit} ...')
-          converged = self.check_converged(subdisp, previous, components)
-          previous = subdisp
+      windows.append((start_index, end_index))
+      start_index = end_index
+    return windows
+
+  def _get_initial_levels(self, components, subdisp, meta):
+    """
+      Determines the initial storage levels for a rolling window.
+      @ In, components, list, HERON components available to the dispatch
+      @ In, subdisp, dict, results of the previous window dispatch, or None if first window
+      @ In, meta, dict, additional variables passed through
+      @ Out, initial_levels, dict, initial storage levels as {comp: level}
+    """
+    initial_levels = {}
+    for comp in components:
+      if comp.get_interaction().is_type('Storage'):
+        if subdisp is None:
+          initial_levels[comp] = comp.get_interaction().get_initial_level(meta)
         else:
-          converged = True
+          initial_levels[comp] = subdisp[comp.name]['level'][comp.get_interaction().get_resource()][-1]
+    return initial_levels
 
-      end = time_mod.time()
-      print('DEBUGG solve time: {} s'.format(end-start))
-      # store result in corresponding part of dispatch
-      for comp in components:
-        for tag in comp.get_tracking_vars():
-          for res, values in subdisp[comp.name][tag].items():
-            dispatch.set_activity_vector(comp, res, values, tracker=tag, start_idx=start_index, end_idx=end_index)
-      start_index = end_index
-    return dispatch
+  def _set_initial_levels(self, m, initial_levels):
+    """
+      Updates the initial storage levels of an already-built window model.
+      @ In, m, pyo.ConcreteModel, associated model
+      @ In, initial_levels, dict, initial storage levels as {comp: level}
+      @ Out, None
+    """
+    for comp, level in initial_levels.items():
+      # governed storages are parameters and have no initial level to set
+      param = getattr(m, f'{comp.name}_initial_level', None)
+      if param is not None:
+        param.set_value(level)
+
+  def _store_window(self, dispatch, components, subdisp, start_index, end_index):
+    """
+      Stores the results of a window dispatch in the full dispatch.
+      @ In, dispatch, NumpyState, results structure for the full history
+      @ In, components, list, HERON components available to the dispatch
+      @ In, subdisp, dict, results of window dispatch
+      @ In, start_index, int, first time index of the window
+      @ In, end_index, int, end time index (exclusive) of the window
+      @ Out, None
+    """
+    for comp in components:
+      for tag in comp.get_tracking_vars():
+        for res, values in subdisp[comp.name][tag].items():
+          dispatch.set_activity_vector(comp, res, values, tracker=tag, start_idx=start_index, end_idx=end_index)
+    record = {'start': start_index, 'end': end_index}
+    record.update(subdisp['_telemetry'])
+    dispatch.add_telemetry(record)
+
+  def _write_telemetry(self, dispatch, meta):
+    """
+      Appends the window telemetry of a dispatch to the telemetry file, if requested.
+      @ In, dispatch, DispatchState, completed dispatch
+      @ In, meta, dict, additional variables passed through
+      @ Out, None
+    """
+    if self._telemetry_file is None:
+      return
+    active = meta['HERON'].get('active_index', {})
+    lines = []
+    for record in dispatch.get_telemetry():
+      entry = {'year': active.get('year'), 'division': active.get('division')}
+      entry.update(record)
+      lines.append(json.dumps(entry, default=str) + '\n')
+    # one write per dispatch, so records from concurrent inner runs don't interleave
+    with open(self._telemetry_file, 'a') as telemetry:
+      telemetry.write(''.join(lines))
+
+  def _print(self, *args):
+    """
+      Prints a progress message, if requested.
+      @ In, args, list, items to print
+      @ Out, None
+    """
+    if self._verbose:
+      print(*args)
 
-  ### INTERNAL
   def dispatch_window(self, time, time_offset,
                       case, components, sources, resources,
-                      initial_storage, meta):
+                      initial_storage, meta, governed=None):
     """
       Dispatches one part of a rolling window.
       @ In, time, np.array, value of time to evaluate
@@ -225,21 +865,65 @@ class Pyomo(Dispatcher):
       @ In, resources, list, sorted list of all resources in problem
       @ In, initial_storage, dict, initial storage levels if any
       @ In, meta, dict, additional variables passed through
+      @ In, governed, dict, optional, activity of governed components as {comp.name: np.array};
+                      strategies are evaluated for any not provided
       @ Out, result, dict, results of window dispatch
     """
+    m = self._build_window(time, time_offset, case, components, sources, resources, initial_storage, meta,
+                           governed=governed)
+    return self._solve_window(m, meta)
+
+  def _build_window(self, time, time_offset,
+                    case, components, sources, resources,
+                    initial_storage, meta, governed=None, m=None, counts=None):
+    """
+      Builds the optimization model for one part of a rolling window.
+      @ In, time, np.array, value of time to evaluate
+      @ In, time_offset, int, offset of the time index in the greater history
+      @ In, case, HERON Case, Case that this dispatch is part of
+      @ In, components, list, HERON components available to the dispatch
+      @ In, sources, list, HERON source (placeholders) for signals
+      @ In, resources, list, sorted list of all resources in problem
+      @ In, initial_storage, dict, initial storage levels if any
+      @ In, meta, dict, additional variables passed through
+      @ In, governed, dict, optional, activity of governed components as {comp.name: np.array};
+                      strategies are evaluated for any not provided
+      @ In, m, pyo.Block, optional, if provided then build the window on this block instead of a new model
+      @ In, counts, np.array(int), optional, if provided then merge time steps into blocks of these sizes
+                    instead of finding blocks from the signals
+      @ Out, m, pyo.ConcreteModel, window model ready to solve
+    """
+    build_start = time_mod.time()
+    if governed is None:
+      governed = {}
     # build the Pyomo model
     # TODO abstract this model as much as possible BEFORE, then concrete initialization per window
-    m = pyo.ConcreteModel()
+    if m is None:
+      m = pyo.ConcreteModel()
     # indices
     C = np.arange(0, len(components), dtype=int) # indexes component
     R = np.arange(0, len(resources), dtype=int) # indexes resources
-    # T = np.arange(start_index, end_index, dtype=int) # indexes resources
-    T = np.arange(0, len(time), dtype=int) # indexes resources
+    dt = time[1] - time[0] # TODO assumes consistent step sizing
+    # time steps may be merged into blocks, each represented by one of its time steps
+    if counts is None:
+      counts = self._get_time_blocks(time, time_offset, components, meta)
+    m.Counts = counts
+    if m.Counts is None:
+      # T = np.arange(start_index, end_index, dtype=int) # indexes resources
+      T = np.arange(0, len(time), dtype=int) # indexes resources
+      m.Times = time
+      m.Indices = T + time_offset          # index of each step in the greater history
+      m.Durations = np.full(len(time), dt) # duration of each step
+      m.Durations[1:] = np.diff(time)
+    else:
+      T = np.arange(0, len(m.Counts), dtype=int) # indexes time blocks
+      represent = time_aggregation.representative_indices(m.Counts)
+      m.Times = time[represent]
+      m.Indices = represent + time_offset
+      m.Durations = m.Counts * dt
     m.C = pyo.Set(initialize=C)
     m.R = pyo.Set(initialize=R)
     m.T = pyo.Set(initialize=T)
-    m.Times = time
-    dt = m.Times[1] - m.Times[0] # TODO assumes consistent step sizing
     m.time_offset = time_offset
     m.resource_index_map = meta['HERON']['resource_indexer'] # maps the resource to its index WITHIN APPLICABLE components (sparse matrix)
                                                              #   e.g. component: {resource: local index}, ... etc}
@@ -255,8 +939,9 @@ class Pyomo(Dispatcher):
       # -> responsive or proactive?
       intr = comp.get_interaction()
       if intr.is_governed():
-        meta['request'] = {'component': comp, 'time': time}
-        activity = intr.get_strategy().evaluate(meta)[0]['level']
+        activity = governed.get(comp.name)
+        if activity is None:
+          activity = self._evaluate_strategy(comp, time, meta)
         if intr.is_type('Storage'):
           self._create_production_param(m, comp, activity, tag='level')
           # set up "activity" rates (change in level over time, plus efficiency)
@@ -291,82 +976,303 @@ class Pyomo(Dispatcher):
       else:
         self._create_production(m, comp, meta) # variables
     self._create_conservation(m, resources, initial_storage, meta) # conservation of resources (e.g. production == consumption)
+    objective_start = time_mod.time()
     self._create_objective(meta, m) # objective
+    end = time_mod.time()
+    m.telemetry = {'build_time': end - build_start, 'objective_time': end - objective_start}
+    return m
+
+  def _solve_window(self, m, meta):
+    """
+      Solves the optimization model for one part of a rolling window, including validation.
+      @ In, m, pyo.ConcreteModel, window model
+      @ In, meta, dict, additional variables passed through
+      @ Out, result, dict, results of window dispatch
+    """
+    return self._solve_models(m, [(m, meta)])[0]
+
+  def _solve_models(self, top, parts):
+    """
+      Solves an optimization model made of one or more window models, including validation.
+      @ In, top, pyo.ConcreteModel, model to solve, which is or contains all the window models
+      @ In, parts, list, (window model, meta) pairs for each window model in "top"
+      @ Out, results, list, results of window dispatch for each window model
+    """
     # start a solution search
     done_and_checked = False
     attempts = 0
+    solve_time = 0
+    validation_time = 0
+    solver = pyo.SolverFactory(self._solver)
+    solve_kwargs = {}
+    if self._warm_start:
+      found = [self._set_warm_start(m, meta) for m, meta in parts]
+      if any(found) and solver.warm_start_capable():
+        solve_kwargs['warmstart'] = True
     # DEBUGG show variables, bounds
     if self.debug_mode:
-      self._debug_pyomo_print(m)
+      self._debug_pyomo_print(top)
+    if self._model_export is not None:
+      self._export_model(top, parts)
     while not done_and_checked:
       attempts += 1
-      print(f'DEBUGG solve attempt {attempts} ...:')
+      self._print(f'DEBUGG solve attempt {attempts} ...:')
       # solve
       # TODO someday if we want to give user access to options, we can add them to this dict. For now, no options.
       solve_options = {}
-      soln = pyo.SolverFactory(self._solver).solve(m, options=solve_options)
+      solve_start = time_mod.time()
+      soln = solver.solve(top, options=solve_options, **solve_kwargs)
+      solve_time += time_mod.time() - solve_start
       # check solve status
       if soln.solver.status == SolverStatus.ok and soln.solver.termination_condition == TerminationCondition.optimal:
-        print('DEBUGG ... solve was successful!')
+        self._print('DEBUGG ... solve was successful!')
       else:
         print('DEBUGG ... solve was unsuccessful!')
         print('DEBUGG ... status:', soln.solver.status)
         print('DEBUGG ... termination:', soln.solver.termination_condition)
-        self._debug_pyomo_print(m)
+        self._debug_pyomo_print(top)
         print('Resource Map:')
-        pprint.pprint(m.resource_index_map)
+        pprint.pprint(parts[0][0].resource_index_map)
         raise RuntimeError
       # try validating
-      print('DEBUGG ... validating ...')
-      validation_errs = self.validate(m.Components, m.Activity, m.Times, meta)
-      if validation_errs:
-        done_and_checked = False
-        print('DEBUGG ... validation concerns raised:')
-        for e in validation_errs:
-          print('DEBUGG ... ... Time {t} ({time}) Component "{c}" Resource "{r}": {m}'
-                .format(t=e['time_index'],
-                        time=e['time'],
-                        c=e['component'].name,
-                        r=e['resource'],
-                        m=e['msg']))
-          self._create_production_limit(m, e)
-        # go back and solve again
-        # raise NotImplementedError('Validation failed, but idk how to handle that yet')
-      else:
-        print('DEBUGG Solve successful and no validation concerns raised.')
-        done_and_checked = True
+      self._print('DEBUGG ... validating ...')
+      validation_start = time_mod.time()
+      done_and_checked = True
+      for m, meta in parts:
+        validation_errs = self.validate(m.Components, m.Activity, m.Times, meta)
+        if validation_errs:
+          done_and_checked = False
+          self._print('DEBUGG ... validation concerns raised:')
+          for e in validation_errs:
+            self._print('DEBUGG ... ... Time {t} ({time}) Component "{c}" Resource "{r}": {m}'
+                  .format(t=e['time_index'],
+                          time=e['time'],
+                          c=e['component'].name,
+                          r=e['resource'],
+                          m=e['msg']))
+            self._create_production_limit(m, e)
+          # go back and solve again
+          # raise NotImplementedError('Validation failed, but idk how to handle that yet')
+      validation_time += time_mod.time() - validation_start
+      if done_and_checked:
+        self._print('DEBUGG Solve successful and no validation concerns raised.')
       if attempts > 100:
         raise RuntimeError('Exceeded validation attempt limit!')
     if self.debug_mode:
       soln.write()
-      self._debug_print_soln(m)
-    # return dict of numpy arrays
-    result = self._retrieve_solution(m)
-    return result
+    results = []
+    for m, meta in parts:
+      if self.debug_mode:
+        self._debug_print_soln(m)
+      retrieval_start = time_mod.time()
+      if self._warm_start:
+        self._store_warm_start(m, meta)
+      # return dict of numpy arrays
+      result = self._retrieve_solution(m)
+      if m.Counts is not None:
+        self._expand_solution(m, result)
+      # solve and validation are shared by all parts solved together
+      telemetry = dict(m.telemetry)
+      telemetry.update({'solve_time': solve_time,
+                        'validation_time': validation_time,
+                        'retrieval_time': time_mod.time() - retrieval_start,
+                        'variables': sum(1 for _ in m.component_data_objects(pyo.Var)),
+                        'constraints': sum(1 for _ in m.component_data_objects(pyo.Constraint)),
+                        'solved_together': len(parts),
+                        'validation_attempts': attempts,
+                        'picard_iterations': 0,
+                        'status': str(soln.solver.status),
+                        'termination': str(soln.solver.termination_condition)})
+      result['_telemetry'] = telemetry
+      results.append(result)
+    return results
+
+  def _export_model(self, top, parts):
+    """
+      Writes an optimization model to file. In pool workers, the file is temporary, and the
+      dispatcher that started the pool names it with _name_export.
+      @ In, top, pyo.ConcreteModel, model to solve, which is or contains all the window models
+      @ In, parts, list, (window model, meta) pairs for each window model in "top"
+      @ Out, None
+    """
+    location, fmt = self._model_export
+    m, meta = parts[0]
+    index = meta['HERON'].get('active_index', {})
+    name = f"window_y{index.get('year', 0):02d}_s{index.get('division', 0)}_t{m.time_offset:06d}"
+    if self._model_export_pending is None:
+      path = self._name_export(name)
+    else:
+      handle, path = tempfile.mkstemp(prefix=f'.{name}_', suffix=f'.{fmt}', dir=location)
+      os.close(handle)
+      self._model_export_pending.append((name, path))
+    top.write(path, format=fmt, io_options={'symbolic_solver_labels': True})
+
+  def _name_export(self, name, path=None):
+    """
+      Provides the file for the next export of a problem, numbered by how many times it was written.
+      @ In, name, str, name of the problem, identifying its year, segment, and window
+      @ In, path, str, optional, if provided then move this already-written file there
+      @ Out, target, str, path to the file
+    """
+    location, fmt = self._model_export
+    count = self._model_export_counts.get(name, 0)
+    self._model_export_counts[name] = count + 1
+    target = os.path.join(location, f'{name}_{count:02d}.{fmt}')
+    if path is not None:
+      os.replace(path, target)
+    return target
+
+  def _warm_start_keys(self, m, meta):
+    """
+      Determines the keys identifying a window for warm starting.
+      @ In, m, pyo.ConcreteModel, associated model
+      @ In, meta, dict, additional variables passed through
+      @ Out, segment_key, tuple, key identifying the window within its segment
+      @ Out, window_key, tuple, key identifying the window position in any segment
+    """
+    capacities = self._get_capacity_point(m.Components)
+    division = meta['HERON'].get('active_index', {}).get('division')
+    window_key = (capacities, m.time_offset, len(m.T))
+    return (capacities, division) + window_key[1:], window_key
+
+  def _get_capacity_point(self, components):
+    """
+      Identifies the capacities set on the components, e.g. by an outer optimization.
+      @ In, components, list, HERON components available to the dispatch
+      @ Out, point, tuple, (component name, capacity) for each component with a parametric capacity
+    """
+    point = []
+    for comp in components:
+      capacity = comp.get_capacity(None, raw=True)
+      if capacity.is_parametric():
+        point.append((comp.name, repr(capacity.get_value())))
+    return tuple(point)
+
+  def _set_warm_start(self, m, meta):
+    """
+      Initializes model variables from the solution of the most similar previously-solved window.
+      @ In, m, pyo.ConcreteModel, associated model
+      @ In, meta, dict, additional variables passed through
+      @ Out, found, bool, True if variables were initialized from a previous solution
+    """
+    segment_key, window_key = self._warm_start_keys(m, meta)
+    # prefer the same window of this segment from a previous year, then the last segment solved
+    previous = self._warm_by_segment.get(segment_key, self._warm_by_window.get(window_key))
+    if previous is None:
+      return False
+    for var in m.component_objects(pyo.Var):
+      values = previous.get(var.local_name)
+      if values is None:
+        continue
+      for index, value in values.items():
+        if value is not None and index in var:
+          var[index].value = value
+    return True
+
+  def _store_warm_start(self, m, meta):
+    """
+      Stores the solved variable values of a window for warm starting similar windows.
+      @ In, m, pyo.ConcreteModel, associated (solved) model
+      @ In, meta, dict, additional variables passed through
+      @ Out, None
+    """
+    segment_key, window_key = self._warm_start_keys(m, meta)
+    # solutions for other capacities won't be used again
+    if segment_key[0] != self._warm_capacities:
+      self._warm_by_segment = {}
+      self._warm_by_window = {}
+      self._warm_capacities = segment_key[0]
+    values = dict((var.local_name, var.extract_values()) for var in m.component_objects(pyo.Var))
+    self._warm_by_segment[segment_key] = values
+    self._warm_by_window[window_key] = values
+
+  def _get_time_blocks(self, time, time_offset, components, meta):
+    """
+      Determines how time steps in a window can be merged into blocks with similar signal values.
+      @ In, time, np.array, value of time to evaluate
+      @ In, time_offset, int, offset of the time index in the greater history
+      @ In, components, list, HERON components available to the dispatch
+      @ In, meta, dict, additional variables passed through
+      @ Out, counts, np.array(int), number of time steps in each block, or None if not aggregating
+    """
+    if self._aggregation_tol is None:
+      return None
+    # strategies and validators work with individual time steps
+    if self._validator is not None or self.needs_convergence(components):
+      return None
+    raven_vars = meta['HERON']['RAVEN_vars']
+    end_index = time_offset + len(time)
+    # signals are the variables that are still indexed by time after slicing to this segment
+    signals = [np.asarray(raven_vars[name])[time_offset:end_index]
+               for name in self._get_signal_names(raven_vars, end_index)]
+    if not signals:
+      return None
+    counts = time_aggregation.find_blocks(signals, self._aggregation_tol)
+    # at least two blocks are needed to define a window
+    if len(counts) < 2:
+      return None
+    self._print(f'DEBUGG aggregated {len(time)} time steps into {len(counts)} blocks')
+    return counts
+
+  def _expand_solution(self, m, result):
+    """
+      Expands a solution on aggregated time blocks back to the original time steps, in place.
+      @ In, m, pyo.ConcreteModel, associated (solved) model
+      @ In, result, dict, {comp: {activity: {resource: [production]}} for each time block
+      @ Out, None
+    """
+    for comp in m.Components:
+      for tag, tag_values in result[comp.name].items():
+        for res, values in tag_values.items():
+          if tag == 'level':
+            initial = pyo.value(getattr(m, f'{comp.name}_initial_level'))
+            tag_values[res] = time_aggregation.expand_levels(values, m.Counts, initial)
+          else:
+            tag_values[res] = time_aggregation.expand_blocks(values, m.Counts)
+
+  def _evaluate_strategy(self, comp, time, meta):
+    """
+      Evaluates the strategy of a governed component for a window.
+      @ In, comp, HERON Component, governed component
+      @ In, time, np.array, value of time to evaluate
+      @ In, meta, dict, additional variables passed through
+      @ Out, activity, np.array, activity prescribed by the strategy
+    """
+    meta['request'] = {'component': comp, 'time': time}
+    return np.asarray(comp.get_interaction().get_strategy().evaluate(meta)[0]['level'], dtype=float)
+
+  def _evaluate_strategies(self, time, components, meta):
+    """
+      Evaluates the strategies of all governed components for a window.
+      @ In, time, np.array, value of time to evaluate
+      @ In, components, list, HERON component list
+      @ In, meta, dict, additional variables passed through
+      @ Out, activity, dict, activity prescribed by strategies as {comp.name: np.array}
+    """
+    return dict((comp.name, self._evaluate_strategy(comp, time, meta))
+                for comp in components if comp.get_interaction().is_governed())
 
   def check_converged(self, new, old, components):
     """
-      Checks convergence of consecutive dispatch solves
-      @ In, new, dict, results of dispatch # TODO should this be the model rather than dict?
-      @ In, old, dict, results of previous dispatch
+      Checks convergence of governed component activity between iterations.
+      Note this compares the activity prescribed by the strategies (the storage level, for governed
+      storages) as given by "_evaluate_strategies", not the results of window dispatches.
+      @ In, new, dict, activity of governed components as {comp.name: np.array}
+      @ In, old, dict, previous activity of governed components, or None if not available
       @ In, components, list, HERON component list
       @ Out, converged, bool, True if convergence is met
     """
-    tol = 1e-4 # TODO user option
     if old is None:
       return False
     converged = True
     for comp in components:
       intr = comp.get_interaction()
       name = comp.name
-      tracker = comp.get_tracking_vars()[0]
       if intr.is_governed(): # by "is_governed" we mean "isn't optimized in pyomo"
         # check activity L2 norm as a differ
-        # TODO this may be specific to storage right now
-        res = intr.get_resource()
-        scale = np.max(old[name][tracker][res])
-        diff = np.linalg.norm(new[name][tracker][res] - old[name][tracker][res]) / (scale if scale != 0 else 1)
-        if diff > tol:
+        scale = np.max(np.abs(old[name]))
+        diff = np.linalg.norm(new[name] - old[name]) / (scale if scale != 0 else 1)
+        if diff > self._picard_tol:
           converged = False
     return converged
 
@@ -415,7 +1321,7 @@ class Pyomo(Dispatcher):
       counter += 1
       name = name_template.format(i=counter)
     setattr(m, name, constr)
-    print(f'DEBUGG added validation constraint "{name}"')
+    self._print(f'DEBUGG added validation constraint "{name}"')
 
   def _create_production_param(self, m, comp, values, tag=None):
     """
@@ -550,16 +1456,33 @@ class Pyomo(Dispatcher):
     ## NOTE get_capacity returns (data, meta) and data is dict
     ## TODO does this work with, e.g., ARMA-based capacities?
     ### -> "time" is stored on "m" and could be used to correctly evaluate the capacity
+    if m.Counts is None:
+      steps = [[index] for index in m.Indices]
+    else:
+      # a time block has to respect the limits of every time step it represents
+      starts = m.time_offset + np.concatenate(([0], np.cumsum(m.Counts)[:-1]))
+      steps = [range(start, start + count) for start, count in zip(starts, m.Counts)]
     caps = []
     mins = []
-    for t, time in enumerate(m.Times):
-      meta['HERON']['time_index'] = t + m.time_offset
-      cap = comp.get_capacity(meta)[0][cap_res] # value of capacity limit (units of governing resource)
-      caps.append(cap)
-      if (comp.is_dispatchable() == 'fixed'):
+    for block_steps in steps:
+      block_caps = []
+      block_mins = []
+      for index in block_steps:
+        meta['HERON']['time_index'] = index
+        cap = comp.get_capacity(meta)[0][cap_res] # value of capacity limit (units of governing resource)
+        block_caps.append(cap)
+        if (comp.is_dispatchable() == 'fixed'):
+          minimum = cap
+        else:
+          minimum = comp.get_minimum(meta)[0][cap_res]
+        block_mins.append(minimum)
+      # most restrictive limits: the smallest capacity and the largest minimum (in magnitude, since
+      # consuming limits are negative), without the minimum exceeding the capacity
+      cap = block_caps[int(np.argmin(np.abs(block_caps)))]
+      minimum = block_mins[int(np.argmax(np.abs(block_mins)))]
+      if len(block_caps) > 1 and abs(minimum) > abs(cap):
         minimum = cap
-      else:
-        minimum = comp.get_minimum(meta)[0][cap_res]
+      caps.append(cap)
       mins.append(minimum)
     return caps, mins
 
@@ -608,6 +1531,8 @@ class Pyomo(Dispatcher):
     # (2, 3) separate charge/discharge trackers, so we can implement round-trip efficiency and ramp rates
     charge_name = self._create_production_variable(m, comp, meta, tag='charge', add_bounds=False, within=pyo.NonPositiveReals)
     discharge_name = self._create_production_variable(m, comp, meta, tag='discharge', add_bounds=False, within=pyo.NonNegativeReals)
+    # initial level is mutable so a prebuilt model can be updated once the previous window is solved
+    setattr(m, f'{prefix}_initial_level', pyo.Param(initialize=initial_storage[comp], mutable=True))
     # balance level, charge/discharge
     level_rule_name = prefix + '_level_constr'
     rule = lambda mod, t: self._level_rule(comp, level_name, charge_name, discharge_name,
@@ -820,10 +1745,9 @@ class Pyomo(Dispatcher):
     discharge_var = getattr(m, discharge_name)
     if t > 0:
       previous = level_var[r, t-1]
-      dt = m.Times[t] - m.Times[t-1]
     else:
-      previous = initial_storage[comp]
-      dt = m.Times[1] - m.Times[0]
+      previous = getattr(m, f'{comp.name}_initial_level')
+    dt = m.Durations[t]
     rte2 = comp.get_sqrt_RTE() # square root of the round-trip efficiency
     production = - rte2 * charge_var[r, t] - discharge_var[r, t] / rte2
     return level_var[r, t] == previous + production * dt
@@ -869,7 +1793,8 @@ class Pyomo(Dispatcher):
     activity = m.Activity # dict((comp, getattr(m, f"{comp.name}_production")) for comp in m.Components)
     state_args = {'valued': False}
     total = self._compute_cashflows(m.Components, activity, m.Times, meta,
-                                    state_args=state_args, time_offset=m.time_offset)
+                                    state_args=state_args, time_offset=m.time_offset,
+                                    time_indices=m.Indices, weights=m.Counts)
     return total
 
   def _conservation_rule(self, initial_storage, meta, res, m, t):
@@ -982,6 +1907,63 @@ class Pyomo(Dispatcher):
 
 
 
+# process pool workers for parallel rolling windows
+_WORKER_STATE = {} # problem definition shared by all windows, set once per worker process
+# meta entries that are not sent with each window, since workers hold their own copies, or since they
+# are histories or the leftovers of evaluating cashflows that the window dispatch doesn't need
+_WORKER_EXCLUDED = ('Case', 'Components', 'Sources', 'resource_indexer', 'RAVEN_vars', 'RAVEN_vars_full',
+                    'window_dispatch', 'component', 'all_activity', 'activity')
+
+def _init_window_worker(dispatcher, case, components, sources, resources):
+  """
+    Stores the problem definition shared by all windows in a worker process.
+    @ In, dispatcher, Pyomo, dispatcher instance
+    @ In, case, HERON Case, Case that this dispatch is part of
+    @ In, components, list, HERON components available to the dispatch
+    @ In, sources, list, HERON source (placeholders) for signals
+    @ In, resources, list, sorted list of all resources in problem
+    @ Out, None
+  """
+  _WORKER_STATE.update({'dispatcher': dispatcher,
+                        'case': case,
+                        'components': components,
+                        'sources': sources,
+                        'resources': resources,
+                        'resource_indexer': dict((comp, dict((res, r) for r, res in enumerate(comp.get_resources())))
+                                                 for comp in components)})
+
+def _solve_window_worker(time, time_offset, initial_levels, meta, raven_vars, signals):
+  """
+    Solves a single rolling window in a worker process.
+    @ In, time, np.array, value of time to evaluate
+    @ In, time_offset, int, offset of the time index in the greater history
+    @ In, initial_levels, dict, initial storage levels as {comp.name: level}
+    @ In, meta, dict, additional variables passed through, without the entries in _WORKER_EXCLUDED
+    @ In, raven_vars, dict, RAVEN variables for the segment that are not signals
+    @ In, signals, dict, values of each signal within the window
+    @ Out, subdisp, dict, results of window dispatch
+    @ Out, exported, list, (name, temporary path) of each problem written to file, if exporting
+  """
+  state = _WORKER_STATE
+  dispatcher = state['dispatcher']
+  dispatcher._model_export_pending = []
+  # signals are indexed by time in the greater history, so place the window values at their offset
+  raven_vars = dict(raven_vars)
+  for name, values in signals.items():
+    raven_vars[name] = np.full(time_offset + len(values), np.nan)
+    raven_vars[name][time_offset:] = values
+  meta['HERON'].update({'Case': state['case'],
+                        'Components': state['components'],
+                        'Sources': state['sources'],
+                        'resource_indexer': state['resource_indexer'],
+                        'RAVEN_vars': raven_vars})
+  # components are copies in this process, so map levels back by name
+  levels = dict((comp, initial_levels[comp.name]) for comp in state['components'] if comp.name in initial_levels)
+  subdisp = dispatcher._solve_window_converged(time, time_offset,
+                                               state['case'], state['components'], state['sources'],
+                                               state['resources'], levels, meta)
+  return subdisp, dispatcher._model_export_pending
+
 # DispatchState for Pyomo dispatcher
 class PyomoState(DispatchState):
   def __init__(self):
@@ -0,0 +1,68 @@
+# Copyright 2020, Battelle Energy Alliance, LLC
+# ALL RIGHTS RESERVED
+"""
+  Utilities for adaptively merging consecutive time steps into blocks for dispatch.
+"""
+import numpy as np
+
+def find_blocks(signals, tol):
+  """
+    Groups consecutive time steps into blocks such that, within each block, no signal varies
+    by more than "tol" times the range of that signal over all the time steps.
+    @ In, signals, list, np.array signals of equal length
+    @ In, tol, float, allowed variation within a block relative to the range of each signal
+    @ Out, counts, np.array(int), number of time steps in each consecutive block
+  """
+  signals = np.atleast_2d(np.asarray(signals, dtype=float))
+  length = signals.shape[1]
+  allowed = tol * (signals.max(axis=1) - signals.min(axis=1))
+  counts = []
+  count = 1
+  low = signals[:, 0]
+  high = signals[:, 0]
+  for t in range(1, length):
+    new_low = np.minimum(low, signals[:, t])
+    new_high = np.maximum(high, signals[:, t])
+    if np.all(new_high - new_low <= allowed):
+      low, high = new_low, new_high
+      count += 1
+    else:
+      counts.append(count)
+      count = 1
+      low = signals[:, t]
+      high = signals[:, t]
+  counts.append(count)
+  return np.asarray(counts, dtype=int)
+
+def representative_indices(counts):
+  """
+    Finds the time step (the middle one) that represents each block.
+    @ In, counts, np.array(int), number of time steps in each consecutive block
+    @ Out, indices, np.array(int), index of the representative time step for each block
+  """
+  starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+  return starts + (counts - 1) // 2
+
+def expand_blocks(values, counts):
+  """
+    Expands per-block rates back to the original time steps.
+    @ In, values, np.array, value for each block
+    @ In, counts, np.array(int), number of time steps in each consecutive block
+    @ Out, expanded, np.array, value for each time step
+  """
+  return np.repeat(values, counts)
+
+def expand_levels(levels, counts, initial):
+  """
+    Expands per-block storage levels back to the original time steps. Since charge and discharge
+    rates are constant over each block, the level changes linearly within each block.
+    @ In, levels, np.array, storage level at the end of each block
+    @ In, counts, np.array(int), number of time steps in each consecutive block
+    @ In, initial, float, storage level before the first block
+    @ Out, expanded, np.array, storage level at each time step
+  """
+  levels = np.asarray(levels, dtype=float)
+  starts = np.concatenate(([initial], levels[:-1]))
+  step = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + 1
+  fraction = step / np.repeat(counts, counts)
+  return np.repeat(starts, counts) + np.repeat(levels - starts, counts) * fraction
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# Copyright 2020, Battelle Energy Alliance, LLC
+# ALL RIGHTS RESERVED
+"""
+  Replays a captured inner dispatch run without RAVEN, e.g. for profiling.
+  Inputs are captured by running HERON with the environment variable HERON_DISPATCH_CAPTURE
+  set to a directory; each inner run then stores its inputs there.
+"""
+import os
+import sys
+import pickle as pk
+import argparse
+import cProfile
+import pstats
+import tracemalloc
+from time import time as run_clock
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from HERON.src.DispatchManager import DispatchRunner
+
+
+def load_capture(path):
+  """
+    Loads captured dispatch inputs.
+    @ In, path, str, path to the capture file
+    @ Out, capture, dict, captured inputs
+  """
+  with open(path, 'rb') as capture_file:
+    capture = pk.load(capture_file)
+  if not os.path.isfile(capture['heron_lib']):
+    raise IOError(f'HERON library "{capture["heron_lib"]}" for the captured run was not found!')
+  return capture
+
+def build_runner(capture, export_dir=None, export_format='lp'):
+  """
+    Creates a dispatch runner set up as it was in the captured run.
+    @ In, capture, dict, captured inputs
+    @ In, export_dir, str, optional, directory in which to write each window optimization problem
+    @ In, export_format, str, optional, file format for optimization problems
+    @ Out, runner, DispatchRunner, runner ready to run
+  """
+  # user-provided functions are kept next to the HERON library
+  sys.path.append(os.path.dirname(capture['heron_lib']))
+  runner = DispatchRunner()
+  runner.load_heron_lib(capture['heron_lib'])
+  runner.set_capacities(capture['capacities'])
+  if capture['override_time'] is not None:
+    runner.override_time(capture['override_time'])
+  if export_dir is not None:
+    dispatcher = runner.get_dispatcher()
+    if not hasattr(dispatcher, 'set_model_export'):
+      raise IOError(f'Dispatcher "{dispatcher.name}" does not support exporting optimization problems!')
+    dispatcher.set_model_export(export_dir, export_format)
+  return runner
+
+def replay(capture, runner, profile=None, memory=False, top=25):
+  """
+    Runs the dispatch for captured inputs.
+    @ In, capture, dict, captured inputs
+    @ In, runner, DispatchRunner, runner ready to run
+    @ In, profile, str, optional, if given then path to write cProfile statistics to
+    @ In, memory, bool, optional, if True then trace memory allocations
+    @ In, top, int, optional, number of entries to report for profiles
+    @ Out, metrics, dict, economic metric results
+  """
+  if memory:
+    tracemalloc.start()
+  profiler = cProfile.Profile() if profile else None
+  start = run_clock()
+  if profiler is not None:
+    profiler.enable()
+  _, metrics = runner.run(capture['raven_vars'])
+  if profiler is not None:
+    profiler.disable()
+  elapsed = run_clock() - start
+  print(f'Replayed dispatch in {elapsed:1.3f} seconds.')
+  for name, value in metrics.items():
+    print(f'  {name}: {value}')
+  if profiler is not None:
+    profiler.dump_stats(profile)
+    print(f'Profile statistics written to "{profile}"; top {top} by cumulative time:')
+    pstats.Stats(profiler).sort_stats('cumulative').print_stats(top)
+  if memory:
+    snapshot = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'Peak traced memory: {peak / 1024**2:1.3f} MB; top {top} allocation sites:')
+    for stat in snapshot.statistics('lineno')[:top]:
+      print(f'  {stat}')
+  return metrics
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Replays a captured HERON inner dispatch run without RAVEN')
+  parser.add_argument('capture', help='capture file written by an inner run with HERON_DISPATCH_CAPTURE set')
+  parser.add_argument('--profile', metavar='FILE', help='profile with cProfile and write statistics to FILE')
+  parser.add_argument('--memory', action='store_true', help='trace memory allocations with tracemalloc')
+  parser.add_argument('--top', type=int, default=25, help='number of profile entries to report')
+  parser.add_argument('--export-lp', metavar='DIR', dest='export_dir',
+                      help='write each window optimization problem to DIR (Pyomo dispatcher only)')
+  parser.add_argument('--export-format', default='lp', choices=['lp', 'mps'],
+                      help='file format for exported optimization problems')
+  args = parser.parse_args()
+  captured = load_capture(args.capture)
+  dispatch_runner = build_runner(captured, args.export_dir, args.export_format)
+  replay(captured, dispatch_runner, profile=args.profile, memory=args.memory, top=args.top)
@@ -481,6 +481,9 @@ class Template(TemplateBase, Base):
       output_node = template.find('Models').find('Code').find('outputDatabase')
       output_node.tag = 'outputExportOutStreams'
       # no need to change name, as database and outstream have the same name
+    elif case.data_handling['inner_to_outer'] == 'npz' and not case.debug['enabled']:
+      # the inner summary store is loaded by the HERON code interface
+      template.find('Models').find('Code').attrib['subType'] = 'HERON.RAVEN'
 
 
   def _modify_outer_outstreams(self, template, case, components, sources):
@@ -1224,6 +1227,23 @@ class Template(TemplateBase, Base):
       db = template.find('Steps').find('.//IOStep[@name="database"]').find('.//Output[@class="Databases"]')
       db.attrib.update({'class': 'OutStreams', 'type': 'Print'})
       # the database and outstream print have the same name, so don't need to change text of node
+    elif case.data_handling['inner_to_outer'] == 'npz':
+      # write the summary to a binary store instead, which the outer loads through its HERON code interface
+      step = template.find('Steps').find('.//IOStep[@name="database"]')
+      db = step.find('.//Output[@class="Databases"]')
+      db.attrib.update({'class': 'OutStreams', 'type': 'Plot'})
+      OSs = template.find('OutStreams')
+      self._remove_by_name(OSs, [db.text])
+      store = xmlUtils.newNode('Plot', attrib={'name': db.text, 'subType': 'HERON.SummaryStore'})
+      store.append(xmlUtils.newNode('source', text=step.find('Input').text))
+      OSs.append(store)
+      # RAVEN's RAVEN code interface requires a Print or NetCDF output among the inner steps,
+      # so also print the single row summary, which the outer does not read
+      summary = xmlUtils.newNode('Print', attrib={'name': f'{db.text}_summary'})
+      summary.append(xmlUtils.newNode('type', text='csv'))
+      summary.append(xmlUtils.newNode('source', text=step.find('Input').text))
+      OSs.append(summary)
+      step.append(xmlUtils.newNode('Output', attrib={'class': 'OutStreams', 'type': 'Print'}, text=summary.attrib['name']))
 
 
   ##### CASHFLOW #####
@@ -0,0 +1,353 @@
+#!/usr/bin/env python
+# Copyright 2020, Battelle Energy Alliance, LLC
+# ALL RIGHTS RESERVED
+"""
+  Benchmarks the inner dispatch (DispatchRunner with the Pyomo dispatcher) without a RAVEN outer loop.
+  Synthetic systems are scaled from the steam source/generator/storage/market system of
+  src/dispatch/twin_pyomo_test.py, and RAVEN-shaped signals are built as in src/ArmaBypass.py.
+
+  Each configuration runs in a fresh process, and one JSON line per configuration is written
+  with the model build, solve, and cashflow times and the peak memory, so results can be compared
+  across commits, e.g.
+    python dispatch_benchmark.py --preset quick --output before.jsonl
+    (change code)
+    python dispatch_benchmark.py --preset quick --output after.jsonl --compare before.jsonl
+"""
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import itertools
+import subprocess
+import multiprocessing
+from time import time as run_clock
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+import HERON.src._utils as hutils
+sys.path.append(hutils.get_raven_loc())
+
+# scalable dimensions of the synthetic system and their defaults
+DEFAULTS = {'producers': 1,  # number of (independent, differently-priced) producers of the first resource
+            'resources': 2,  # number of resources, chained by converters; the last is sold to the market
+            'storages': 1,   # number of storage units, distributed over the resources
+            'window': 24,    # rolling window length
+            'history': 24,   # number of time steps in each history
+            'clusters': 1,   # number of clusters (segments) in each year
+            'years': 1,      # number of project years
+           }
+
+# sets of configurations, as values to sweep for each dimension (others take the defaults)
+PRESETS = {'quick': [{'history': [24, 168]},
+                     {'producers': [1, 4], 'storages': [0, 2]},
+                    ],
+           'full': [{'history': [24, 168, 720, 8760]},
+                    {'window': [24, 72, 168], 'history': [168, 720]},
+                    {'producers': [1, 2, 4, 8]},
+                    {'resources': [2, 3, 4]},
+                    {'storages': [0, 1, 2, 4]},
+                    {'clusters': [1, 4, 12], 'years': [1, 5]},
+                   ],
+          }
+
+def expand_preset(preset):
+  """
+    Builds the configurations for a preset.
+    @ In, preset, list, dicts of values to sweep for each dimension
+    @ Out, configs, list, configurations as dicts of all dimensions, without duplicates
+  """
+  configs = []
+  for sweep in preset:
+    names = list(sweep.keys())
+    for values in itertools.product(*(sweep[name] for name in names)):
+      config = dict(DEFAULTS)
+      config.update(zip(names, values))
+      if config not in configs:
+        configs.append(config)
+  return configs
+
+def write_input(config, location):
+  """
+    Writes the HERON input and signal file for a synthetic system.
+    @ In, config, dict, system dimensions
+    @ In, location, str, directory in which to write
+    @ Out, input_file, str, path to HERON input file
+  """
+  res = [f'res{r}' for r in range(config['resources'])]
+  # signals, written to CSV so that HERON can check them; the dispatch takes them from "raven_vars"
+  with open(os.path.join(location, 'signal.csv'), 'w') as csv:
+    csv.write('RAVEN_sample_ID,Year,Time,Signal\n')
+    for y, signal in enumerate(make_signal(config)[:, 0, :]):
+      for t, value in enumerate(signal):
+        csv.write(f'0,{2025 + y},{t},{value}\n')
+  comps = []
+  for p in range(config['producers']):
+    comps.append(f'''
+    <Component name="producer{p}">
+      <produces resource="{res[0]}" dispatch="independent">
+        <capacity resource="{res[0]}"><fixed_value>{100 + 10 * p}</fixed_value></capacity>
+      </produces>
+      <economics>
+        <lifetime>30</lifetime>
+        <CashFlow name="vom" type="repeating" taxable="True" inflation="none" mult_target="False">
+          <driver><activity>{res[0]}</activity></driver>
+          <reference_price><fixed_value>{-0.1 * (p + 1)}</fixed_value></reference_price>
+        </CashFlow>
+      </economics>
+    </Component>''')
+  for r in range(len(res) - 1):
+    comps.append(f'''
+    <Component name="converter{r}">
+      <produces resource="{res[r + 1]}" dispatch="independent">
+        <consumes>{res[r]}</consumes>
+        <capacity resource="{res[r]}"><fixed_value>-{100 * config['producers']}</fixed_value></capacity>
+        <transfer>
+          <linear>
+            <rate resource="{res[r]}">-1</rate>
+            <rate resource="{res[r + 1]}">0.9</rate>
+          </linear>
+        </transfer>
+      </produces>
+      <economics><lifetime>30</lifetime></economics>
+    </Component>''')
+  for s in range(config['storages']):
+    comps.append(f'''
+    <Component name="storage{s}">
+      <stores resource="{res[s % len(res)]}" dispatch="independent">
+        <capacity resource="{res[s % len(res)]}"><fixed_value>400</fixed_value></capacity>
+        <initial_stored><fixed_value>0.5</fixed_value></initial_stored>
+      </stores>
+      <economics><lifetime>30</lifetime></economics>
+    </Component>''')
+  comps.append(f'''
+    <Component name="market">
+      <demands resource="{res[-1]}" dispatch="dependent">
+        <capacity><fixed_value>-1e200</fixed_value></capacity>
+      </demands>
+      <economics>
+        <lifetime>30</lifetime>
+        <CashFlow name="sales" type="repeating" taxable="True" inflation="none" mult_target="False">
+          <driver><activity>{res[-1]}</activity><multiplier>-1</multiplier></driver>
+          <reference_price><CSV variable="Signal">Price</CSV></reference_price>
+        </CashFlow>
+      </economics>
+    </Component>''')
+  heron_input = f'''<HERON>
+  <Case name="benchmark">
+    <mode>sweep</mode>
+    <num_arma_samples>1</num_arma_samples>
+    <time_discretization>
+      <time_variable>Time</time_variable>
+      <year_variable>Year</year_variable>
+      <start_time>0</start_time>
+      <end_time>{config['history'] - 1}</end_time>
+      <num_steps>{config['history']}</num_steps>
+    </time_discretization>
+    <economics>
+      <ProjectTime>{config['years']}</ProjectTime>
+      <DiscountRate>0.08</DiscountRate>
+      <tax>0.0</tax>
+      <inflation>0.0</inflation>
+      <verbosity>0</verbosity>
+    </economics>
+    <dispatcher>
+      <pyomo>
+        <rolling_window_length>{config['window']}</rolling_window_length>
+      </pyomo>
+    </dispatcher>
+  </Case>
+  <Components>{''.join(comps)}
+  </Components>
+  <DataGenerators>
+    <CSV name="Price" variable="Signal">signal.csv</CSV>
+  </DataGenerators>
+</HERON>
+'''
+  input_file = os.path.join(location, 'heron_input.xml')
+  with open(input_file, 'w') as f:
+    f.write(heron_input)
+  return input_file
+
+def make_signal(config):
+  """
+    Makes a RAVEN-shaped price signal, as (year, cluster, time); daily sine plus seeded noise.
+    @ In, config, dict, system dimensions
+    @ Out, signal, np.array, price signal
+  """
+  rng = np.random.default_rng(42)
+  shape = (config['years'], config['clusters'], config['history'])
+  hours = np.arange(config['history'])
+  return 1.0 + 0.5 * np.sin(2 * np.pi * hours / 24) + 0.1 * rng.standard_normal(shape)
+
+def make_raven_vars(config):
+  """
+    Makes the variables RAVEN would pass to the dispatch, shaped as in src/ArmaBypass.py.
+    @ In, config, dict, system dimensions
+    @ Out, raven_vars, dict, RAVEN variables
+  """
+  return {'Signal': make_signal(config),
+          '_indexMap': {'Signal': ['Year', '_ROM_Cluster', 'Time']},
+          'Year': np.arange(config['years']) + 2025,
+          '_ROM_Cluster': np.arange(config['clusters']),
+          'Time': np.arange(config['history'], dtype=float),
+         }
+
+def make_structure(config):
+  """
+    Makes the synthetic history structure the dispatch would read from the ARMA ROM.
+    @ In, config, dict, system dimensions
+    @ Out, structure, dict, structure as from hutils.get_synthhist_structure
+  """
+  clusters = [{'id': c, 'indices': [0, config['history']], 'represents': [str(c)]}
+              for c in range(config['clusters'])]
+  years = 2025 + np.arange(config['years'])
+  return {'macro': {'id': 'Year', 'num': config['years'] + 1, 'first': years[0], 'last': years[-1]},
+          'clusters': dict((year, clusters) for year in years),
+          'segments': {}}
+
+def timed(method, timings, key):
+  """
+    Wraps a method to accumulate the time spent in it.
+    @ In, method, callable, method to wrap
+    @ In, timings, dict, accumulated times by key
+    @ In, key, str, key to accumulate under
+    @ Out, wrapper, callable, wrapped method
+  """
+  def wrapper(*args, **kwargs):
+    """
+      Calls the wrapped method.
+      @ In, args, list, positional arguments
+      @ In, kwargs, dict, keyword arguments
+      @ Out, result, object, result of wrapped method
+    """
+    start = run_clock()
+    try:
+      return method(*args, **kwargs)
+    finally:
+      timings[key] += run_clock() - start
+  return wrapper
+
+def run_config(config):
+  """
+    Runs the dispatch for one configuration; intended to run in a fresh process.
+    @ In, config, dict, system dimensions
+    @ Out, result, dict, configuration with measured times (s) and peak memory (MB)
+  """
+  import resource
+  import dill as pk
+  from ravenframework.MessageHandler import MessageHandler
+  from HERON.src import input_loader
+  from HERON.src.DispatchManager import DispatchRunner
+
+  class BenchmarkRunner(DispatchRunner):
+    """
+      Dispatch runner taking its synthetic history structure from the configuration.
+    """
+    def _get_structure(self, raven_vars):
+      """
+        Provides the synthetic history structure.
+        @ In, raven_vars, dict, variables coming from RAVEN
+        @ Out, all_structure, dict, structure specifications
+      """
+      details = make_structure(config)
+      first_year_clusters = next(iter(details['clusters'].values()))
+      summary = {'interpolated': (details['macro']['first'], details['macro']['last'] + 1),
+                 'clusters': list(cl['id'] for cl in first_year_clusters),
+                 'segments': 0,
+                 'macro_info': details['macro'],
+                 'cluster_info': first_year_clusters}
+      return {'details': {self._sources[0]: details}, 'summary': summary}
+
+  location = tempfile.mkdtemp(prefix='heron_benchmark_')
+  try:
+    handler = MessageHandler()
+    handler.initialize({'verbosity': 'silent', 'callerLength': 18, 'tagLength': 7, 'suppressErrs': False})
+    input_file = write_input(config, location)
+    objects = input_loader.parse(input_loader.load(input_file), location, handler)
+    lib_path = os.path.join(location, 'heron.lib')
+    with open(lib_path, 'wb') as lib:
+      pk.dump((objects['case'], objects['components'], objects['sources']), lib)
+    runner = BenchmarkRunner()
+    runner.load_heron_lib(lib_path)
+    dispatcher = runner.get_dispatcher()
+    timings = {'build': 0.0, 'solve': 0.0, 'cashflow': 0.0}
+    dispatcher._build_window = timed(dispatcher._build_window, timings, 'build')
+    dispatcher._solve_models = timed(dispatcher._solve_models, timings, 'solve')
+    runner._segment_cashflow = timed(runner._segment_cashflow, timings, 'cashflow')
+    start = run_clock()
+    _, metrics = runner.run(make_raven_vars(config))
+    total = run_clock() - start
+  finally:
+    shutil.rmtree(location, ignore_errors=True)
+  result = dict(config)
+  result.update({'build_time': timings['build'],
+                 'solve_time': timings['solve'],
+                 'cashflow_time': timings['cashflow'],
+                 'total_time': total,
+                 # ru_maxrss is in kB on Linux
+                 'peak_memory': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                 'NPV': float(np.atleast_1d(metrics.get('NPV', np.nan))[0])})
+  return result
+
+def get_commit():
+  """
+    Identifies the HERON commit being benchmarked.
+    @ In, None
+    @ Out, commit, str, commit hash, or None if not available
+  """
+  try:
+    return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(__file__),
+                                   stderr=subprocess.DEVNULL, text=True).strip()
+  except (OSError, subprocess.CalledProcessError):
+    return None
+
+def compare(results, baseline_file):
+  """
+    Prints the relative change of each timing against a baseline.
+    @ In, results, list, benchmark results
+    @ In, baseline_file, str, path to baseline results (JSON lines)
+    @ Out, None
+  """
+  with open(baseline_file, 'r') as f:
+    baseline = [json.loads(line) for line in f if line.strip()]
+  keys = list(DEFAULTS.keys())
+  measures = ['build_time', 'solve_time', 'cashflow_time', 'total_time', 'peak_memory']
+  print('config | ' + ' | '.join(measures))
+  for result in results:
+    config = [result[key] for key in keys]
+    for base in baseline:
+      if [base[key] for key in keys] == config:
+        break
+    else:
+      continue
+    changes = [f'{result[m] / base[m] - 1: +.1%}' if base[m] else 'n/a' for m in measures]
+    print(' '.join(f'{key}={value}' for key, value in zip(keys, config)) + ' | ' + ' | '.join(changes))
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Benchmarks the HERON inner dispatch without RAVEN')
+  parser.add_argument('--preset', choices=list(PRESETS.keys()), default='quick', help='set of configurations')
+  for dim, default in DEFAULTS.items():
+    parser.add_argument(f'--{dim}', type=int, nargs='+',
+                        help=f'values of "{dim}" to benchmark, replacing the preset (default {default})')
+  parser.add_argument('--output', default='dispatch_benchmark.jsonl', help='file to append results to')
+  parser.add_argument('--compare', metavar='BASELINE', help='results file to compare against')
+  args = parser.parse_args()
+  sweep = dict((dim, getattr(args, dim)) for dim in DEFAULTS if getattr(args, dim) is not None)
+  configurations = expand_preset([sweep] if sweep else PRESETS[args.preset])
+  commit = get_commit()
+  # fresh processes, so that peak memory is measured per configuration
+  context = multiprocessing.get_context('spawn')
+  results = []
+  for configuration in configurations:
+    with context.Pool(processes=1) as pool:
+      outcome = pool.apply(run_config, (configuration,))
+    outcome['commit'] = commit
+    results.append(outcome)
+    print(json.dumps(outcome))
+    with open(args.output, 'a') as out:
+      out.write(json.dumps(outcome) + '\n')
+  if args.compare:
+    compare(results, args.compare)
@@ -0,0 +1,307 @@
+#!/usr/bin/env python
+# Copyright 2020, Battelle Energy Alliance, LLC
+# ALL RIGHTS RESERVED
+"""
+  Benchmarks the scaling of the MOPED workflow on a HERON MOPED input (by default, one of the
+  HeronMoped test inputs in tests/integration_tests/workflows/MOPED).
+  The number of synthetic history realizations and project years are set on the case; since the
+  number of years and clusters of the synthetic histories is fixed by the trained ROM, the sampled
+  histories (and cluster multiplicities) are tiled to the requested size, and the component count is
+  scaled by adding copies of the components that do not demand resources.
+
+  Each configuration runs in a fresh process, and one JSON line per configuration is written
+  with the time spent building dispatch variables, storage variables, constraints, and the TEAL
+  cashflow expression, the solve time, the peak memory, and the problem size, so results can be
+  compared across commits, e.g.
+    python moped_benchmark.py --preset quick --output before.jsonl
+    (change code)
+    python moped_benchmark.py --preset quick --output after.jsonl --compare before.jsonl
+  The build, solve, cashflow, and total times and the peak memory have the same meaning as in
+  dispatch_benchmark.py; the standard workflow repeats that inner dispatch for each outer
+  optimization iteration, while MOPED solves once.
+"""
+import os
+import sys
+import copy
+import json
+import shutil
+import argparse
+import tempfile
+import itertools
+import subprocess
+import multiprocessing
+from time import time as run_clock
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+import HERON.src._utils as hutils
+sys.path.append(hutils.get_raven_loc())
+
+DEFAULT_INPUT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'integration_tests', 'workflows',
+                                             'MOPED', 'storage', 'moped_input.xml'))
+
+# scalable dimensions of the problem and their defaults; 0 keeps the value from the input (or ROM)
+DEFAULTS = {'samples': 0,    # number of synthetic history realizations (num_arma_samples)
+            'years': 0,      # number of project years (ProjectTime)
+            'clusters': 0,   # number of clusters in each year
+            'components': 0, # number of components, adding copies of non-demanding components
+           }
+
+# sets of configurations, as values to sweep for each dimension (others take the defaults)
+PRESETS = {'quick': [{'samples': [1, 2, 4]},
+                     {'years': [3, 10]},
+                    ],
+           'full': [{'samples': [1, 2, 5, 10, 20]},
+                    {'years': [3, 10, 20, 30]},
+                    {'clusters': [1, 4, 12, 24]},
+                    {'components': [3, 6, 12, 24]},
+                    {'samples': [2, 10], 'years': [10, 30]},
+                   ],
+          }
+
+def expand_preset(preset):
+  """
+    Builds the configurations for a preset.
+    @ In, preset, list, dicts of values to sweep for each dimension
+    @ Out, configs, list, configurations as dicts of all dimensions, without duplicates
+  """
+  configs = []
+  for sweep in preset:
+    names = list(sweep.keys())
+    for values in itertools.product(*(sweep[name] for name in names)):
+      config = dict(DEFAULTS)
+      config.update(zip(names, values))
+      if config not in configs:
+        configs.append(config)
+  return configs
+
+def tile_samples(samples, config):
+  """
+    Tiles sampled synthetic histories to the number of years and clusters of the configuration.
+    @ In, samples, np.array, samples as [realization, year, cluster, hour]
+    @ In, config, dict, problem dimensions
+    @ Out, samples, np.array, tiled samples as [realization, year, cluster, hour]
+  """
+  if config['years']:
+    samples = samples[:, np.arange(config['years']) % samples.shape[1]]
+  if config['clusters']:
+    samples = samples[:, :, np.arange(config['clusters']) % samples.shape[2]]
+  return samples
+
+def tile_multiplicity(meta, config):
+  """
+    Tiles cluster multiplicities to the number of years and clusters of the configuration,
+    keeping the number of hours each year represents.
+    @ In, meta, dict, multiplicity as {year: {cluster: multiplicity}}, plus the 'Index Map'
+    @ In, config, dict, problem dimensions
+    @ Out, tiled, dict, tiled multiplicity, laid out as meta
+  """
+  rom_years = sorted(key for key in meta if key != 'Index Map')
+  num_years = config['years'] or len(rom_years)
+  tiled = {'Index Map': meta['Index Map']}
+  for y in range(num_years):
+    year = meta[rom_years[y % len(rom_years)]]
+    clusters = sorted(year)
+    num_clusters = config['clusters'] or len(clusters)
+    scale = len(clusters) / num_clusters
+    tiled[y + 1] = dict((c, year[clusters[c % len(clusters)]] * scale) for c in range(num_clusters))
+  return tiled
+
+def scale_components(components, config):
+  """
+    Adds copies of the non-demanding components until the configured component count is reached.
+    @ In, components, list, HERON components from the input
+    @ In, config, dict, problem dimensions
+    @ Out, components, list, HERON components to benchmark
+  """
+  candidates = [comp for comp in components if not comp._demands]
+  if not candidates:
+    return components
+  components = list(components)
+  for i in range(config['components'] - len(components)):
+    original = candidates[i % len(candidates)]
+    # message handler is shared, not copied
+    comp = copy.deepcopy(original, memo={id(original.messageHandler): original.messageHandler})
+    comp.name = f'{comp.name}_copy{i // len(candidates)}'
+    components.append(comp)
+  return components
+
+def timed(method, timings, key):
+  """
+    Wraps a method to accumulate the time spent in it.
+    @ In, method, callable, method to wrap
+    @ In, timings, dict, accumulated times by key
+    @ In, key, str, key to accumulate under
+    @ Out, wrapper, callable, wrapped method
+  """
+  def wrapper(*args, **kwargs):
+    """
+      Calls the wrapped method.
+      @ In, args, list, positional arguments
+      @ In, kwargs, dict, keyword arguments
+      @ Out, result, object, result of wrapped method
+    """
+    start = run_clock()
+    try:
+      return method(*args, **kwargs)
+    finally:
+      timings[key] += run_clock() - start
+  return wrapper
+
+def run_config(config, input_file):
+  """
+    Runs MOPED for one configuration; intended to run in a fresh process.
+    @ In, config, dict, problem dimensions
+    @ In, input_file, str, path to HERON MOPED input
+    @ Out, result, dict, configuration with measured times (s), peak memory (MB), and problem size
+  """
+  import resource
+  from ravenframework.MessageHandler import MessageHandler
+  from HERON.src import input_loader
+  from HERON.src.Moped import MOPED
+  from TEAL.src import main as RunCashFlow
+
+  handler = MessageHandler()
+  handler.initialize({'verbosity': 'silent', 'callerLength': 18, 'tagLength': 7, 'suppressErrs': False})
+  objects = input_loader.parse(input_loader.load(input_file), os.path.dirname(input_file), handler)
+  case = objects['case']
+  case._verbosity = 'silent'
+  if config['samples']:
+    case._num_samples = config['samples']
+  if config['years']:
+    case._global_econ['ProjectTime'] = config['years']
+  # processes of the benchmark pool cannot start worker processes of their own
+  case.moped['workers'] = 1
+  components = scale_components(objects['components'], config)
+
+  timings = dict((key, 0.0) for key in ['synthetic', 'dispatch', 'storage', 'constraints', 'cashflow', 'solve'])
+  moped = MOPED()
+  moped.setInitialParams(case, components, objects['sources'])
+  sample = timed(moped.sampleSyntheticHistory, timings, 'synthetic')
+  moped.sampleSyntheticHistory = lambda signal: tile_samples(sample(signal), config)
+  multiplicity = moped.buildMultiplicityMeta
+  def build_multiplicity():
+    """
+      Builds the multiplicity of the tiled synthetic histories.
+      @ In, None
+      @ Out, None
+    """
+    multiplicity()
+    moped._multiplicity_meta = tile_multiplicity(moped._multiplicity_meta, config)
+  moped.buildMultiplicityMeta = build_multiplicity
+  moped.buildDispatchVariables = timed(moped.buildDispatchVariables, timings, 'dispatch')
+  moped.buildStorageVariables = timed(moped.buildStorageVariables, timings, 'storage')
+  moped.buildConstraints = timed(moped.buildConstraints, timings, 'constraints')
+  RunCashFlow.run = timed(RunCashFlow.run, timings, 'cashflow')
+  get_solver = moped.getSolver
+  def get_timed_solver(model):
+    """
+      Provides the solver MOPED selects, timing its solves.
+      @ In, model, pyomo model, problem to solve
+      @ Out, solver, pyomo solver, solver with timed solve
+    """
+    solver = get_solver(model)
+    solver.solve = timed(solver.solve, timings, 'solve')
+    return solver
+  moped.getSolver = get_timed_solver
+
+  location = tempfile.mkdtemp(prefix='heron_moped_benchmark_')
+  cwd = os.getcwd()
+  try:
+    # MOPED writes its solution to the working directory
+    os.chdir(location)
+    start = run_clock()
+    moped.run()
+    total = run_clock() - start
+    npv = np.nan
+    if os.path.isfile('opt_solution.csv'):
+      with open('opt_solution.csv', 'r') as solution:
+        npv = float(solution.readlines()[-1].strip().split(',')[-1] or np.nan)
+  finally:
+    os.chdir(cwd)
+    shutil.rmtree(location, ignore_errors=True)
+  result = dict(config)
+  result.update({'realizations': len(moped._m.r),
+                 'project_years': len(moped._m.y),
+                 'num_clusters': len(moped._m.c),
+                 'hours': len(moped._m.t),
+                 'num_components': len(components),
+                 'variables': moped._m.nvariables(),
+                 'constraints': moped._m.nconstraints(),
+                 'synthetic_time': timings['synthetic'],
+                 'dispatch_build_time': timings['dispatch'],
+                 'storage_build_time': timings['storage'],
+                 'constraint_build_time': timings['constraints'],
+                 'build_time': timings['dispatch'] + timings['storage'] + timings['constraints'],
+                 'cashflow_time': timings['cashflow'],
+                 'solve_time': timings['solve'],
+                 'total_time': total,
+                 # ru_maxrss is in kB on Linux
+                 'peak_memory': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                 'NPV': npv})
+  return result
+
+def get_commit():
+  """
+    Identifies the HERON commit being benchmarked.
+    @ In, None
+    @ Out, commit, str, commit hash, or None if not available
+  """
+  try:
+    return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(__file__),
+                                   stderr=subprocess.DEVNULL, text=True).strip()
+  except (OSError, subprocess.CalledProcessError):
+    return None
+
+def compare(results, baseline_file):
+  """
+    Prints the relative change of each timing against a baseline.
+    @ In, results, list, benchmark results
+    @ In, baseline_file, str, path to baseline results (JSON lines)
+    @ Out, None
+  """
+  with open(baseline_file, 'r') as f:
+    baseline = [json.loads(line) for line in f if line.strip()]
+  keys = list(DEFAULTS.keys()) + ['input']
+  measures = ['dispatch_build_time', 'storage_build_time', 'constraint_build_time', 'cashflow_time',
+              'solve_time', 'total_time', 'peak_memory']
+  print('config | ' + ' | '.join(measures))
+  for result in results:
+    config = [result[key] for key in keys]
+    for base in baseline:
+      if [base.get(key) for key in keys] == config:
+        break
+    else:
+      continue
+    changes = [f'{result[m] / base[m] - 1: +.1%}' if base[m] else 'n/a' for m in measures]
+    print(' '.join(f'{key}={value}' for key, value in zip(keys, config)) + ' | ' + ' | '.join(changes))
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Benchmarks the scaling of the HERON MOPED workflow')
+  parser.add_argument('--input', default=DEFAULT_INPUT, help='HERON MOPED input file')
+  parser.add_argument('--preset', choices=list(PRESETS.keys()), default='quick', help='set of configurations')
+  for dim, default in DEFAULTS.items():
+    parser.add_argument(f'--{dim}', type=int, nargs='+',
+                        help=f'values of "{dim}" to benchmark, replacing the preset (default {default}, from input)')
+  parser.add_argument('--output', default='moped_benchmark.jsonl', help='file to append results to')
+  parser.add_argument('--compare', metavar='BASELINE', help='results file to compare against')
+  args = parser.parse_args()
+  input_file = os.path.abspath(args.input)
+  sweep = dict((dim, getattr(args, dim)) for dim in DEFAULTS if getattr(args, dim) is not None)
+  configurations = expand_preset([sweep] if sweep else PRESETS[args.preset])
+  commit = get_commit()
+  # fresh processes, so that peak memory is measured per configuration
+  context = multiprocessing.get_context('spawn')
+  results = []
+  for configuration in configurations:
+    with context.Pool(processes=1) as pool:
+      outcome = pool.apply(run_config, (configuration, input_file))
+    outcome['input'] = os.path.relpath(input_file, os.path.dirname(os.path.abspath(__file__)))
+    outcome['commit'] = commit
+    results.append(outcome)
+    print(json.dumps(outcome))
+    with open(args.output, 'a') as out:
+      out.write(json.dumps(outcome) + '\n')
+  if args.compare:
+    compare(results, args.compare)
@@ -0,0 +1,168 @@
+# Copyright 2020, Battelle Energy Alliance, LLC
+# ALL RIGHTS RESERVED
+"""
+  Builds small HERON systems for testing the dispatchers without a RAVEN run.
+  The default system has a source selling to a market at a time-varying price, with a storage
+  between them, so that rolling window boundaries matter.
+"""
+import os
+import sys
+
+import numpy as np
+
+# Load HERON tools
+HERON_LOC = os.path.abspath(os.path.join(os.path.dirname(__file__), *[os.pardir]*4))
+sys.path.append(HERON_LOC)
+from HERON.src import input_loader
+from HERON.src import _utils as hutils
+sys.path.pop()
+
+# Load RAVEN tools
+sys.path.append(hutils.get_raven_loc())
+from ravenframework.MessageHandler import MessageHandler
+sys.path.pop()
+
+SOURCE = '''
+    <Component name="source">
+      <produces resource="electricity" dispatch="independent">
+        <capacity resource="electricity"><fixed_value>100</fixed_value></capacity>
+      </produces>
+      <economics>
+        <lifetime>30</lifetime>
+        <CashFlow name="vom" type="repeating" taxable="True" inflation="none" mult_target="False">
+          <driver><activity>electricity</activity></driver>
+          <reference_price><fixed_value>-0.2</fixed_value></reference_price>
+        </CashFlow>
+      </economics>
+    </Component>'''
+
+STORAGE = '''
+    <Component name="storage">
+      <stores resource="electricity" dispatch="independent">
+        <capacity resource="electricity"><fixed_value>300</fixed_value></capacity>
+        <initial_stored><fixed_value>0.5</fixed_value></initial_stored>
+        <RTE>0.81</RTE>
+      </stores>
+      <economics><lifetime>30</lifetime></economics>
+    </Component>'''
+
+MARKET = '''
+    <Component name="market">
+      <demands resource="electricity" dispatch="dependent">
+        <capacity><fixed_value>-250</fixed_value></capacity>
+      </demands>
+      <economics>
+        <lifetime>30</lifetime>
+        <CashFlow name="sales" type="repeating" taxable="True" inflation="none" mult_target="False">
+          <driver><activity>electricity</activity><multiplier>-1</multiplier></driver>
+          <reference_price><CSV variable="Price">Signals</CSV></reference_price>
+        </CashFlow>
+      </economics>
+    </Component>'''
+
+def make_price(history, seed=42):
+  """
+    Makes a price signal with a daily cycle and seeded noise, so that dispatch optima are unique.
+    @ In, history, int, number of time steps
+    @ In, seed, int, optional, random seed
+    @ Out, price, np.array, price for each time step
+  """
+  hours = np.arange(history)
+  noise = np.random.default_rng(seed).uniform(-0.1, 0.1, history)
+  return 1.0 + 0.8 * np.sin(2 * np.pi * hours / 24) + noise
+
+def build(location, signals, pyomo='', components=None, generators='', project_time=1):
+  """
+    Writes and loads a HERON input with a single cluster, repeating the signals in every project year.
+    @ In, location, str, directory in which to write the input and signal files
+    @ In, signals, dict, history for each signal name, all of the same length
+    @ In, pyomo, str, optional, XML settings for the pyomo dispatcher
+    @ In, components, str, optional, XML for the components; defaults to source, storage, and market
+    @ In, generators, str, optional, XML for additional DataGenerators, e.g. Functions
+    @ In, project_time, int, optional, number of project years after construction
+    @ Out, case, HERON Case, loaded case
+    @ Out, components, list, loaded HERON components
+    @ Out, sources, list, loaded HERON sources (placeholders)
+  """
+  if components is None:
+    components = SOURCE + STORAGE + MARKET
+  names = list(signals.keys())
+  history = len(signals[names[0]])
+  with open(os.path.join(location, 'signals.csv'), 'w') as csv:
+    csv.write(','.join(['RAVEN_sample_ID', 'Year', 'Time'] + names) + '\n')
+    for year in range(2025, 2025 + project_time):
+      for t in range(history):
+        csv.write(','.join(['0', str(year), str(t)] + [str(signals[name][t]) for name in names]) + '\n')
+  heron_input = f'''<HERON>
+  <Case name="unit_test">
+    <mode>sweep</mode>
+    <num_arma_samples>1</num_arma_samples>
+    <time_discretization>
+      <time_variable>Time</time_variable>
+      <year_variable>Year</year_variable>
+      <start_time>0</start_time>
+      <end_time>{history - 1}</end_time>
+      <num_steps>{history}</num_steps>
+    </time_discretization>
+    <economics>
+      <ProjectTime>{project_time}</ProjectTime>
+      <DiscountRate>0.08</DiscountRate>
+      <tax>0.0</tax>
+      <inflation>0.0</inflation>
+      <verbosity>0</verbosity>
+    </economics>
+    <dispatcher>
+      <pyomo>{pyomo}
+      </pyomo>
+    </dispatcher>
+  </Case>
+  <Components>{components}
+  </Components>
+  <DataGenerators>
+    <CSV name="Signals" variable="{','.join(names)}">signals.csv</CSV>{generators}
+  </DataGenerators>
+</HERON>
+'''
+  input_file = os.path.join(location, 'heron_input.xml')
+  with open(input_file, 'w') as f:
+    f.write(heron_input)
+  handler = MessageHandler()
+  handler.initialize({'verbosity': 'silent', 'callerLength': 18, 'tagLength': 7, 'suppressErrs': False})
+  objects = input_loader.parse(input_loader.load(input_file), location, handler)
+  return objects['case'], objects['components'], objects['sources']
+
+def make_meta(case, components, sources, signals, year=0, division=0):
+  """
+    Builds the auxiliary information the DispatchManager passes to the dispatcher for one segment.
+    @ In, case, HERON Case, loaded case
+    @ In, components, list, loaded HERON components
+    @ In, sources, list, loaded HERON sources (placeholders)
+    @ In, signals, dict, history for each signal name, already sliced to this segment
+    @ In, year, int, optional, active year index
+    @ In, division, int, optional, active segment (or cluster) index
+    @ Out, meta, dict, auxiliary information
+  """
+  history = len(next(iter(signals.values())))
+  raven_vars = dict((name, np.asarray(values, dtype=float)) for name, values in signals.items())
+  raven_vars[case.get_time_name()] = np.arange(history, dtype=float)
+  raven_vars['_indexMap'] = np.atleast_1d(dict((name, [case.get_time_name()]) for name in signals))
+  heron = {'Case': case,
+           'Components': components,
+           'Sources': sources,
+           'RAVEN_vars_full': raven_vars,
+           'RAVEN_vars': raven_vars,
+           'resource_indexer': dict((comp, dict((res, r) for r, res in enumerate(comp.get_resources())))
+                                    for comp in components),
+           'active_index': {'year': year, 'division': division}}
+  return {'HERON': heron}
+
+def activity(dispatch, comp_name, tag='production'):
+  """
+    Gets the activity of a single-resource component (or of the first resource) from a dispatch.
+    @ In, dispatch, NumpyState, completed dispatch
+    @ In, comp_name, str, name of the component
+    @ In, tag, str, optional, tracking variable, e.g. "level" for storages
+    @ Out, activity, np.array, activity at each time step
+  """
+  data = dispatch.create_raven_vars('{comp}|{tracker}|{res}')
+  return next(values for name, values in data.items() if name.startswith(f'{comp_name}|{tag}|'))
@@ -0,0 +1,60 @@
+# Copyright 2020, Battelle Energy Alliance, LLC
+# ALL RIGHTS RESERVED
+"""
+Test that time aggregation in the pyomo dispatcher respects capacities that vary within a block
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+import dispatch_system
+
+results = {"pass":0, "fail":0}
+
+def check(name, passed, msg=''):
+  """
+    Records the result of a check.
+    @ In, name, str, name of the check
+    @ In, passed, bool, whether the check passed
+    @ In, msg, str, optional, additional information to print on failure
+    @ Out, None
+  """
+  if passed:
+    results['pass'] += 1
+  else:
+    results['fail'] += 1
+    print(f'Check "{name}" failed! {msg}')
+
+# source capacity comes from a signal
+source = dispatch_system.SOURCE.replace('<fixed_value>100</fixed_value>', '<CSV variable="Cap">Signals</CSV>')
+components = source + dispatch_system.STORAGE + dispatch_system.MARKET
+# prices and capacities are flat over 6-hour blocks, except that capacity dips slightly away from the
+# middle (representative) step of some blocks, by less than the aggregation tolerance
+history = 24
+price = np.repeat([0.5, 1.5, 0.8, 2.0], 6)
+cap = np.repeat([100., 60., 100., 80.], 6)
+cap[4] = 99.
+cap[23] = 79.
+signals = {'Price': price, 'Cap': cap}
+with tempfile.TemporaryDirectory() as location:
+  dispatches = {}
+  for name, pyomo in [('hourly', ''), ('aggregated', '<time_aggregation>0.05</time_aggregation>')]:
+    case, comps, sources = dispatch_system.build(location, signals, pyomo=pyomo, components=components)
+    meta = dispatch_system.make_meta(case, comps, sources, signals)
+    dispatches[name] = case.dispatcher.dispatch(case, comps, sources, meta)
+
+hourly_vars = dispatches['hourly'].get_telemetry()[0]['variables']
+aggregated_vars = dispatches['aggregated'].get_telemetry()[0]['variables']
+check('aggregated', aggregated_vars < hourly_vars,
+      f'expected fewer variables with aggregation, got {aggregated_vars} vs {hourly_vars}')
+production = dispatch_system.activity(dispatches['aggregated'], 'source')
+check('capacity', np.all(production <= cap + 1e-6), f'production {production} exceeds capacity {cap}')
+# the source produces as much as it can, limited by the smallest capacity in each block
+check('block minimum', np.allclose(production, np.repeat([99., 60., 100., 79.], 6)),
+      f'got production {production}')
+
+print(results)
+sys.exit(results['fail'])
@@ -0,0 +1,54 @@
+# Copyright 2020, Battelle Energy Alliance, LLC
+# ALL RIGHTS RESERVED
+"""
+Test that dispatching several segments in a single solve matches dispatching them one at a time
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+import dispatch_system
+
+results = {"pass":0, "fail":0}
+
+def check(name, found, expected):
+  """
+    Compares arrays and records the result.
+    @ In, name, str, name of the check
+    @ In, found, np.array, calculated values
+    @ In, expected, np.array, expected values
+    @ Out, None
+  """
+  if np.allclose(found, expected, rtol=1e-6, atol=1e-6):
+    results['pass'] += 1
+  else:
+    results['fail'] += 1
+    print(f'Check "{name}" failed! Expected {expected} but got {found}')
+
+history = 24
+with tempfile.TemporaryDirectory() as location:
+  segments = [{'Price': dispatch_system.make_price(history, seed=seed)} for seed in range(3)]
+  case, components, sources = dispatch_system.build(location, segments[0], pyomo='<batch_years>1</batch_years>')
+  dispatcher = case.dispatcher
+  metas = [dispatch_system.make_meta(case, components, sources, signals, division=s)
+           for s, signals in enumerate(segments)]
+  batched = dispatcher.dispatch_batch(case, components, sources, metas)
+  single = [dispatcher.dispatch(case, components, sources, meta) for meta in metas]
+
+check('count', len(batched), len(segments))
+time = np.arange(history, dtype=float)
+for s, (batch, alone, meta) in enumerate(zip(batched, single, metas)):
+  # segments differ, so they can't be matched by accident
+  expected = alone.create_raven_vars('{comp}_{tracker}_{res}')
+  for name, values in batch.create_raven_vars('{comp}_{tracker}_{res}').items():
+    check(f'segment {s} {name}', values, expected[name])
+  check(f'segment {s} objective', dispatcher._compute_cashflows(components, batch, time, meta),
+        dispatcher._compute_cashflows(components, alone, time, meta))
+  telemetry = batch.get_telemetry()[0]
+  check(f'segment {s} solved together', telemetry['solved_together'], len(segments))
+
+print(results)
+sys.exit(results['fail'])
@@ -0,0 +1,120 @@
+# Copyright 2020, Battelle Energy Alliance, LLC
+# ALL RIGHTS RESERVED
+"""
+Test that streamed dispatch files keep the segments solved before a failure
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+import netCDF4
+
+import dispatch_system
+from HERON.src.DispatchManager import DispatchRunner
+
+results = {"pass":0, "fail":0}
+
+def check(name, found, expected):
+  """
+    Compares values and records the result.
+    @ In, name, str, name of the check
+    @ In, found, object, calculated value
+    @ In, expected, object, expected value
+    @ Out, None
+  """
+  if found == expected:
+    results['pass'] += 1
+  else:
+    results['fail'] += 1
+    print(f'Check "{name}" failed! Expected {expected} but got {found}')
+
+class FailingDispatch:
+  """
+    Dispatches normally until a given number of segments have been solved, then fails.
+  """
+  def __init__(self, dispatch, succeed):
+    """
+      Constructor.
+      @ In, dispatch, callable, dispatch method to wrap
+      @ In, succeed, int, number of segments to solve before failing
+      @ Out, None
+    """
+    self._dispatch = dispatch
+    self._remaining = succeed
+
+  def __call__(self, *args, **kwargs):
+    """
+      Dispatches a segment, unless it is time to fail.
+      @ In, args, list, positional arguments for the dispatch
+      @ In, kwargs, dict, keyword arguments for the dispatch
+      @ Out, dispatch, DispatchState, dispatch of the segment
+    """
+    if self._remaining == 0:
+      raise RuntimeError('segment dispatch failed')
+    self._remaining -= 1
+    return self._dispatch(*args, **kwargs)
+
+def run(case, components, sources, path, succeed=None):
+  """
+    Runs the dispatch of every project year, streaming it to file.
+    @ In, case, HERON Case, loaded case
+    @ In, components, list, loaded HERON components
+    @ In, sources, list, loaded HERON sources (placeholders)
+    @ In, path, str, file to stream the dispatch to
+    @ In, succeed, int, optional, if given then number of segments to solve before failing
+    @ Out, runner, DispatchRunner, runner after the run
+    @ Out, failed, bool, True if the run failed
+  """
+  case.data_handling['dispatch_stream'] = {'file': path, 'compression': 4}
+  runner = DispatchRunner()
+  runner._case, runner._components, runner._sources = case, components, sources
+  runner._dispatcher = case.dispatcher
+  dispatch = case.dispatcher.dispatch
+  if succeed is not None:
+    case.dispatcher.dispatch = FailingDispatch(dispatch, succeed)
+  try:
+    runner.run(raven_vars)
+    failed = False
+  except RuntimeError:
+    failed = True
+  finally:
+    case.dispatcher.dispatch = dispatch
+  return runner, failed
+
+years = 3
+history = 24
+price = dispatch_system.make_price(history)
+raven_vars = {'Price': np.tile(price, (years, 1)),
+              'Time': np.arange(history, dtype=float),
+              'Year': np.arange(2025, 2025 + years, dtype=float),
+              '_indexMap': {'Price': ['Year', 'Time']}}
+
+with tempfile.TemporaryDirectory() as location:
+  case, components, sources = dispatch_system.build(location, {'Price': price}, project_time=years)
+  full_path = os.path.join(location, 'full.nc')
+  full, failed = run(case, components, sources, full_path)
+  check('full run', failed, False)
+  variables, expected, _ = full._stream.read()
+  with netCDF4.Dataset(full_path) as dataset:
+    check('full run complete', int(dataset.complete), 1)
+  check('full run written', bool(np.isfinite(expected).all()), True)
+
+  # fail partway through the third year, after two years are solved
+  partial_path = os.path.join(location, 'partial.nc')
+  partial, failed = run(case, components, sources, partial_path, succeed=2)
+  check('partial run failed', failed, True)
+  check('partial file closed', partial._stream._dataset is None, True)
+  with netCDF4.Dataset(partial_path) as dataset:
+    check('partial run incomplete', int(dataset.complete), 0)
+  found_variables, found, times = partial._stream.read()
+  check('partial variables', found_variables, variables)
+  check('partial times', list(times), list(range(history)))
+  check('solved years kept', np.allclose(found[:, :2], expected[:, :2]), True)
+  check('unsolved year empty', bool(np.isnan(found[:, 2]).all()), True)
+  year_data = partial._stream.read_year(1)
+  check('single year', np.allclose(np.array([year_data[name] for name in variables]), expected[:, 1]), True)
+
+print(results)
+sys.exit(results['fail'])
@@ -0,0 +1,86 @@
+# Copyright 2020, Battelle Energy Alliance, LLC
+# ALL RIGHTS RESERVED
+"""
+Test counting of ValuedParam and cashflow evaluations
+"""
+
+import os
+import sys
+import csv
+import tempfile
+
+import numpy as np
+
+import dispatch_system
+from HERON.src import EvaluationCounter
+
+results = {"pass":0, "fail":0}
+
+def check(name, found, expected):
+  """
+    Compares values and records the result.
+    @ In, name, str, name of the check
+    @ In, found, object, calculated value
+    @ In, expected, object, expected value
+    @ Out, None
+  """
+  if found == expected:
+    results['pass'] += 1
+  else:
+    results['fail'] += 1
+    print(f'Check "{name}" failed! Expected {expected} but got {found}')
+
+history = 24
+signals = {'Price': dispatch_system.make_price(history)}
+os.environ.pop(EvaluationCounter.env_var, None)
+with tempfile.TemporaryDirectory() as location:
+  case, components, sources = dispatch_system.build(location, signals)
+  meta = dispatch_system.make_meta(case, components, sources, signals)
+  time = np.arange(history, dtype=float)
+
+  # nothing is counted unless requested
+  check('disabled', EvaluationCounter.enable_from_settings(case), False)
+  dispatch = case.dispatcher.dispatch(case, components, sources, meta)
+  check('disabled counts', EvaluationCounter.ranked(), [])
+  check('disabled write', EvaluationCounter.write(location), None)
+
+  # enabling more than once must not count calls more than once
+  case.debug['evaluation_counts'] = True
+  check('enabled', EvaluationCounter.enable_from_settings(case), True)
+  EvaluationCounter.set_enabled(True)
+  case.dispatcher._compute_cashflows(components, dispatch, time, meta)
+  ranked = EvaluationCounter.ranked()
+  calls = dict(((owner, param, kind), count) for owner, param, kind, count, _ in ranked)
+  check('cashflow calls', calls[('market', 'sales', 'CashFlow')], history)
+  check('cashflow calls', calls[('source', 'vom', 'CashFlow')], history)
+  check('price calls', calls[("CashFlow 'sales'", '_alpha', 'StaticHistory')], history)
+  check('driver calls', calls[("CashFlow 'vom'", '_driver', 'Activity')], history)
+  # defaulted parameters are attributed to their cashflow, too
+  check('default calls', calls[("CashFlow 'vom'", '_reference', 'FixedValue')], history)
+  check('all attributed', [key for key in calls if key[0] is None], [])
+  times = [entry[4] for entry in ranked]
+  check('ranked by time', times, sorted(times, reverse=True))
+
+  path = EvaluationCounter.write(location)
+  with open(path) as f:
+    rows = list(csv.DictReader(f))
+  check('written rows', len(rows), len(ranked))
+  check('written ranks', [int(row['rank']) for row in rows], list(range(1, len(ranked) + 1)))
+  first = rows[0]
+  check('written mean', np.isclose(float(first['mean_time']), float(first['total_time']) / int(first['calls'])), True)
+
+  # each run starts from zero
+  EvaluationCounter.enable_from_settings(case)
+  check('reset', EvaluationCounter.ranked(), [])
+
+  # a later case that didn't ask for counts is neither counted nor written
+  os.remove(path)
+  case.debug['evaluation_counts'] = False
+  check('disabled again', EvaluationCounter.enable_from_settings(case), False)
+  case.dispatcher._compute_cashflows(components, dispatch, time, meta)
+  check('disabled again counts', EvaluationCounter.ranked(), [])
+  check('disabled again write', EvaluationCounter.write(location), None)
+  check('disabled again file', os.path.exists(path), False)
+
+print(results)
+sys.exit(results['fail'])
@@ -0,0 +1,77 @@
+# Copyright 2020, Battelle Energy Alliance, LLC
+# ALL RIGHTS RESERVED
+"""
+Test fixed point accelerators used for iterating governed dispatch
+"""
+
+import os
+import sys
+
+import numpy as np
+
+# Load HERON tools
+HERON_LOC = os.path.abspath(os.path.join(os.path.dirname(__file__), *[os.pardir]*4))
+sys.path.append(HERON_LOC)
+from HERON.src.dispatch.fixed_point import FixedPointAccelerator
+sys.path.pop()
+
+results = {"pass":0, "fail":0}
+
+# slowly-converging linear fixed point problem, x = A x + b
+A = np.array([[0.9, 0.05], [0.02, 0.85]])
+b = np.array([1.0, 2.0])
+solution = np.linalg.solve(np.eye(2) - A, b)
+
+def iterations(method, limit=500, tol=1e-8):
+  """
+    Counts iterations needed to converge the fixed point problem.
+    @ In, method, str, acceleration method
+    @ In, limit, int, optional, maximum iterations
+    @ In, tol, float, optional, convergence tolerance
+    @ Out, count, int, number of iterations used
+    @ Out, x, np.array, final iterate
+  """
+  accelerator = FixedPointAccelerator(method, relaxation=1.0, depth=3)
+  x = np.zeros(2)
+  for count in range(1, limit + 1):
+    g = A @ x + b
+    if np.linalg.norm(g - x) < tol:
+      break
+    x = accelerator.update(x, g)
+  return count, x
+
+plain, x_plain = iterations('none')
+anderson, x_anderson = iterations('anderson')
+for name, x in [('none', x_plain), ('anderson', x_anderson)]:
+  if np.allclose(x, solution, atol=1e-6):
+    results['pass'] += 1
+  else:
+    results['fail'] += 1
+    print(f'Method "{name}" did not converge to {solution}, got {x}')
+if anderson < plain:
+  results['pass'] += 1
+else:
+  results['fail'] += 1
+  print(f'Anderson acceleration took {anderson} iterations, plain iteration took {plain}!')
+
+# relaxation takes part of the step
+relaxed = FixedPointAccelerator('relaxation', relaxation=0.25).update(np.zeros(2), np.array([4.0, 8.0]))
+if np.allclose(relaxed, [1.0, 2.0]):
+  results['pass'] += 1
+else:
+  results['fail'] += 1
+  print(f'Relaxation gave {relaxed} instead of [1, 2]')
+
+# Anderson extrapolation is clipped to the bounds of each entry, regardless of other entries' scales
+accelerator = FixedPointAccelerator('anderson', relaxation=1.0, depth=3)
+accelerator.update(np.zeros(2), np.array([1.0, 1000.0]))
+clipped = accelerator.update(np.array([1.0, 1000.0]), np.array([2.0, 1500.0]),
+                             lower=np.zeros(2), upper=np.array([2.5, 3000.0]))
+if np.allclose(clipped, [2.5, 2000.0]):
+  results['pass'] += 1
+else:
+  results['fail'] += 1
+  print(f'Anderson extrapolation gave {clipped} instead of [2.5, 2000]')
+
+print(results)
+sys.exit(results['fail'])
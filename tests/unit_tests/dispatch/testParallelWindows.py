@@ -0,0 +1,83 @@
+# Copyright 2020, Battelle Energy Alliance, LLC
+# ALL RIGHTS RESERVED
+"""
+Test that rolling windows solved in parallel reproduce the sequential dispatch
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+import dispatch_system
+
+results = {"pass":0, "fail":0}
+
+def check(name, found, expected, atol):
+  """
+    Compares arrays and records the result.
+    @ In, name, str, name of the check
+    @ In, found, np.array, calculated values
+    @ In, expected, np.array, expected values
+    @ In, atol, float, absolute tolerance
+    @ Out, None
+  """
+  if np.allclose(found, expected, rtol=0, atol=atol):
+    results['pass'] += 1
+  else:
+    results['fail'] += 1
+    print(f'Check "{name}" failed! Expected {expected} but got {found}')
+
+def run(location, pyomo, repeat=1, export=None):
+  """
+    Dispatches the test system.
+    @ In, location, str, directory for the input files
+    @ In, pyomo, str, XML settings for the pyomo dispatcher
+    @ In, repeat, int, optional, number of times to dispatch the history
+    @ In, export, str, optional, directory in which to write each window problem, if any
+    @ Out, dispatch, NumpyState, last dispatch
+    @ Out, pools, list, process pool used by each dispatch, if any
+  """
+  case, components, sources = dispatch_system.build(location, signals, pyomo=pyomo)
+  meta = dispatch_system.make_meta(case, components, sources, signals)
+  if export is not None:
+    case.dispatcher.set_model_export(export)
+  pools = []
+  for _ in range(repeat):
+    dispatch = case.dispatcher.dispatch(case, components, sources, meta)
+    pools.append(case.dispatcher._pool)
+  case.dispatcher.finalize()
+  pools.append(case.dispatcher._pool)
+  return dispatch, pools
+
+signals = {'Price': dispatch_system.make_price(72)}
+window = '<rolling_window_length>12</rolling_window_length>'
+tol = 1e-3
+with tempfile.TemporaryDirectory() as location:
+  dispatch, pools = run(location, window)
+  serial = dispatch_system.activity(dispatch, 'storage', 'level')
+  scale = np.max(np.abs(serial))
+  for estimate, repeat in [('initial', 1), ('previous', 2), ('coarse', 1)]:
+    parallel = f'''{window}
+        <parallel_windows>
+          <workers>2</workers>
+          <boundary_estimate>{estimate}</boundary_estimate>
+          <tolerance>{tol}</tolerance>
+        </parallel_windows>'''
+    export = os.path.join(location, f'{estimate}_problems')
+    dispatch, pools = run(location, parallel, repeat=repeat, export=export)
+    found = dispatch_system.activity(dispatch, 'storage', 'level')
+    check(f'{estimate} levels', found, serial, tol * scale)
+    # the workers are started once and kept for later dispatches, until the run finishes
+    check(f'{estimate} pool kept', len(set(id(pool) for pool in pools[:-1])) == 1 and pools[0] is not None, True, 0)
+    check(f'{estimate} pool shut down', pools[-1] is None, True, 0)
+    # every solve of every window is exported, including those solved by different workers
+    exported = sorted(os.listdir(export))
+    starts = range(0, 72, 12)
+    check(f'{estimate} exported', all(f'window_y00_s0_t{start:06d}_{solve:02d}.lp' in exported
+                                      for start in starts for solve in range(repeat)), True, 0)
+    check(f'{estimate} exported only windows', all(name.startswith('window_y00_s0_t') for name in exported), True, 0)
+
+print(results)
+sys.exit(results['fail'])
@@ -0,0 +1,73 @@
+# Copyright 2020, Battelle Energy Alliance, LLC
+# ALL RIGHTS RESERVED
+"""
+Test that saved dispatch variables match the dispatch of each year and cluster
+"""
+
+import sys
+import tempfile
+
+import numpy as np
+
+import dispatch_system
+from HERON.src.DispatchManager import DispatchRunner
+
+results = {"pass":0, "fail":0}
+
+def check(name, found, expected):
+  """
+    Compares values and records the result.
+    @ In, name, str, name of the check
+    @ In, found, object, calculated value
+    @ In, expected, object, expected value
+    @ Out, None
+  """
+  if found == expected:
+    results['pass'] += 1
+  else:
+    results['fail'] += 1
+    print(f'Check "{name}" failed! Expected {expected} but got {found}')
+
+class Raven:
+  """
+    Stands in for the RAVEN external model object that receives the variables.
+  """
+
+history = 24
+with tempfile.TemporaryDirectory() as location:
+  signals = {'Price': dispatch_system.make_price(history)}
+  case, components, sources = dispatch_system.build(location, signals)
+  # different prices for each year and cluster, so each dispatch is distinct
+  all_dispatch = {}
+  for y, year in enumerate([2025, 2026]):
+    all_dispatch[year] = {}
+    for c in range(3):
+      segment = {'Price': dispatch_system.make_price(history, seed=10 * y + c)}
+      meta = dispatch_system.make_meta(case, components, sources, segment, year=y, division=c)
+      all_dispatch[year][c] = case.dispatcher.dispatch(case, components, sources, meta)
+
+  runner = DispatchRunner()
+  runner._case = case
+  template = runner.naming_template['dispatch var']
+  for precision, dtype in [('float64', np.float64), ('float32', np.float32)]:
+    case.data_handling['dispatch_precision'] = precision
+    raven = Raven()
+    runner._save_dispatch_variables(raven, all_dispatch)
+    check(f'{precision} years', list(raven.Year), [2025, 2026])
+    check(f'{precision} clusters', list(raven._ROM_Cluster), [0, 1, 2])
+    check(f'{precision} times', list(raven.Time), list(range(history)))
+    names = list(all_dispatch[2025][0].create_raven_vars(template))
+    check(f'{precision} index map', raven._indexMap[0], dict((name, ['Year', '_ROM_Cluster', 'Time']) for name in names))
+    for name in names:
+      saved = getattr(raven, name)
+      check(f'{precision} {name} shape', saved.shape, (2, 3, history))
+      check(f'{precision} {name} dtype', saved.dtype, np.dtype(dtype))
+      expected = np.array([[dispatch.create_raven_vars(template)[name] for dispatch in year_data.values()]
+                           for year_data in all_dispatch.values()])
+      check(f'{precision} {name} values', np.allclose(saved, expected, rtol=1e-6, atol=1e-4), True)
+    # every variable is a view of the same buffer
+    base = getattr(raven, names[0]).base
+    check(f'{precision} shared buffer', all(getattr(raven, name).base is base for name in names), True)
+
+print(results)
+sys.exit(results['fail'])
@@ -0,0 +1,87 @@
+# Copyright 2020, Battelle Energy Alliance, LLC
+# ALL RIGHTS RESERVED
+"""
+Test iterative dispatch of a storage governed by a strategy that responds to the window dispatch
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+import dispatch_system
+
+results = {"pass":0, "fail":0}
+
+def check(name, passed, msg=''):
+  """
+    Records the result of a check.
+    @ In, name, str, name of the check
+    @ In, passed, bool, whether the check passed
+    @ In, msg, str, optional, additional information to print on failure
+    @ Out, None
+  """
+  if passed:
+    results['pass'] += 1
+  else:
+    results['fail'] += 1
+    print(f'Check "{name}" failed! {msg}')
+
+# the strategy moves the storage level halfway from the dispatched level to 50, so the
+# fixed point is a level of 50, reached only by iterating
+STRATEGY = '''
+import numpy as np
+
+def respond(data, meta):
+  """
+    Sets the storage level in response to the last window dispatch, if any.
+    @ In, data, dict, request information, including the component and time
+    @ In, meta, dict, additional information from HERON state
+    @ Out, data, dict, storage level
+    @ Out, meta, dict, additional information from HERON state
+  """
+  window = meta['HERON'].get('window_dispatch')
+  if window is None:
+    data['level'] = np.zeros(len(data['time']))
+  else:
+    data['level'] = 0.5 * window['storage']['level']['electricity'] + 25
+  return data, meta
+'''
+storage = dispatch_system.STORAGE.replace('<RTE>',
+    '<strategy><Function method="respond">control</Function></strategy>\n        <RTE>')
+components = dispatch_system.SOURCE + storage + dispatch_system.MARKET
+generators = '\n    <Function name="control">control.py</Function>'
+signals = {'Price': dispatch_system.make_price(24)}
+iterations = {}
+with tempfile.TemporaryDirectory() as location:
+  with open(os.path.join(location, 'control.py'), 'w') as f:
+    f.write(STRATEGY)
+  for method in ['none', 'anderson']:
+    pyomo = f'''
+        <strategy_convergence>
+          <tolerance>1e-6</tolerance>
+          <iterations>50</iterations>
+          <acceleration>{method}</acceleration>
+          <relaxation>1.0</relaxation>
+        </strategy_convergence>'''
+    case, comps, sources = dispatch_system.build(location, signals, pyomo=pyomo, components=components,
+                                                 generators=generators)
+    meta = dispatch_system.make_meta(case, comps, sources, signals)
+    dispatch = case.dispatcher.dispatch(case, comps, sources, meta)
+    level = dispatch_system.activity(dispatch, 'storage', 'level')
+    check(f'{method} level', np.allclose(level, 50, rtol=1e-4), f'got levels {level}')
+    check(f'{method} cleanup', 'window_dispatch' not in meta['HERON'], 'window dispatch left in meta')
+    iterations[method] = dispatch.get_telemetry()[0]['picard_iterations']
+  check('acceleration', 1 < iterations['anderson'] < iterations['none'],
+        f'Anderson took {iterations["anderson"]} iterations, plain took {iterations["none"]}')
+  # at least one solve is needed
+  try:
+    dispatch_system.build(location, signals, components=components, generators=generators,
+                          pyomo='<strategy_convergence><iterations>0</iterations></strategy_convergence>')
+    check('iterations limit', False, 'no error for zero iterations')
+  except IOError:
+    check('iterations limit', True)
+
+print(results)
+sys.exit(results['fail'])
@@ -0,0 +1,65 @@
+# Copyright 2020, Battelle Energy Alliance, LLC
+# ALL RIGHTS RESERVED
+"""
+Test the per-window telemetry of the pyomo dispatcher and its quiet default
+"""
+
+import io
+import os
+import sys
+import json
+import tempfile
+import contextlib
+
+import dispatch_system
+
+results = {"pass":0, "fail":0}
+
+def check(name, found, expected):
+  """
+    Compares values and records the result.
+    @ In, name, str, name of the check
+    @ In, found, object, calculated value
+    @ In, expected, object, expected value
+    @ Out, None
+  """
+  if found == expected:
+    results['pass'] += 1
+  else:
+    results['fail'] += 1
+    print(f'Check "{name}" failed! Expected {expected} but got {found}')
+
+signals = {'Price': dispatch_system.make_price(48)}
+with tempfile.TemporaryDirectory() as location:
+  telemetry_file = os.path.join(location, 'telemetry.jsonl')
+  pyomo = f'''<rolling_window_length>24</rolling_window_length>
+        <telemetry>{telemetry_file}</telemetry>'''
+  case, components, sources = dispatch_system.build(location, signals, pyomo=pyomo)
+  meta = dispatch_system.make_meta(case, components, sources, signals, year=1, division=2)
+  output = io.StringIO()
+  with contextlib.redirect_stdout(output):
+    dispatch = case.dispatcher.dispatch(case, components, sources, meta)
+  check('quiet by default', output.getvalue(), '')
+
+  # one record per window, stored on the dispatch
+  records = dispatch.get_telemetry()
+  check('windows', [(r['start'], r['end']) for r in records], [(0, 24), (24, 48)])
+  for r, record in enumerate(records):
+    check(f'window {r} termination', record['termination'], 'optimal')
+    check(f'window {r} solved alone', record['solved_together'], 1)
+    check(f'window {r} no strategy iterations', record['picard_iterations'], 0)
+    check(f'window {r} validated', record['validation_attempts'], 1)
+    # source and storage activity, market demand, and storage level for each hour at least
+    check(f'window {r} model size', record['variables'] >= 4 * 24 and record['constraints'] > 0, True)
+    check(f'window {r} timings', all(record[t] >= 0 for t in ['build_time', 'solve_time', 'retrieval_time']), True)
+
+  # the same records are appended to the file, tagged with the segment
+  case.dispatcher.dispatch(case, components, sources, meta)
+  with open(telemetry_file) as telemetry:
+    lines = [json.loads(line) for line in telemetry]
+  check('appended records', len(lines), 4)
+  check('segment tags', set((line['year'], line['division']) for line in lines), {(1, 2)})
+  check('file windows', [(line['start'], line['end']) for line in lines[:2]], [(0, 24), (24, 48)])
+
+print(results)
+sys.exit(results['fail'])
@@ -0,0 +1,50 @@
+# Copyright 2020, Battelle Energy Alliance, LLC
+# ALL RIGHTS RESERVED
+"""
+Test adaptive time aggregation utilities for dispatch
+"""
+
+import os
+import sys
+
+import numpy as np
+
+# Load HERON tools
+HERON_LOC = os.path.abspath(os.path.join(os.path.dirname(__file__), *[os.pardir]*4))
+sys.path.append(HERON_LOC)
+from HERON.src.dispatch import time_aggregation
+sys.path.pop()
+
+results = {"pass":0, "fail":0}
+
+def check(name, found, expected):
+  """
+    Compares arrays and records the result.
+    @ In, name, str, name of the check
+    @ In, found, np.array, calculated values
+    @ In, expected, np.array, expected values
+    @ Out, None
+  """
+  if np.allclose(found, expected):
+    results['pass'] += 1
+  else:
+    results['fail'] += 1
+    print(f'Check "{name}" failed! Expected {expected} but got {found}')
+
+# flat overnight prices, a peak, and a flat tail
+price = np.array([10, 10.1, 10, 10, 50, 52, 30, 30, 30.2])
+demand = np.array([5, 5, 5, 5, 9, 9, 7, 7, 7])
+counts = time_aggregation.find_blocks([price, demand], 0.05)
+check('blocks', counts, [4, 2, 3])
+check('blocks sum', counts.sum(), len(price))
+# zero tolerance only merges identical values
+check('no tolerance', time_aggregation.find_blocks([demand], 0.0), [4, 2, 3])
+check('representatives', time_aggregation.representative_indices(counts), [1, 4, 7])
+check('expand rates', time_aggregation.expand_blocks(np.array([1., 2., 3.]), counts),
+      [1, 1, 1, 1, 2, 2, 3, 3, 3])
+# storage level changes linearly within each block, starting from the initial level
+check('expand levels', time_aggregation.expand_levels(np.array([4., 2., 5.]), counts, 0.),
+      [1, 2, 3, 4, 3, 2, 3, 4, 5])
+
+print(results)
+sys.exit(results['fail'])
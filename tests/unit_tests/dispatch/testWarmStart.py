@@ -0,0 +1,68 @@
+# Copyright 2020, Battelle Energy Alliance, LLC
+# ALL RIGHTS RESERVED
+"""
+Test that warm-starting rolling windows in the pyomo dispatcher doesn't change the dispatch
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+import dispatch_system
+
+results = {"pass":0, "fail":0}
+
+def check(name, found, expected):
+  """
+    Compares values and records the result.
+    @ In, name, str, name of the check
+    @ In, found, float, calculated value
+    @ In, expected, float, expected value
+    @ Out, None
+  """
+  if np.isclose(found, expected, rtol=1e-6):
+    results['pass'] += 1
+  else:
+    results['fail'] += 1
+    print(f'Check "{name}" failed! Expected {expected} but got {found}')
+
+def run_segments(case, components, sources):
+  """
+    Dispatches each segment of each year, as the DispatchManager does.
+    @ In, case, HERON Case, loaded case
+    @ In, components, list, loaded HERON components
+    @ In, sources, list, loaded HERON sources (placeholders)
+    @ Out, objectives, list, dispatch objective of each segment
+  """
+  objectives = []
+  time = np.arange(history, dtype=float)
+  for year in range(2):
+    for division, seed in enumerate([1, 2]):
+      signals = {'Price': dispatch_system.make_price(history, seed=seed + year)}
+      meta = dispatch_system.make_meta(case, components, sources, signals, year=year, division=division)
+      dispatch = case.dispatcher.dispatch(case, components, sources, meta)
+      objectives.append(case.dispatcher._compute_cashflows(components, dispatch, time, meta))
+  return objectives
+
+history = 48
+window = '<rolling_window_length>12</rolling_window_length>'
+with tempfile.TemporaryDirectory() as location:
+  signals = {'Price': dispatch_system.make_price(history)}
+  cold = dispatch_system.build(location, signals, pyomo=window)
+  warm = dispatch_system.build(location, signals, pyomo=window + '<warm_start>True</warm_start>')
+  for capacity in [100, 40]:
+    # a new capacity point, as set by the outer optimization
+    for _, components, _ in [cold, warm]:
+      for comp in components:
+        if comp.name == 'source':
+          comp.set_capacity(capacity)
+    for s, (cold_obj, warm_obj) in enumerate(zip(run_segments(*cold), run_segments(*warm))):
+      check(f'capacity {capacity} segment {s} objective', warm_obj, cold_obj)
+    # stored solutions are only those for the current capacities
+    stored = list(warm[0].dispatcher._warm_by_segment.keys()) + list(warm[0].dispatcher._warm_by_window.keys())
+    check(f'capacity {capacity} stored', all(dict(key[0])['source'] == repr(float(capacity)) for key in stored), True)
+
+print(results)
+sys.exit(results['fail'])
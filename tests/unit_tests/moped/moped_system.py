@@ -0,0 +1,243 @@
+# Copyright 2022, Battelle Energy Alliance, LLC
+# ALL RIGHTS RESERVED
+"""
+  Builds small MOPED problems for testing without a trained synthetic history ROM.
+  The default system is a generator and an import meeting a synthetic load, and a market buying
+  at a synthetic price. Synthetic histories come from a seeded stand-in for the ROM runner.
+"""
+import os
+import sys
+
+import numpy as np
+
+# Load HERON tools
+HERON_LOC = os.path.abspath(os.path.join(os.path.dirname(__file__), *[os.pardir]*4))
+sys.path.append(HERON_LOC)
+from HERON.src import input_loader
+from HERON.src import _utils as hutils
+from HERON.src import Moped
+sys.path.pop()
+
+# Load RAVEN tools
+sys.path.append(hutils.get_raven_loc())
+from ravenframework.MessageHandler import MessageHandler
+sys.path.pop()
+
+HOURS = 4                            # hours in each cluster (or segment)
+SEGMENTS = [[0, 2], [1, 3], [4]]     # segments of the year represented by each cluster
+
+GENERATOR = '''
+    <Component name="ngcc">
+      <produces resource="electricity" dispatch="independent">
+        <capacity resource="electricity"><opt_bounds>10, 40</opt_bounds></capacity>
+      </produces>
+      <economics>
+        <lifetime>10</lifetime>
+        <CashFlow name="capex" type="one-time" taxable="True" inflation="none" mult_target="False">
+          <driver><variable>ngcc_capacity</variable></driver>
+          <reference_price><fixed_value>-1e5</fixed_value></reference_price>
+        </CashFlow>
+        <CashFlow name="var_OM" type="repeating" taxable="True" inflation="none" mult_target="False">
+          <driver><activity>electricity</activity><multiplier>-1</multiplier></driver>
+          <reference_price><fixed_value>25</fixed_value></reference_price>
+        </CashFlow>
+      </economics>
+    </Component>'''
+
+IMPORT = '''
+    <Component name="import">
+      <produces resource="electricity" dispatch="independent">
+        <capacity resource="electricity"><fixed_value>100</fixed_value></capacity>
+      </produces>
+      <economics>
+        <lifetime>1</lifetime>
+        <CashFlow name="import" type="repeating" taxable="True" inflation="none" mult_target="False">
+          <driver><activity>electricity</activity><multiplier>-1</multiplier></driver>
+          <reference_price><fixed_value>100</fixed_value></reference_price>
+        </CashFlow>
+      </economics>
+    </Component>'''
+
+GRID = '''
+    <Component name="grid">
+      <demands resource="electricity" dispatch="fixed">
+        <capacity><ARMA variable="LOAD">synth</ARMA><multiplier>-1</multiplier></capacity>
+      </demands>
+      <economics>
+        <lifetime>1</lifetime>
+        <CashFlow name="tariff" type="repeating" taxable="True" inflation="none" mult_target="False">
+          <driver><activity>electricity</activity></driver>
+          <reference_price><fixed_value>-60</fixed_value></reference_price>
+        </CashFlow>
+      </economics>
+    </Component>'''
+
+MARKET = '''
+    <Component name="market">
+      <demands resource="electricity" dispatch="independent">
+        <capacity><fixed_value>-5</fixed_value></capacity>
+      </demands>
+      <economics>
+        <lifetime>1</lifetime>
+        <CashFlow name="sales" type="repeating" taxable="True" inflation="none" mult_target="False">
+          <driver><activity>electricity</activity><multiplier>-1</multiplier></driver>
+          <reference_price><ARMA variable="PRICE">synth</ARMA></reference_price>
+        </CashFlow>
+      </economics>
+    </Component>'''
+
+class SyntheticROM:
+  """
+    Stands in for the runner of a trained synthetic history ROM, sampling seeded signals.
+  """
+  def __init__(self, mode, years, seed=42):
+    """
+      Constructor.
+      @ In, mode, str, evaluation mode, "clustered" or "full"
+      @ In, years, int, number of years in each sample
+      @ In, seed, int, optional, random seed
+      @ Out, None
+    """
+    self.mode = mode
+    self.years = years
+    self.evaluations = 0
+    self._rng = np.random.default_rng(seed)
+
+  def evaluate(self, request):
+    """
+      Samples one realization of all signals.
+      @ In, request, dict, ROM inputs
+      @ Out, rlz, list, realization of each signal, as [year, cluster, hour] if clustered or [year, hour] if full
+    """
+    self.evaluations += 1
+    if self.mode == 'clustered':
+      shape = (self.years, len(SEGMENTS), HOURS)
+    else:
+      shape = (self.years, sum(len(segments) for segments in SEGMENTS) * HOURS)
+    rlz = {'LOAD': self._rng.uniform(20, 35, shape),
+           'PRICE': self._rng.uniform(20, 80, shape)}
+    return [rlz]
+
+class SyntheticLoader:
+  """
+    Stands in for loading the synthetic history ROM, recording the evaluation mode of each load.
+  """
+  loads = []
+
+  def __init__(self, path, raven_loc):
+    """
+      Constructor.
+      @ In, path, str, path to the serialized ROM
+      @ In, raven_loc, str, path to RAVEN
+      @ Out, None
+    """
+    self.runner = None
+
+  def setAdditionalParams(self, nodes):
+    """
+      Sets the evaluation mode of the ROM.
+      @ In, nodes, list, xml nodes with ROM settings
+      @ Out, None
+    """
+    mode = nodes[0].find('clusterEvalMode').text
+    self.loads.append(mode)
+    self.runner = SyntheticROM(mode, 2)
+
+  def evaluate(self, request):
+    """
+      Samples one realization of all signals.
+      @ In, request, dict, ROM inputs
+      @ Out, rlz, list, realization of each signal
+    """
+    return self.runner.evaluate(request)
+
+def structure(path):
+  """
+    Describes the clusters of the stand-in ROM, in place of reading them from a trained ROM.
+    @ In, path, str, path to the serialized ROM (not used)
+    @ Out, structure, dict, cluster information for each year
+  """
+  clusters = [{'id': c, 'represents': [str(s) for s in segments], 'indices': []} for c, segments in enumerate(SEGMENTS)]
+  return {'clusters': dict((year, clusters) for year in range(2)), 'segments': {}}
+
+# HERON loads the ROM and reads its cluster structure when building problems
+Moped.ROMloader.ravenROMexternal = SyntheticLoader
+hutils.get_synthhist_structure = structure
+
+def build(location, components=None, moped=None, samples=4):
+  """
+    Writes and loads a HERON input for MOPED with a two year project, and sets up MOPED to solve it.
+    @ In, location, str, directory in which to write the input
+    @ In, components, str, optional, XML for the components; defaults to generator, import, grid, and market
+    @ In, moped, str, optional, XML settings for MOPED
+    @ In, samples, int, optional, number of synthetic history realizations
+    @ Out, moped, MOPED, MOPED set up with the case, components, and sources
+  """
+  if components is None:
+    components = GENERATOR + IMPORT + GRID + MARKET
+  settings = '' if moped is None else f'''
+    <moped>{moped}
+    </moped>'''
+  # the ROM is never loaded, but it needs to exist
+  open(os.path.join(location, 'synth.pk'), 'w').close()
+  heron_input = f'''<HERON>
+  <Case name="unit_test">
+    <mode>opt</mode>
+    <verbosity>silent</verbosity>
+    <workflow>MOPED</workflow>
+    <num_arma_samples>{samples}</num_arma_samples>
+    <time_discretization>
+      <year_variable>YEAR</year_variable>
+      <time_variable>HOUR</time_variable>
+      <end_time>{HOURS - 1}</end_time>
+      <num_steps>{HOURS}</num_steps>
+    </time_discretization>
+    <economics>
+      <ProjectTime>2</ProjectTime>
+      <DiscountRate>0.08</DiscountRate>
+      <tax>0.1</tax>
+      <inflation>0.1</inflation>
+      <verbosity>0</verbosity>
+    </economics>
+    <dispatcher>
+      <pyomo/>
+    </dispatcher>{settings}
+  </Case>
+  <Components>{components}
+  </Components>
+  <DataGenerators>
+    <ARMA name="synth" variable="LOAD,PRICE">synth.pk</ARMA>
+  </DataGenerators>
+</HERON>
+'''
+  input_file = os.path.join(location, 'heron_input.xml')
+  with open(input_file, 'w') as f:
+    f.write(heron_input)
+  handler = MessageHandler()
+  handler.initialize({'verbosity': 'silent', 'callerLength': 18, 'tagLength': 7, 'suppressErrs': False})
+  objects = input_loader.parse(input_loader.load(input_file), location, handler)
+  moped = Moped.MOPED()
+  moped.setInitialParams(objects['case'], objects['components'], objects['sources'])
+  return moped
+
+def build_problem(moped):
+  """
+    Builds the MOPED problem variables and cashflows, as MOPED does before building its objective.
+    @ In, moped, MOPED, MOPED set up by build
+    @ Out, dispatches, dict, pyomo dispatch var/param of each component
+  """
+  moped.buildEconSettings()
+  moped.buildComponentMeta()
+  moped.buildCashflowMeta()
+  moped.buildMultiplicityMeta()
+  moped.collectResources()
+  moped.buildIndexSets()
+  moped.buildMultiplicityVariables()
+  dispatches = {}
+  for comp in moped._components:
+    if moped._component_meta[comp.name]['Stores'] is None:
+      capacity, dispatches[comp.name] = moped.buildDispatchVariables(comp)
+    else:
+      capacity, dispatches[comp.name] = moped.buildStorageVariables(comp)
+    moped._cf_components.append(moped.createCashflowComponent(comp, capacity, dispatches[comp.name]))
+  return dispatches
@@ -0,0 +1,50 @@
+# Copyright 2022, Battelle Energy Alliance, LLC
+# ALL RIGHTS RESERVED
+"""
+Test that the capacity slopes of Benders subproblems match finite differences of their NPV
+"""
+
+import sys
+import tempfile
+
+import numpy as np
+
+import moped_system
+
+results = {"pass":0, "fail":0}
+
+def check(name, found, expected):
+  """
+    Compares values and records the result.
+    @ In, name, str, name of the check
+    @ In, found, object, calculated value
+    @ In, expected, object, expected value
+    @ Out, None
+  """
+  if found == expected:
+    results['pass'] += 1
+  else:
+    results['fail'] += 1
+    print(f'Check "{name}" failed! Expected {expected} but got {found}')
+
+step = 1e-3
+with tempfile.TemporaryDirectory() as location:
+  moped = moped_system.build(location, samples=2)
+  moped_system.build_problem(moped)
+  tasks = [(0, 0), (1, 1)]
+  moped._subproblems = dict((task, moped.buildSubproblem(*task)) for task in tasks)
+  moped._subproblem_solver = moped.getSolver(moped._subproblems[tasks[0]])
+  for r, y in tasks:
+    # generation is cheaper than imports, so the NPV increases with capacity while demand exceeds it
+    for capacity, positive in [(22.5, True), (30.5, True), (45, False)]:
+      name = f'realization {r}, year {y}, capacity {capacity}'
+      found_r, found_y, npv, slopes = moped.solveSubproblem(r, y, {'ngcc': capacity})
+      check(f'{name} indices', (found_r, found_y), (r, y))
+      check(f'{name} slope sign', bool(slopes['ngcc'] > 1e-6), positive)
+      upper = moped.solveSubproblem(r, y, {'ngcc': capacity + step})[2]
+      lower = moped.solveSubproblem(r, y, {'ngcc': capacity - step})[2]
+      difference = (upper - lower) / (2 * step)
+      check(f'{name} slope value', bool(np.isclose(slopes['ngcc'], difference, rtol=1e-4, atol=1e-4)), True)
+
+print(results)
+sys.exit(results['fail'])
@@ -0,0 +1,64 @@
+# Copyright 2022, Battelle Energy Alliance, LLC
+# ALL RIGHTS RESERVED
+"""
+Test sweeping capacities with MOPED, serially and with parallel workers
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+import moped_system
+
+results = {"pass":0, "fail":0}
+
+def check(name, found, expected):
+  """
+    Compares values and records the result.
+    @ In, name, str, name of the check
+    @ In, found, object, calculated value
+    @ In, expected, object, expected value
+    @ Out, None
+  """
+  if found == expected:
+    results['pass'] += 1
+  else:
+    results['fail'] += 1
+    print(f'Check "{name}" failed! Expected {expected} but got {found}')
+
+def solve(capacity, moped=''):
+  """
+    Solves the default system with the given generator capacity.
+    @ In, capacity, str, XML for the generator capacity
+    @ In, moped, str, optional, XML settings for MOPED
+    @ Out, solution, pd.DataFrame, written capacities and NPV
+  """
+  components = moped_system.GENERATOR.replace('<opt_bounds>10, 40</opt_bounds>', capacity)
+  components += moped_system.IMPORT + moped_system.GRID + moped_system.MARKET
+  cwd = os.getcwd()
+  with tempfile.TemporaryDirectory() as location:
+    os.chdir(location)
+    try:
+      moped_system.build(location, components=components, moped=moped, samples=2).run()
+      solution = pd.read_csv('opt_solution.csv', index_col=0)
+    finally:
+      os.chdir(cwd)
+  return solution
+
+serial = solve('<sweep_values>20, 30</sweep_values>')
+check('serial capacities', serial['ngcc Capacity'].tolist(), [20, 30])
+# each combination is solved as if its capacities were fixed
+for capacity, npv in zip(serial['ngcc Capacity'], serial['Expected NPV']):
+  fixed = solve(f'<fixed_value>{capacity}</fixed_value>')
+  check(f'{capacity} NPV', bool(np.isclose(npv, fixed['Expected NPV'][0], rtol=1e-8)), True)
+
+# forked workers solve the same problems
+parallel = solve('<sweep_values>20, 30</sweep_values>', moped='<workers>2</workers>')
+check('parallel capacities', parallel['ngcc Capacity'].tolist(), [20, 30])
+check('parallel NPV', bool(np.allclose(parallel['Expected NPV'], serial['Expected NPV'], rtol=1e-8)), True)
+
+print(results)
+sys.exit(results['fail'])
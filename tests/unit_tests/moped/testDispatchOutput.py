@@ -0,0 +1,87 @@
+# Copyright 2022, Battelle Energy Alliance, LLC
+# ALL RIGHTS RESERVED
+"""
+Test writing the optimized MOPED dispatch and reading it back
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+import netCDF4
+
+import moped_system
+
+results = {"pass":0, "fail":0}
+
+def check(name, found, expected):
+  """
+    Compares values and records the result.
+    @ In, name, str, name of the check
+    @ In, found, object, calculated value
+    @ In, expected, object, expected value
+    @ Out, None
+  """
+  if found == expected:
+    results['pass'] += 1
+  else:
+    results['fail'] += 1
+    print(f'Check "{name}" failed! Expected {expected} but got {found}')
+
+STORAGE = '''
+    <Component name="battery">
+      <stores resource="electricity" dispatch="independent">
+        <capacity resource="electricity"><fixed_value>10</fixed_value></capacity>
+        <initial_stored><fixed_value>0</fixed_value></initial_stored>
+        <RTE>0.81</RTE>
+      </stores>
+      <economics><lifetime>10</lifetime></economics>
+    </Component>'''
+
+samples = 2
+template = 'Dispatch__{}__{}__electricity'
+# sign of each variable: resources supplied are positive and resources used are negative
+signs = {template.format('ngcc', 'production'): 1,
+         template.format('import', 'production'): 1,
+         template.format('grid', 'production'): -1,
+         template.format('market', 'production'): -1,
+         template.format('battery', 'level'): 1,
+         template.format('battery', 'charge'): -1,
+         template.format('battery', 'discharge'): 1}
+# the generator cannot meet the peak load, so the battery shifts generation to avoid imports
+generator = moped_system.GENERATOR.replace('<opt_bounds>10, 40</opt_bounds>', '<fixed_value>28</fixed_value>')
+components = generator + moped_system.IMPORT + moped_system.GRID + moped_system.MARKET + STORAGE
+settings = '<dispatch_output><file>dispatch.nc</file><compression>6</compression></dispatch_output>'
+cwd = os.getcwd()
+with tempfile.TemporaryDirectory() as location:
+  os.chdir(location)
+  try:
+    moped = moped_system.build(location, components=components, moped=settings, samples=samples)
+    moped.run()
+    expected = moped.extractDispatch()
+    with netCDF4.Dataset('dispatch.nc') as dataset:
+      check('realizations', dataset['realization'][:].tolist(), list(range(1, samples + 1)))
+      check('years', dataset['year'][:].tolist(), [1, 2])
+      check('clusters', dataset['cluster'][:].tolist(), list(range(len(moped_system.SEGMENTS))))
+      check('hours', dataset['hour'][:].tolist(), list(range(moped_system.HOURS)))
+      check('weight', dataset['weight'][:].tolist(), [1 / samples] * samples)
+      multiplicity = [len(segments) for segments in moped_system.SEGMENTS]
+      check('multiplicity', dataset['multiplicity'][:].tolist(), [multiplicity] * 2)
+      meta = ['realization', 'year', 'cluster', 'hour', 'weight', 'multiplicity']
+      check('variables', sorted(set(dataset.variables) - set(meta)), sorted(signs))
+      for name, sign in signs.items():
+        values = dataset[name][:].filled(np.nan)
+        check(f'{name} dims', dataset[name].dimensions, ('realization', 'year', 'cluster', 'hour'))
+        check(f'{name} compression', dataset[name].filters()['complevel'], 6)
+        check(f'{name} values', bool(np.allclose(values, expected[name])), True)
+        check(f'{name} sign', bool((sign * values >= -1e-8).all()), True)
+      check('battery charged', bool(np.abs(dataset[template.format('battery', 'charge')][:]).max() > 0), True)
+      # electricity is conserved in every hour
+      supplied = sum(dataset[name][:] for name in signs if 'level' not in name)
+      check('balance', bool(np.allclose(supplied, 0, atol=1e-6)), True)
+  finally:
+    os.chdir(cwd)
+
+print(results)
+sys.exit(results['fail'])
@@ -0,0 +1,108 @@
+# Copyright 2022, Battelle Energy Alliance, LLC
+# ALL RIGHTS RESERVED
+"""
+Test the sparse NPV of MOPED hourly cashflows against discounting each dispatch directly
+"""
+
+import sys
+import tempfile
+
+import numpy as np
+import pyomo.environ as pyo
+from pyomo.repn import generate_standard_repn
+
+import moped_system
+
+results = {"pass":0, "fail":0}
+
+def check(name, found, expected):
+  """
+    Compares values and records the result.
+    @ In, name, str, name of the check
+    @ In, found, object, calculated value
+    @ In, expected, object, expected value
+    @ Out, None
+  """
+  if found == expected:
+    results['pass'] += 1
+  else:
+    results['fail'] += 1
+    print(f'Check "{name}" failed! Expected {expected} but got {found}')
+
+def terms(expr):
+  """
+    Collects the linear terms and constant of an expression.
+    @ In, expr, pyomo expression, linear expression
+    @ Out, coefficients, dict, {variable name: coefficient}
+    @ Out, constant, float, constant term
+  """
+  repn = generate_standard_repn(expr)
+  coefficients = dict((var.name, coef) for var, coef in zip(repn.linear_vars, repn.linear_coefs))
+  return coefficients, repn.constant
+
+def expected_terms(reals, years):
+  """
+    Discounts each hourly cashflow of the default system directly, with the tax, realization
+    probability, and cluster multiplicity applied.
+    @ In, reals, list, realization indices to include
+    @ In, years, list, year indices to include
+    @ Out, coefficients, dict, {variable name: coefficient}
+    @ Out, constant, float, constant term from the fixed grid dispatch
+  """
+  coefficients = {}
+  constant = 0.0
+  for r in reals:
+    for y in years:
+      for c, segments in enumerate(moped_system.SEGMENTS):
+        for t in range(moped_system.HOURS):
+          scale = (1 - tax) * (1 + discount) ** -(y + 1) / samples * len(segments)
+          coefficients[f'ngcc_dispatch[{r},{y},{c},{t}]'] = -25 * scale
+          coefficients[f'import_dispatch[{r},{y},{c},{t}]'] = -100 * scale
+          coefficients[f'market_dispatch[{r},{y},{c},{t}]'] = signals[r]['PRICE'][y, c, t] * scale
+          constant += 60 * signals[r]['LOAD'][y, c, t] * scale
+  return coefficients, constant
+
+def close(found, expected):
+  """
+    Checks that the terms of two expressions match.
+    @ In, found, dict, {variable name: coefficient} of the built expression
+    @ In, expected, dict, {variable name: coefficient} expected
+    @ Out, close, bool, True if the same variables have the same coefficients
+  """
+  return sorted(found) == sorted(expected) and all(np.isclose(found[name], expected[name]) for name in expected)
+
+samples = 4
+tax = 0.1
+discount = 0.08
+# the same samples MOPED receives from the stand-in ROM
+rom = moped_system.SyntheticROM('clustered', 2)
+signals = [rom.evaluate({})[0] for _ in range(samples)]
+
+with tempfile.TemporaryDirectory() as location:
+  moped = moped_system.build(location, samples=samples)
+  dispatches = moped_system.build_problem(moped)
+  check('fixed grid dispatch', dispatches['grid'].ctype, pyo.Param)
+
+  coefficients, constant = terms(moped.buildHourlyNPV())
+  expected, expected_constant = expected_terms(range(samples), range(2))
+  check('coefficients', close(coefficients, expected), True)
+  check('constant', np.isclose(constant, expected_constant), True)
+
+  # a subproblem only includes its own realization and year
+  sub = moped.buildSubproblem(2, 1)
+  coefficients, constant = terms(-sub.cost.expr)
+  expected, expected_constant = expected_terms([2], [1])
+  check('subproblem coefficients', close(coefficients, expected), True)
+  check('subproblem constant', np.isclose(constant, expected_constant), True)
+
+  # dispatch with no price is left out of the expression
+  name, alpha, dispatch, cf = [hourly for hourly in moped._hourly_cashflows if hourly[0] == 'market'][0]
+  alpha = alpha.copy()
+  alpha[:, :, ::2] = 0
+  moped._hourly_cashflows = [(name, alpha, dispatch, cf)]
+  coefficients, constant = terms(moped.buildHourlyNPV())
+  check('sparse terms', len(coefficients), np.count_nonzero(alpha[:, 1:, :]))
+  check('sparse constant', constant, 0)
+
+print(results)
+sys.exit(results['fail'])
@@ -0,0 +1,62 @@
+# Copyright 2022, Battelle Energy Alliance, LLC
+# ALL RIGHTS RESERVED
+"""
+Test the selection and weighting of representative synthetic history realizations
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+import moped_system
+
+results = {"pass":0, "fail":0}
+
+def check(name, found, expected):
+  """
+    Compares values and records the result.
+    @ In, name, str, name of the check
+    @ In, found, object, calculated value
+    @ In, expected, object, expected value
+    @ Out, None
+  """
+  if found == expected:
+    results['pass'] += 1
+  else:
+    results['fail'] += 1
+    print(f'Check "{name}" failed! Expected {expected} but got {found}')
+
+# three groups of realizations; forward selection starts from the realization nearest to all others,
+# then adds the middle of each other group; k-medoids then moves the first to the middle of its group
+levels = np.array([0.1, 10.1, 0.0, 30.0, 10.2, 0.2, 10.0])
+expected = {'forward': {6: 3 / 7, 0: 3 / 7, 3: 1 / 7},
+            'kmedoids': {1: 3 / 7, 0: 3 / 7, 3: 1 / 7}}
+# load and price, as [realization, year, cluster, hour]
+load = np.repeat(levels, 8).reshape(7, 2, 2, 2)
+samples = {'LOAD': load, 'PRICE': 2 * load + 5}
+
+with tempfile.TemporaryDirectory() as location:
+  moped = moped_system.build(location, samples=len(levels))
+  moped._case.moped['reduced_samples'] = 3
+  before = set(os.listdir())
+  for method, representatives in expected.items():
+    moped._case.moped['reduction_method'] = method
+    selected, weights = moped.reduceScenarios(samples)
+    check(f'{method} selected', selected.tolist(), list(representatives))
+    check(f'{method} weights', bool(np.allclose(weights, list(representatives.values()))), True)
+    check(f'{method} weights sum', bool(np.isclose(weights.sum(), 1)), True)
+  # nothing is written unless requested
+  check('no output', set(os.listdir()), before)
+
+  output = os.path.join(location, 'reduction.csv')
+  moped._case.moped['reduction_output'] = output
+  selected, weights = moped.reduceScenarios(samples)
+  written = pd.read_csv(output)
+  check('output realizations', written['realization'].tolist(), (selected + 1).tolist())
+  check('output weights', bool(np.allclose(written['weight'], weights)), True)
+
+print(results)
+sys.exit(results['fail'])
@@ -0,0 +1,74 @@
+# Copyright 2022, Battelle Energy Alliance, LLC
+# ALL RIGHTS RESERVED
+"""
+Test that MOPED loads the synthetic history ROM and samples all of its signals once
+"""
+
+import sys
+import tempfile
+
+import numpy as np
+
+import moped_system
+
+results = {"pass":0, "fail":0}
+
+def check(name, found, expected):
+  """
+    Compares values and records the result.
+    @ In, name, str, name of the check
+    @ In, found, object, calculated value
+    @ In, expected, object, expected value
+    @ Out, None
+  """
+  if found == expected:
+    results['pass'] += 1
+  else:
+    results['fail'] += 1
+    print(f'Check "{name}" failed! Expected {expected} but got {found}')
+
+samples = 4
+rom = moped_system.SyntheticROM('clustered', 2)
+signals = [rom.evaluate({})[0] for _ in range(samples)]
+
+with tempfile.TemporaryDirectory() as location:
+  moped = moped_system.build(location, samples=samples)
+  check('signals', moped.collectSyntheticSignals(), ['LOAD', 'PRICE'])
+  moped_system.build_problem(moped)
+  runner = moped.loadSyntheticRunner()
+  # the load capacity and the market price come from the same realizations
+  check('loaded once', moped_system.SyntheticLoader.loads, ['clustered'])
+  check('sampled once', runner.runner.evaluations, samples)
+  load = moped._component_meta['grid']['Capacity']
+  check('load', all(np.array_equal(load[f'Realization_{r+1}'], signals[r]['LOAD']) for r in range(samples)), True)
+  price = moped._cf_meta['market']['Dispatching']
+  check('price', all(np.array_equal(price[f'Realization_{r+1}'], signals[r]['PRICE']) for r in range(samples)), True)
+  # prices are laid out as [realization, year, hour] with an empty build year
+  alpha = moped.reshapeAlpha(price)
+  check('alpha shape', alpha.shape, (samples, 3, moped._yearly_hours))
+  check('alpha build year', np.count_nonzero(alpha[:, 0]), 0)
+  check('alpha', np.array_equal(alpha[1, 1:], signals[1]['PRICE'].reshape(2, -1)), True)
+
+  # requesting a signal again reuses the samples
+  load = moped.sampleSyntheticHistory('LOAD')
+  check('reused loads', moped_system.SyntheticLoader.loads, ['clustered'])
+  check('reused samples', runner.runner.evaluations, samples)
+  check('reused load', np.array_equal(load[0], signals[0]['LOAD']), True)
+
+  # full resolution samples are loaded from a runner in that mode, with a filler cluster
+  moped.resetProblem()
+  moped._eval_mode = 'full'
+  moped_system.build_problem(moped)
+  check('full loaded once', moped_system.SyntheticLoader.loads, ['clustered', 'full'])
+  check('full sampled once', moped.loadSyntheticRunner().runner.evaluations, samples)
+  check('full shape', moped._component_meta['grid']['Capacity']['Realization_1'].shape, (2, 1, 20))
+  moped._eval_mode = 'clustered'
+  check('clustered runner kept', moped.loadSyntheticRunner() is runner, True)
+
+  # a new seed samples again
+  moped.setSeed(7)
+  moped.sampleSyntheticHistory('LOAD')
+  check('reseeded samples', runner.runner.evaluations, 2 * samples)
+
+print(results)
+sys.exit(results['fail'])
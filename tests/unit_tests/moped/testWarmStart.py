@@ -0,0 +1,130 @@
+# Copyright 2022, Battelle Energy Alliance, LLC
+# ALL RIGHTS RESERVED
+"""
+Test starting the full resolution MOPED problem from the clustered solution
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+from pyomo.opt import SolverFactory
+
+import moped_system
+
+results = {"pass":0, "fail":0}
+
+def check(name, found, expected):
+  """
+    Compares values and records the result.
+    @ In, name, str, name of the check
+    @ In, found, object, calculated value
+    @ In, expected, object, expected value
+    @ Out, None
+  """
+  if found == expected:
+    results['pass'] += 1
+  else:
+    results['fail'] += 1
+    print(f'Check "{name}" failed! Expected {expected} but got {found}')
+
+class RecordingSolver:
+  """
+    Solves with a pyomo solver, recording the options of each solve.
+  """
+  def __init__(self, solver):
+    """
+      Constructor.
+      @ In, solver, pyomo solver, solver to use
+      @ Out, None
+    """
+    self._solver = solver
+    self.solves = []
+
+  def warm_start_capable(self):
+    """
+      Checks if the solver can be warm started.
+      @ In, None
+      @ Out, capable, bool, True if the solver can be warm started
+    """
+    return self._solver.warm_start_capable()
+
+  def solve(self, model, **kwargs):
+    """
+      Solves a model.
+      @ In, model, pyomo.ConcreteModel, model to solve
+      @ In, kwargs, dict, solver options
+      @ Out, results, pyomo results, solver results
+    """
+    self.solves.append(kwargs)
+    return self._solver.solve(model, **kwargs)
+
+class Function:
+  """
+    Stands in for a source that is not a synthetic history.
+  """
+  def is_type(self, typ):
+    """
+      Checks for matching type
+      @ In, typ, str, type to check against
+      @ Out, is_type, bool, True if matching request
+    """
+    return typ == 'Function'
+
+def value(r, y, c, t):
+  """
+    Makes a distinct dispatch value for each index.
+    @ In, r, int, realization
+    @ In, y, int, year
+    @ In, c, int, cluster
+    @ In, t, int, hour
+    @ Out, value, float, dispatch value
+  """
+  return 1000 * r + 100 * y + 10 * c + t
+
+hours = moped_system.HOURS
+# cluster representing each segment, in the order of the segments
+clusters = [0, 1, 0, 1, 2]
+with tempfile.TemporaryDirectory() as location:
+  moped = moped_system.build(location, samples=2)
+  # the synthetic history is found by type, not by position
+  moped._sources = [Function()] + moped._sources
+  moped_system.build_problem(moped)
+  for (r, y, c, t), var in moped._m.ngcc_dispatch.items():
+    var.set_value(value(r, y, c, t))
+  moped._m.ngcc.set_value(27)
+  start = moped.getWarmStart()
+  check('segment clusters', [mapping.tolist() for mapping in start['segment_clusters']], [clusters] * 2)
+  check('segment hours', start['segment_hours'], hours)
+  check('capacities', start['capacities'], {'ngcc': 27})
+
+  moped.resetProblem()
+  moped._eval_mode = 'full'
+  moped_system.build_problem(moped)
+  moped.applyWarmStart(start)
+  check('capacity', moped._m.ngcc.value, 27)
+  # each hour starts from the same hour of the cluster representing its segment
+  mapped = dict((index, var.value) for index, var in moped._m.ngcc_dispatch.items())
+  expected = dict(((r, y, 0, h), value(r, y, clusters[h // hours], h % hours))
+                  for r in range(2) for y in range(2) for h in range(len(clusters) * hours))
+  check('dispatch', mapped, expected)
+
+  # only the full resolution solve is warm started
+  solver = SolverFactory('appsi_highs')
+  if not solver.available(exception_flag=False):
+    solver = SolverFactory('ipopt')
+  cwd = os.getcwd()
+  os.chdir(location)
+  try:
+    moped.resetProblem()
+    moped._solver = RecordingSolver(solver)
+    moped._case.moped['warm_start'] = True
+    moped.run()
+  finally:
+    os.chdir(cwd)
+  warm = [{'warmstart': True}] if solver.warm_start_capable() else [{}]
+  check('warm start option', moped._solver.solves, [{}] + warm)
+
+print(results)
+sys.exit(results['fail'])
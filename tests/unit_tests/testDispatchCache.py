@@ -0,0 +1,141 @@
+# Copyright 2020, Battelle Energy Alliance, LLC
+# ALL RIGHTS RESERVED
+"""
+Test the on-disk cache of dispatch results and how segment dispatches are identified in it
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+import numpy as np
+
+# Load HERON tools
+HERON_LOC = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, os.pardir))
+sys.path.append(HERON_LOC)
+from HERON.src import _utils as hutils
+sys.path.append(hutils.get_raven_loc())
+from HERON.src.DispatchCache import DispatchCache
+from HERON.src.DispatchManager import DispatchRunner
+from HERON.src.dispatch.pyomo_dispatch import Pyomo
+sys.path.pop()
+sys.path.pop()
+
+results = {"pass":0, "fail":0}
+
+def check(name, found, expected):
+  """
+    Compares values and records the result.
+    @ In, name, str, name of the check
+    @ In, found, object, calculated value
+    @ In, expected, object, expected value
+    @ Out, None
+  """
+  if found == expected:
+    results['pass'] += 1
+  else:
+    results['fail'] += 1
+    print(f'Check "{name}" failed! Expected {expected} but got {found}')
+
+def entries(location):
+  """
+    Lists the files in the cache directory.
+    @ In, location, str, cache directory
+    @ Out, entries, set, file names
+  """
+  return set(os.listdir(location))
+
+# key stability and invalidation
+inputs = {'price': np.linspace(0, 1, 24), 'capacity': 100.0, 'settings': {'a': 1, 'b': (2, 'x')}}
+reordered = {'settings': {'b': (2, 'x'), 'a': 1}, 'capacity': 100.0, 'price': np.linspace(0, 1, 24).copy()}
+key = DispatchCache.hash_inputs('lib', inputs)
+check('key stable', DispatchCache.hash_inputs('lib', reordered), key)
+changed = dict(inputs, price=inputs['price'] + 1e-12)
+check('key changes with signal', DispatchCache.hash_inputs('lib', changed) != key, True)
+check('key changes with dtype', DispatchCache.hash_inputs('lib', dict(inputs, price=inputs['price'].astype(np.float32))) != key, True)
+check('key changes with library', DispatchCache.hash_inputs('other', inputs) != key, True)
+
+# storage is atomic, and failed writes leave nothing behind
+with tempfile.TemporaryDirectory() as location:
+  cache = DispatchCache(location, 1)
+  check('missing entry', (cache.contains(key), cache.load(key)), (False, None))
+  cache.store(key, {'level': np.arange(5.0)})
+  check('stored entry', cache.contains(key), True)
+  check('loaded entry', np.array_equal(cache.load(key)['level'], np.arange(5.0)), True)
+  check('no temporary files', entries(location), {f'{key}.npz'})
+  # a directory in place of the entry makes the final rename fail
+  blocked = DispatchCache.hash_inputs('blocked')
+  os.mkdir(os.path.join(location, f'{blocked}.npz'))
+  try:
+    cache.store(blocked, {'level': np.arange(5.0)})
+    check('failed store raises', False, True)
+  except OSError:
+    check('failed store raises', True, True)
+  check('failed store cleans up', entries(location), {f'{key}.npz', f'{blocked}.npz'})
+  check('failed store not loaded', cache.load(blocked), None)
+
+# least recently used entries are evicted first
+with tempfile.TemporaryDirectory() as location:
+  arrays = {'level': np.zeros(1000)}
+  keys = [DispatchCache.hash_inputs(name) for name in 'abcd']
+  DispatchCache(location, 1).store(keys[0], arrays)
+  size = os.path.getsize(os.path.join(location, f'{keys[0]}.npz'))
+  cache = DispatchCache(location, 3.5 * size / 1024 / 1024)
+  for k in keys[1:3]:
+    cache.store(k, arrays)
+  old = time.time() - 100
+  for i, k in enumerate(keys[:3]):
+    os.utime(os.path.join(location, f'{k}.npz'), (old + i, old + i))
+  cache.load(keys[0]) # the oldest entry becomes the most recently used
+  cache.store(keys[3], arrays)
+  check('evicted least recently used', entries(location), set(f'{k}.npz' for k in [keys[0], keys[2], keys[3]]))
+
+  # eviction is skipped while another process holds the lock ...
+  lock = os.path.join(location, DispatchCache.lock_name)
+  open(lock, 'w').close()
+  extra = DispatchCache.hash_inputs('e')
+  cache.store(extra, arrays)
+  check('locked eviction skipped', len([e for e in entries(location) if e.endswith('.npz')]), 4)
+  check('lock kept', os.path.exists(lock), True)
+  # ... but an abandoned lock is removed, so the next store evicts again
+  os.utime(lock, (old, old))
+  cache.store(extra, arrays)
+  check('stale lock removed', os.path.exists(lock), False)
+  cache.store(extra, arrays)
+  check('eviction resumed', len([e for e in entries(location) if e.endswith('.npz')]), 3)
+  check('no lock left', os.path.exists(lock), False)
+
+# segment keys only depend on settings that change the dispatch results
+class Function:
+  """
+    Stands in for a Function source, which may use the active index directly.
+  """
+  def is_type(self, typ):
+    """
+      Checks for matching type
+      @ In, typ, str, type to check against
+      @ Out, is_type, bool, True if matching request
+    """
+    return typ == 'Function'
+
+runner = DispatchRunner()
+runner._dispatcher = Pyomo()
+runner._dispatcher.set_time_discr((0, 23, 24))
+runner._lib_hash = 'lib'
+runner._sources = []
+meta = {'HERON': {'RAVEN_vars': inputs, 'active_index': {'year': 0, 'division': 0}}}
+other_segment = {'HERON': {'RAVEN_vars': reordered, 'active_index': {'year': 3, 'division': 2}}}
+key = runner._cache_key(meta)
+runner._dispatcher._verbose = not runner._dispatcher._verbose
+runner._dispatcher._model_export_counts = {'window_y00_s0_t000000': 12}
+runner._dispatcher._telemetry_file = 'telemetry.jsonl'
+check('segment key ignores runtime settings', runner._cache_key(meta), key)
+check('segment key shared across years', runner._cache_key(other_segment), key)
+runner._dispatcher._window_len = 12
+check('segment key changes with window', runner._cache_key(meta) != key, True)
+runner._sources = [Function()]
+check('segment key uses index with Functions', runner._cache_key(meta) != runner._cache_key(other_segment), True)
+
+print(results)
+sys.exit(results['fail'])
@@ -0,0 +1,119 @@
+# Copyright 2020, Battelle Energy Alliance, LLC
+# ALL RIGHTS RESERVED
+"""
+Test the phase profiler used for inner dispatch runs
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import tracemalloc
+
+# Load HERON tools
+HERON_LOC = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, os.pardir))
+sys.path.append(HERON_LOC)
+from HERON.src.PhaseProfiler import PhaseProfiler
+sys.path.pop()
+
+results = {"pass":0, "fail":0}
+
+def check(name, found, expected):
+  """
+    Compares values and records the result.
+    @ In, name, str, name of the check
+    @ In, found, object, calculated value
+    @ In, expected, object, expected value
+    @ Out, None
+  """
+  if found == expected:
+    results['pass'] += 1
+  else:
+    results['fail'] += 1
+    print(f'Check "{name}" failed! Expected {expected} but got {found}')
+
+class Case:
+  """
+    Stands in for a HERON Case, providing only the debug settings.
+  """
+  def __init__(self, profile):
+    """
+      Constructor.
+      @ In, profile, str, profiling mode from the debug settings
+      @ Out, None
+    """
+    self.debug = {'profile': profile}
+
+# disabled profilers record nothing
+profiler = PhaseProfiler()
+with profiler.phase('dispatch', year=0):
+  pass
+profiler.record('load_heron_lib', 1.0)
+check('disabled', profiler.is_enabled(), False)
+check('disabled summary', profiler.summarize(), {})
+with tempfile.TemporaryDirectory() as location:
+  check('disabled write', profiler.write(location), None)
+  check('disabled no file', os.listdir(location), [])
+
+try:
+  PhaseProfiler('cpu')
+  check('bad mode raises', False, True)
+except IOError:
+  check('bad mode raises', True, True)
+
+# the environment takes precedence over the case settings
+os.environ.pop(PhaseProfiler.env_var, None)
+check('mode from case', PhaseProfiler.from_settings(Case('time'))._mode, 'time')
+check('disabled from case', PhaseProfiler.from_settings(Case(None)).is_enabled(), False)
+os.environ[PhaseProfiler.env_var] = 'time'
+check('mode from environment', PhaseProfiler.from_settings(Case(None))._mode, 'time')
+os.environ.pop(PhaseProfiler.env_var)
+
+# timed phases, with labels, including phases that raise
+profiler = PhaseProfiler('time', start=time.time() - 1.0)
+for segment in range(2):
+  with profiler.phase('dispatch', year=0, segment=segment):
+    time.sleep(0.05 * (segment + 1))
+try:
+  with profiler.phase('cashflows', year=0):
+    raise RuntimeError('failed phase')
+except RuntimeError:
+  pass
+profiler.record('load_heron_lib', 0.25)
+records = profiler._records
+check('records', [(r['phase'], r.get('segment')) for r in records],
+      [('dispatch', 0), ('dispatch', 1), ('cashflows', None), ('load_heron_lib', None)])
+check('dispatch times', 0.05 <= records[0]['wall_time'] < records[1]['wall_time'], True)
+check('peak memory', all(r['peak_rss_mb'] > 0 for r in records), True)
+summary = profiler.summarize()
+check('summary order', list(summary), ['dispatch', 'cashflows', 'load_heron_lib'])
+check('summary count', summary['dispatch']['count'], 2)
+check('summary total', summary['dispatch']['total_time'], records[0]['wall_time'] + records[1]['wall_time'])
+check('summary max', summary['dispatch']['max_time'], records[1]['wall_time'])
+# started a second before the first phase, so fractions are of the whole run
+check('summary fraction', 0 < summary['load_heron_lib']['fraction'] < 0.25, True)
+with tempfile.TemporaryDirectory() as location:
+  path = profiler.write(location)
+  check('file name', os.path.basename(path), PhaseProfiler.file_name)
+  with open(path) as f:
+    written = json.load(f)
+  check('written mode', written['mode'], 'time')
+  check('written records', len(written['records']), 4)
+  check('written summary', written['summary']['dispatch']['count'], 2)
+
+# memory mode traces the allocation peak of each phase
+profiler = PhaseProfiler('memory')
+with profiler.phase('allocate'):
+  block = bytearray(20 * 1024**2)
+  del block
+with profiler.phase('small'):
+  pass
+tracemalloc.stop()
+allocate, small = profiler._records
+check('traced allocation', allocate['traced_peak_mb'] >= 20, True)
+check('peak reset between phases', small['traced_peak_mb'] < 20, True)
+check('summary traced peak', profiler.summarize()['allocate']['traced_peak_mb'], allocate['traced_peak_mb'])
+
+print(results)
+sys.exit(results['fail'])
@@ -0,0 +1,84 @@
+# Copyright 2020, Battelle Energy Alliance, LLC
+# ALL RIGHTS RESERVED
+"""
+Test that captured inner dispatch runs replay without RAVEN as they originally ran
+"""
+
+import os
+import sys
+import pickle
+import tempfile
+
+import numpy as np
+
+# Load HERON tools
+HERON_LOC = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, os.pardir))
+sys.path.append(HERON_LOC)
+sys.path.append(os.path.join(os.path.dirname(__file__), 'dispatch'))
+import dispatch_system
+from HERON.src import replay_dispatch
+from HERON.src.DispatchManager import DispatchManager, DispatchRunner
+sys.path.pop()
+sys.path.pop()
+
+results = {"pass":0, "fail":0}
+
+def check(name, found, expected):
+  """
+    Compares values and records the result.
+    @ In, name, str, name of the check
+    @ In, found, object, calculated value
+    @ In, expected, object, expected value
+    @ Out, None
+  """
+  if found == expected:
+    results['pass'] += 1
+  else:
+    results['fail'] += 1
+    print(f'Check "{name}" failed! Expected {expected} but got {found}')
+
+history = 48
+price = dispatch_system.make_price(history)
+raven_vars = {'Price': price[np.newaxis, :],
+              'Time': np.arange(history, dtype=float),
+              'Year': np.array([2025.0]),
+              '_indexMap': {'Price': ['Year', 'Time']}}
+capacities = {'source': 80.0}
+
+with tempfile.TemporaryDirectory() as location:
+  case, components, sources = dispatch_system.build(location, {'Price': price},
+                                                    pyomo='<rolling_window_length>24</rolling_window_length>')
+  # the library normally comes from the outer run
+  lib_path = os.path.join(location, 'heron.lib')
+  with open(lib_path, 'wb') as lib:
+    pickle.dump((case, components, sources), lib)
+
+  # original inner run
+  runner = DispatchRunner()
+  runner.load_heron_lib(lib_path)
+  runner.set_capacities(capacities)
+  _, expected = runner.run(raven_vars)
+
+  # capture and replay it
+  capture_dir = os.path.join(location, 'capture')
+  DispatchManager()._capture_inputs(capture_dir, lib_path, raven_vars, runner.get_capacities(), None)
+  captures = os.listdir(capture_dir)
+  check('one capture', len(captures), 1)
+  capture = replay_dispatch.load_capture(os.path.join(capture_dir, captures[0]))
+  export_dir = os.path.join(location, 'problems')
+  replayed = replay_dispatch.build_runner(capture, export_dir=export_dir)
+  check('capacities restored', replayed.get_capacities(), capacities)
+  metrics = replay_dispatch.replay(capture, replayed)
+  check('replayed NPV', np.isclose(metrics['NPV'], expected['NPV'], rtol=1e-8, atol=0), True)
+  check('window problems exported', sorted(os.listdir(export_dir)), ['window_y00_s0_t000000_00.lp', 'window_y00_s0_t000024_00.lp'])
+
+  # captures are unusable once the library is gone
+  os.remove(lib_path)
+  try:
+    replay_dispatch.load_capture(os.path.join(capture_dir, captures[0]))
+    check('missing library raises', False, True)
+  except IOError:
+    check('missing library raises', True, True)
+
+print(results)
+sys.exit(results['fail'])